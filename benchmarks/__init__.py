@@ -0,0 +1,3 @@
+"""
+Benchmarks for the Claude-OpenAI MCP server
+"""
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compare pooled and unpooled HTTP sessions against a local stand-in API
+
+Starts a small aiohttp server that answers /v1/responses after a fixed
+delay, then sends --requests completions through OpenAIClient with
+HTTP_POOL_ENABLED=true and =false at the given concurrency and prints
+p50/p99 latency and throughput for each mode. The response cache,
+single-flight, budget and rate limiting are off so every request opens
+or reuses a connection.
+
+    python benchmarks/http_pool.py --requests 500 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.run import BENCHMARK_ENV  # noqa: E402
+from src.config import Config  # noqa: E402
+from src.openai_client import OpenAIClient  # noqa: E402
+
+# Beyond BENCHMARK_ENV: nothing may answer a request without a connection to the stand-in
+POOL_BENCHMARK_ENV = {
+    **BENCHMARK_ENV,
+    "SINGLE_FLIGHT_ENABLED": "false",
+    "CASSETTE_MODE": "off",
+    "ROUTING_ENABLED": "false",
+    "HEDGE_ENABLED": "false",
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def start_stand_in(port: int, latency: float) -> web.AppRunner:
+    async def handle(request: web.Request) -> web.Response:
+        await request.read()
+        await asyncio.sleep(latency)
+        return web.json_response({"choices": [{"message": {"content": "ok"}}]})
+
+    app = web.Application()
+    app.router.add_post("/v1/responses", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def run_mode(pooled: bool, requests: int, concurrency: int) -> Dict[str, float]:
+    mode = "pooled" if pooled else "unpooled"
+    os.environ["HTTP_POOL_ENABLED"] = "true" if pooled else "false"
+    client = OpenAIClient(Config())
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await client.complete([{"role": "user", "content": f"{mode} request {index}"}])
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    await client.close()
+    return {
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput_rps": requests / elapsed
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.005, help="Stand-in response delay in seconds")
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    os.environ.update(POOL_BENCHMARK_ENV)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    runner = await start_stand_in(args.port, args.latency)
+    # The cache is off; the scratch paths also keep the run out of the user's cache directory
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ["RESPONSE_CACHE_PATH"] = os.path.join(scratch, "responses.sqlite3")
+        os.environ["CASSETTE_PATH"] = os.path.join(scratch, "cassette.jsonl")
+        try:
+            for pooled in (True, False):
+                result = await run_mode(pooled, args.requests, args.concurrency)
+                print(
+                    f"{'pooled' if pooled else 'unpooled':>9}: p50 {result['p50_ms']:.1f} ms, "
+                    f"p99 {result['p99_ms']:.1f} ms, {result['throughput_rps']:.0f} req/s"
+                )
+        finally:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,274 @@
+"""
+Local stand-in for the OpenAI Responses API used by the benchmarks and tests
+
+Serves POST /v1/responses with configurable latency, response size and
+error injection, and records how long it spent on each request so the
+benchmark can separate server overhead from upstream time. Requests with
+"stream": true are answered as server-sent events, and requests with
+"background": true stay queued until finish_response is called or the
+client cancels them. The /v1/files and /v1/batches endpoints cover the
+Batch API flow used by bulk mode; batches stay in progress until
+finish_batch is called.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from aiohttp import web
+
+
+class MockOpenAI:
+    """A /v1/responses endpoint with injectable latency, payload size and failures, plus files and batches"""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        payload_size: int = 2000,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+        stream_chunks: int = 4,
+        stream_interval: float = 0.0,
+        stream_error: Optional[str] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.payload_size = payload_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        # Streamed answers arrive in stream_chunks deltas, stream_interval seconds apart;
+        # with stream_error set, an error event follows the first delta instead
+        self.stream_chunks = stream_chunks
+        self.stream_interval = stream_interval
+        self.stream_error = stream_error
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+        self.service_times: List[float] = []
+        self.requests = 0
+        self.errors = 0
+        # Request bodies received on /v1/responses, for tests that inspect what was sent
+        self.bodies: List[Dict[str, Any]] = []
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        # Background responses by id, with the body they were submitted with
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self._response_bodies: Dict[str, Dict[str, Any]] = {}
+        # custom_ids that finish_batch reports in the error file instead of the output file
+        self.batch_error_ids: Set[str] = set()
+        self._ids = itertools.count(1)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def reset(self):
+        """Clear per-scenario counters"""
+        self.service_times = []
+        self.requests = 0
+        self.errors = 0
+        self.bodies = []
+
+    async def start(self, port: int = 0) -> "MockOpenAI":
+        """Listen on 127.0.0.1 (port 0 picks a free port)"""
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/v1/responses", self._handle_response)
+        app.router.add_get("/v1/responses/{response_id}", self._handle_get_response)
+        app.router.add_post("/v1/responses/{response_id}/cancel", self._handle_cancel_response)
+        app.router.add_post("/v1/files", self._handle_upload)
+        app.router.add_get("/v1/files/{file_id}/content", self._handle_download)
+        app.router.add_post("/v1/batches", self._handle_create_batch)
+        app.router.add_get("/v1/batches/{batch_id}", self._handle_get_batch)
+        app.router.add_post("/v1/batches/{batch_id}/cancel", self._handle_cancel_batch)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_response(self, request: web.Request) -> web.Response:
+        started = time.monotonic()
+        self.requests += 1
+        body = await request.json()
+        self.bodies.append(body)
+
+        delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        await asyncio.sleep(delay)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            response = web.json_response(
+                {"error": {"message": "Injected failure", "type": "server_error"}},
+                status=self.error_status,
+                headers={"retry-after-ms": "1"}
+            )
+        elif body.get("background"):
+            response_id = f"resp_{self.requests}"
+            self.responses[response_id] = {"id": response_id, "status": "queued"}
+            self._response_bodies[response_id] = body
+            response = web.json_response(self.responses[response_id])
+        elif body.get("stream"):
+            response = await self._stream(request, self._completion(body, f"resp_{self.requests}"))
+        else:
+            response = web.Response(
+                text=json.dumps(self._completion(body, f"resp_{self.requests}")),
+                content_type="application/json"
+            )
+
+        self.service_times.append(time.monotonic() - started)
+        return response
+
+    async def _stream(self, request: web.Request, completion: Dict[str, Any]) -> web.StreamResponse:
+        """Send a completion as Responses API server-sent events"""
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        async def send(data: Any):
+            await response.write(f"data: {data if isinstance(data, str) else json.dumps(data)}\n\n".encode("utf-8"))
+
+        text = completion["output_text"]
+        size = -(-len(text) // max(1, self.stream_chunks))
+        for index, offset in enumerate(range(0, len(text), size)):
+            if index and self.stream_error is not None:
+                await send({"type": "error", "error": {"message": self.stream_error}})
+                break
+            if index and self.stream_interval:
+                await asyncio.sleep(self.stream_interval)
+            await send({"type": "response.output_text.delta", "delta": text[offset:offset + size]})
+        else:
+            await send({"type": "response.completed", "response": completion})
+            await send("[DONE]")
+        await response.write_eof()
+        return response
+
+    def _completion(self, body: Dict[str, Any], response_id: str) -> Dict[str, Any]:
+        """A completed Responses API object for a request body"""
+        text = "Reasoning.\n\n" + ("x" * max(0, self.payload_size - 12))
+        input_tokens = sum(len(m.get("content") or "") for m in body.get("messages", [])) // 4
+        return {
+            "id": response_id,
+            "status": "completed",
+            "output_text": text,
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": len(text) // 4,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens_details": {"reasoning_tokens": 0}
+            }
+        }
+
+    async def _handle_get_response(self, request: web.Request) -> web.Response:
+        response = self.responses.get(request.match_info["response_id"])
+        if response is None:
+            return web.json_response({"error": {"message": "No such response"}}, status=404)
+        return web.json_response(response)
+
+    async def _handle_cancel_response(self, request: web.Request) -> web.Response:
+        response = self.responses.get(request.match_info["response_id"])
+        if response is None:
+            return web.json_response({"error": {"message": "No such response"}}, status=404)
+        if response["status"] in ("queued", "in_progress"):
+            response["status"] = "cancelled"
+        return web.json_response(response)
+
+    def finish_response(self, response_id: str) -> Dict[str, Any]:
+        """Complete a background response, as the next poll will see it"""
+        self.responses[response_id] = self._completion(self._response_bodies[response_id], response_id)
+        return self.responses[response_id]
+
+    def _add_file(self, content: bytes, purpose: str) -> Dict[str, Any]:
+        file_id = f"file-{next(self._ids)}"
+        self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "purpose": purpose}
+
+    async def _handle_upload(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        upload = form["file"]
+        return web.json_response(self._add_file(upload.file.read(), str(form.get("purpose", ""))))
+
+    async def _handle_download(self, request: web.Request) -> web.Response:
+        content = self.files.get(request.match_info["file_id"])
+        if content is None:
+            return web.json_response({"error": {"message": "No such file"}}, status=404)
+        return web.Response(body=content, content_type="application/jsonl")
+
+    async def _handle_create_batch(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if body.get("input_file_id") not in self.files:
+            return web.json_response({"error": {"message": "Unknown input_file_id"}}, status=400)
+        batch_id = f"batch_{next(self._ids)}"
+        lines = self.files[body["input_file_id"]].splitlines()
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body.get("endpoint"),
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window"),
+            "metadata": body.get("metadata") or {},
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "completed_at": None,
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": len(lines), "completed": 0, "failed": 0}
+        }
+        return web.json_response(self.batches[batch_id])
+
+    async def _handle_get_batch(self, request: web.Request) -> web.Response:
+        batch = self.batches.get(request.match_info["batch_id"])
+        if batch is None:
+            return web.json_response({"error": {"message": "No such batch"}}, status=404)
+        return web.json_response(batch)
+
+    async def _handle_cancel_batch(self, request: web.Request) -> web.Response:
+        batch = self.batches.get(request.match_info["batch_id"])
+        if batch is None:
+            return web.json_response({"error": {"message": "No such batch"}}, status=404)
+        if batch["status"] == "in_progress":
+            batch["status"] = "cancelled"
+        return web.json_response(batch)
+
+    def finish_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Answer every request of a batch, writing the output and error files, and mark it completed"""
+        batch = self.batches[batch_id]
+        output, errors = [], []
+        for index, line in enumerate(self.files[batch["input_file_id"]].splitlines(), 1):
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            if custom_id in self.batch_error_ids:
+                errors.append({
+                    "id": f"batch_req_{index}",
+                    "custom_id": custom_id,
+                    "response": None,
+                    "error": {"code": "invalid_request", "message": f"Injected failure for {custom_id}"}
+                })
+            else:
+                output.append({
+                    "id": f"batch_req_{index}",
+                    "custom_id": custom_id,
+                    "response": {"status_code": 200, "body": self._completion(request["body"], f"resp_batch_{index}")},
+                    "error": None
+                })
+        if output:
+            batch["output_file_id"] = self._add_file(self._jsonl(output), "batch_output")["id"]
+        if errors:
+            batch["error_file_id"] = self._add_file(self._jsonl(errors), "batch_output")["id"]
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+        batch["request_counts"] = {"total": len(output) + len(errors), "completed": len(output), "failed": len(errors)}
+        return batch
+
+    @staticmethod
+    def _jsonl(records: List[Dict[str, Any]]) -> bytes:
+        return "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
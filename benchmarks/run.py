@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Benchmark OpenAIMCPServer tool calls against a local mock Responses API
+
+Each scenario sends --requests tool calls through the MCP call_tool
+handler at a fixed concurrency and reports throughput, p50/p99 latency
+and server overhead (call latency minus the time the mock spent on the
+request). Results are written as JSON so runs can be compared across
+commits.
+
+    python benchmarks/run.py --concurrency 1,8,32 --requests 200 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_openai import MockOpenAI  # noqa: E402
+
+# Settings that keep the server from short-circuiting or throttling benchmark traffic
+BENCHMARK_ENV = {
+    "OPENAI_API_KEY": "sk-benchmark",
+    "RESPONSE_CACHE_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    "BUDGET_ENABLED": "false",
+    "RETRY_BASE_DELAY": "0.01",
+    "RETRY_MAX_DELAY": "0.1",
+}
+
+
+def tool_arguments(tool: str, index: int, input_size: int) -> Dict[str, Any]:
+    """Unique arguments per call so nothing is served from the cache or coalesced"""
+    code = f"# request {index}\n" + ("value = compute(value)\n" * max(1, input_size // 24))
+    if tool in ("o3_review", "o3_analyze", "o3_safety", "o3_refactor"):
+        return {"code": code, "language": "python"}
+    if tool == "o3_debug":
+        return {"code": code, "language": "python", "error": "TypeError", "expected": "no error"}
+    if tool == "o3_code":
+        return {"requirements": f"Request {index}: {code}", "language": "python"}
+    if tool == "o3_reasoning":
+        return {"problem": f"Request {index}: {code}"}
+    raise ValueError(f"No benchmark arguments for tool: {tool}")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+    return ordered[index]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_scenario(
+    mock: MockOpenAI,
+    name: str,
+    tool: str,
+    concurrency: int,
+    requests: int,
+    input_size: int,
+    env: Dict[str, str]
+) -> Dict[str, Any]:
+    """Start a fresh server with env applied and drive `requests` calls at `concurrency`"""
+    os.environ.update({
+        **BENCHMARK_ENV,
+        "OPENAI_BASE_URL": mock.base_url,
+        "MAX_CONCURRENT_REQUESTS": str(concurrency),
+        **env
+    })
+    from src.server import OpenAIMCPServer
+    import mcp.types as types
+
+    server = OpenAIMCPServer()
+    handle_call = server.server.request_handlers[types.CallToolRequest]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def call(index: int):
+        nonlocal errors
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name=tool, arguments=tool_arguments(tool, index, input_size))
+        )
+        async with semaphore:
+            started = time.perf_counter()
+            result = await handle_call(request)
+            latencies.append(time.perf_counter() - started)
+        if result.root.content[0].text.startswith("Error:"):
+            errors += 1
+
+    try:
+        # Warm up the connection pool and imports outside the measurement
+        await asyncio.gather(*(call(-i - 1) for i in range(concurrency)))
+        latencies.clear()
+        errors = 0
+        mock.reset()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await server.client.close()
+
+    service = mock.service_times
+    overhead = statistics.mean(latencies) - (statistics.mean(service) if service else 0.0)
+    return {
+        "scenario": name,
+        "tool": tool,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "upstream_requests": mock.requests,
+        "upstream_errors": mock.errors,
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "latency_mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "overhead_mean_ms": round(overhead * 1000, 3)
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    mock = await MockOpenAI(
+        latency=args.latency,
+        jitter=args.jitter,
+        payload_size=args.payload_size,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed
+    ).start()
+
+    scenarios = {"pooled": {"HTTP_POOL_ENABLED": "true"}}
+    if args.compare_pool:
+        scenarios["unpooled"] = {"HTTP_POOL_ENABLED": "false"}
+    if args.compare_json:
+        scenarios["stdlib"] = {"JSON_BACKEND": "json"}
+
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            for name, env in scenarios.items():
+                result = await run_scenario(
+                    mock, name, args.tool, concurrency, args.requests, args.input_size, env
+                )
+                results.append(result)
+                print(
+                    f"{name:>9} c={concurrency:<4} {result['throughput_rps']:>9.1f} req/s  "
+                    f"p50 {result['latency_p50_ms']:>8.2f} ms  p99 {result['latency_p99_ms']:>8.2f} ms  "
+                    f"overhead {result['overhead_mean_ms']:>7.2f} ms  errors {result['errors']}",
+                    file=sys.stderr
+                )
+    finally:
+        await mock.stop()
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "tool": args.tool,
+            "requests": args.requests,
+            "input_size": args.input_size,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "payload_size": args.payload_size,
+            "error_rate": args.error_rate,
+            "error_status": args.error_status
+        },
+        "results": results
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tool", default="o3_review", help="Tool to call (default: o3_review)")
+    parser.add_argument(
+        "--concurrency", default="1,4,16,64",
+        type=lambda value: [int(v) for v in value.split(",")],
+        help="Comma-separated concurrency levels (default: 1,4,16,64)"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Calls per scenario (default: 200)")
+    parser.add_argument("--input-size", type=int, default=4000, help="Characters of code per call (default: 4000)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock upstream latency in seconds (default: 0.05)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter on the latency in seconds")
+    parser.add_argument("--payload-size", type=int, default=2000, help="Characters in each mock response (default: 2000)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected failures (default: 503)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for jitter and error injection")
+    parser.add_argument("--compare-pool", action="store_true", help="Also run every level without the connection pool")
+    parser.add_argument("--compare-json", action="store_true", help="Also run every level with JSON_BACKEND=json")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Keep server logging (injected errors are logged as errors)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.verbose:
+        logging.disable(logging.ERROR)
+    report = asyncio.run(main(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
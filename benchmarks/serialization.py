@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding and decoding of large request and response bodies
+
+For each input size the script builds a /v1/responses payload around that
+much code and times what the client does per request with it: encode the
+body, hash it into a cache key, and decode a response of the same size.
+The "baseline" row is the previous path (aiohttp's json= argument, which
+calls json.dumps, and json.loads); the other rows are the serializers in
+src/serialization.py.
+
+    python benchmarks/serialization.py --sizes 1,10 --repeat 10
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.run import git_commit  # noqa: E402
+from src.serialization import ORJSON, STDLIB, Serializer  # noqa: E402
+
+
+def make_code(size: int) -> str:
+    """About size characters of source code with some non-ASCII text"""
+    line = "    result = transform(values[index], key=\"réglage\")  # normalise the entry\n"
+    return "def process(values):\n" + line * max(1, size // len(line))
+
+
+def make_payload(code: str) -> Dict[str, Any]:
+    return {
+        "model": "o3-pro",
+        "input": [
+            {"role": "system", "content": "You are an expert code reviewer."},
+            {"role": "user", "content": f"Review the following python code:\n\n```python\n{code}\n```"}
+        ],
+        "max_output_tokens": 100000,
+        "temperature": 0.1
+    }
+
+
+def make_response(code: str) -> bytes:
+    return json.dumps({
+        "id": "resp_1",
+        "status": "completed",
+        "output_text": code,
+        "usage": {"input_tokens": len(code) // 4, "output_tokens": len(code) // 4}
+    }).encode("utf-8")
+
+
+def best_ms(func: Callable[[], Any], repeat: int) -> float:
+    """Median wall time of func in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def measure(name: str, encode, canonical, decode, payload, response: bytes, repeat: int) -> Dict[str, Any]:
+    body = encode(payload)
+    assert decode(response)["output_text"], "decoded response has no text"
+    result = {
+        "serializer": name,
+        "body_bytes": len(body),
+        "encode_ms": best_ms(lambda: encode(payload), repeat),
+        "cache_key_ms": best_ms(lambda: hashlib.sha256(canonical(payload)).hexdigest(), repeat),
+        "decode_ms": best_ms(lambda: decode(response), repeat)
+    }
+    result["total_ms"] = result["encode_ms"] + result["cache_key_ms"] + result["decode_ms"]
+    return {key: round(value, 3) if isinstance(value, float) else value for key, value in result.items()}
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    serializers: List[Serializer] = [STDLIB] + ([ORJSON] if ORJSON is not None else [])
+    results = []
+    for megabytes in args.sizes:
+        code = make_code(int(megabytes * 1024 * 1024))
+        payload = make_payload(code)
+        response = make_response(code)
+        rows = [measure(
+            "baseline",
+            lambda obj: json.dumps(obj).encode("utf-8"),
+            lambda obj: json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+            json.loads,
+            payload, response, args.repeat
+        )]
+        rows += [
+            measure(s.name, s.dumps, s.canonical, s.loads, payload, response, args.repeat)
+            for s in serializers
+        ]
+        for row in rows:
+            row["size_mb"] = megabytes
+            row["speedup"] = round(rows[0]["total_ms"] / row["total_ms"], 2)
+            print(
+                f"{megabytes:>5g} MB {row['serializer']:>9}  encode {row['encode_ms']:>8.2f} ms  "
+                f"cache key {row['cache_key_ms']:>8.2f} ms  decode {row['decode_ms']:>8.2f} ms  "
+                f"total {row['total_ms']:>8.2f} ms  x{row['speedup']:.2f}",
+                file=sys.stderr
+            )
+        results.extend(rows)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", default="1,10",
+        type=lambda value: [float(v) for v in value.split(",")],
+        help="Comma-separated input sizes in MB (default: 1,10)"
+    )
+    parser.add_argument("--repeat", type=int, default=10, help="Timed repetitions per measurement (default: 10)")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = main(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
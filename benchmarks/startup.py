@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark MCP server cold start: process launch to the first tools/list response
+
+Each run starts `launch_mcp.py` in a fresh process, as Claude Code does for
+every session, performs the MCP initialize handshake over stdio and times
+the first tools/list response. With --budget-ms the script exits non-zero
+when the median cold start exceeds the budget.
+
+    python benchmarks/startup.py --runs 10 --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.run import git_commit, percentile  # noqa: E402
+
+
+def _send(process: subprocess.Popen, message: Dict[str, Any]):
+    process.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+    process.stdin.flush()
+
+
+def _receive(process: subprocess.Popen, request_id: int) -> Dict[str, Any]:
+    """Read stdout until the response to request_id arrives"""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Server exited before answering request {request_id}")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            if "error" in message:
+                raise RuntimeError(f"Request {request_id} failed: {message['error']}")
+            return message["result"]
+
+
+def cold_start(env: Dict[str, str]) -> Dict[str, float]:
+    """Launch one server process and time the handshake and first tool listing"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "launch_mcp.py")],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env
+    )
+    try:
+        _send(process, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "startup-benchmark", "version": "1.0"}
+            }
+        })
+        _receive(process, 1)
+        initialized = time.perf_counter()
+        _send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = _receive(process, 2)["tools"]
+        listed = time.perf_counter()
+        _send(process, {"jsonrpc": "2.0", "id": 3, "method": "tools/list"})
+        _receive(process, 3)
+        relisted = time.perf_counter()
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    return {
+        "initialize_ms": (initialized - started) * 1000,
+        "first_list_tools_ms": (listed - started) * 1000,
+        "repeat_list_tools_ms": (relisted - listed) * 1000,
+        "tools": len(tools)
+    }
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-benchmark"), "LOG_LEVEL": "WARNING"}
+    runs: List[Dict[str, float]] = []
+    cold_start(env)  # warm the OS file cache and bytecode caches so runs are comparable
+    for _ in range(args.runs):
+        runs.append(cold_start(env))
+
+    def summarize(key: str) -> Dict[str, float]:
+        values = [run[key] for run in runs]
+        return {
+            "p50_ms": round(statistics.median(values), 1),
+            "p90_ms": round(percentile(values, 0.90), 1),
+            "max_ms": round(max(values), 1)
+        }
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "tools": runs[0]["tools"],
+        "initialize": summarize("initialize_ms"),
+        "first_list_tools": summarize("first_list_tools_ms"),
+        "repeat_list_tools": summarize("repeat_list_tools_ms"),
+        "budget_ms": args.budget_ms
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Cold starts to measure (default: 10)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the median first tools/list exceeds this")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = main(args)
+    first = report["first_list_tools"]
+    print(
+        f"initialize p50 {report['initialize']['p50_ms']:.0f} ms  "
+        f"first tools/list p50 {first['p50_ms']:.0f} ms (p90 {first['p90_ms']:.0f}, max {first['max_ms']:.0f})  "
+        f"repeat tools/list p50 {report['repeat_list_tools']['p50_ms']:.1f} ms",
+        file=sys.stderr
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.budget_ms is not None and first["p50_ms"] > args.budget_ms:
+        print(f"Cold start over budget: {first['p50_ms']:.0f} ms > {args.budget_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
@@ -206,7 +206,7 @@ cat > "$INSTALL_DIR/start-server.sh" << EOF
 #!/bin/bash
 cd "$INSTALL_DIR"
 source venv/bin/activate
-python src/server.py
+python launch_mcp.py
 EOF
 chmod +x "$INSTALL_DIR/start-server.sh"
 
@@ -4,11 +4,11 @@
 import sys
 import os
 
-# Add the src directory to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+# Add the repository root to Python path; src is imported as a package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Now import and run the server
-from server import main
+from src.server import main
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
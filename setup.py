@@ -34,6 +34,10 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        # Exact token counts for budgets and chunking; without it ~4 characters count as one token
+        "tokens": ["tiktoken>=0.5.0"],
+    },
     entry_points={
         "console_scripts": [
             "claude-openai-mcp=launch_mcp:main",
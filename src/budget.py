@@ -0,0 +1,131 @@
+"""
+Pre-flight spend budgets per call, per hour and per day
+"""
+
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+
+from .errors import BudgetExceededError
+from .tokens import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+class Admission(NamedTuple):
+    """What the budget allows a request to do"""
+    model: str
+    max_tokens: int
+    estimated_cost: float
+    reservation: int
+
+
+class SpendBudget:
+    """
+    Reserve the worst-case cost of a request before it is sent
+
+    Worst case is the estimated input plus max_tokens of output. A request
+    that does not fit is downgraded (fewer output tokens, then the fallback
+    model) or rejected. Reservations are settled with the actual cost once
+    the response arrives. A limit of 0 means unlimited.
+    """
+
+    def __init__(
+        self,
+        per_call: float = 0,
+        per_hour: float = 0,
+        per_day: float = 0,
+        action: str = "downgrade",
+        min_output_tokens: int = 4000,
+        fallback_model: Optional[str] = None
+    ):
+        self.per_call = per_call
+        self.per_hour = per_hour
+        self.per_day = per_day
+        self.action = action
+        self.min_output_tokens = min_output_tokens
+        self.fallback_model = fallback_model
+        self._spent: Deque[Tuple[float, float]] = deque()
+        self._reserved: Dict[int, float] = {}
+        self._ids = itertools.count(1)
+        self.stats: Dict[str, float] = {"spent_usd": 0.0, "rejected": 0, "downgraded": 0}
+
+    @classmethod
+    def from_config(cls, config) -> "SpendBudget":
+        """Build a budget from Config settings"""
+        return cls(
+            per_call=config.budget_per_call,
+            per_hour=config.budget_per_hour,
+            per_day=config.budget_per_day,
+            action=config.budget_action,
+            min_output_tokens=config.budget_min_output_tokens,
+            fallback_model=config.budget_fallback_model or None
+        )
+
+    def spent(self, window: float) -> float:
+        """Settled plus reserved spend over the last `window` seconds"""
+        cutoff = time.time() - window
+        while self._spent and self._spent[0][0] < time.time() - DAY:
+            self._spent.popleft()
+        settled = sum(cost for at, cost in self._spent if at >= cutoff)
+        return settled + sum(self._reserved.values())
+
+    def available(self) -> float:
+        """The most a single request may cost right now"""
+        limits = []
+        if self.per_call:
+            limits.append(self.per_call)
+        if self.per_hour:
+            limits.append(self.per_hour - self.spent(HOUR))
+        if self.per_day:
+            limits.append(self.per_day - self.spent(DAY))
+        return min(limits) if limits else float("inf")
+
+    def admit(self, model: str, input_tokens: int, max_tokens: int) -> Admission:
+        """Reserve budget for a request, downgrading it if allowed; raises BudgetExceededError otherwise"""
+        available = self.available()
+        cost = estimate_cost(model, input_tokens, max_tokens)
+        if cost <= available:
+            return self._reserve(model, max_tokens, cost)
+
+        if self.action == "downgrade":
+            for candidate in filter(None, [model, self.fallback_model]):
+                input_cost = estimate_cost(candidate, input_tokens, 0)
+                per_output_token = estimate_cost(candidate, 0, 1)
+                fitting = int((available - input_cost) / per_output_token) if available > input_cost else 0
+                tokens = min(max_tokens, fitting)
+                if tokens >= self.min_output_tokens:
+                    downgraded_cost = estimate_cost(candidate, input_tokens, tokens)
+                    self.stats["downgraded"] += 1
+                    logger.warning(
+                        f"Budget downgrade: {model}/{max_tokens} -> {candidate}/{tokens} output tokens "
+                        f"(worst case ${cost:.2f} > ${available:.2f} available)"
+                    )
+                    return self._reserve(candidate, tokens, downgraded_cost)
+
+        self.stats["rejected"] += 1
+        raise BudgetExceededError(
+            f"Request rejected by spend budget: estimated worst-case cost ${cost:.2f} "
+            f"(~{input_tokens:,} input tokens + {max_tokens:,} output tokens on {model}) "
+            f"exceeds the ${max(available, 0):.2f} available"
+        )
+
+    def settle(self, reservation: int, actual_cost: float):
+        """Replace a reservation with the request's actual cost"""
+        self._reserved.pop(reservation, None)
+        self._spent.append((time.time(), actual_cost))
+        self.stats["spent_usd"] += actual_cost
+
+    def release(self, reservation: int):
+        """Drop a reservation for a request that failed before incurring cost"""
+        self._reserved.pop(reservation, None)
+
+    def _reserve(self, model: str, max_tokens: int, cost: float) -> Admission:
+        reservation = next(self._ids)
+        self._reserved[reservation] = cost
+        return Admission(model, max_tokens, cost, reservation)
@@ -0,0 +1,102 @@
+"""
+Bulk, non-interactive tool runs through the OpenAI Batch API
+"""
+
+import logging
+from typing import Any, Dict, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Batch statuses after which nothing more will happen
+FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BulkResult(NamedTuple):
+    """Outcome for one file of a batch"""
+    ok: bool
+    text: str
+
+
+class BulkRunner:
+    """Turn tool calls into Batch API JSONL, submit it, and map the output back to files"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def build_jsonl(self, tool, files: List[Dict[str, Any]], shared: Dict[str, Any]) -> bytes:
+        """One /v1/responses request per file, built exactly as the tool would build it; custom_id is the path"""
+        lines = []
+        for entry in files:
+            messages, options = tool.build_request({
+                **shared,
+                "code": entry["code"],
+                "language": entry.get("language") or shared.get("language")
+            })
+            lines.append(self.client.json.dumps({
+                "custom_id": entry["path"],
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": self.client.build_payload(messages, **options)
+            }))
+        return b"\n".join(lines) + b"\n"
+
+    async def submit(self, tool, files: List[Dict[str, Any]], shared: Dict[str, Any]) -> Dict[str, Any]:
+        """Upload the requests and create the batch; returns the batch object"""
+        paths = [entry["path"] for entry in files]
+        if len(set(paths)) != len(paths):
+            raise ValueError("File paths must be unique within a batch")
+
+        data = self.build_jsonl(tool, files, shared)
+        upload = await self.client.upload_file(data, f"{tool.name}-batch.jsonl")
+        batch = await self.client.create_batch(upload["id"], metadata={"tool": tool.name})
+        logger.info(f"Submitted batch {batch['id']} with {len(files)} {tool.name} requests")
+        return batch
+
+    async def status(self, batch_id: str) -> Dict[str, Any]:
+        """Lifecycle summary of a batch"""
+        batch = await self.client.get_batch(batch_id)
+        return {
+            "batch_id": batch["id"],
+            "tool": (batch.get("metadata") or {}).get("tool"),
+            "status": batch.get("status"),
+            "request_counts": batch.get("request_counts", {}),
+            "created_at": batch.get("created_at"),
+            "completed_at": batch.get("completed_at")
+        }
+
+    async def results(self, batch_id: str) -> Dict[str, BulkResult]:
+        """Download a finished batch and return per-file results keyed by path"""
+        batch = await self.client.get_batch(batch_id)
+        if batch.get("status") not in FINAL_STATUSES:
+            raise ValueError(f"Batch {batch_id} is still {batch.get('status')}; results are not available yet")
+
+        results: Dict[str, BulkResult] = {}
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if not file_id:
+                continue
+            content = await self.client.download_file(file_id)
+            for line in content.splitlines():
+                if line.strip():
+                    record = self.client.json.loads(line)
+                    results[record["custom_id"]] = self._parse_record(record)
+        return results
+
+    async def cancel(self, batch_id: str) -> Dict[str, Any]:
+        """Cancel a batch that has not finished"""
+        return await self.client.cancel_batch(batch_id)
+
+    def _parse_record(self, record: Dict[str, Any]) -> BulkResult:
+        """Map one output/error line onto a BulkResult"""
+        if record.get("error"):
+            return BulkResult(False, f"Error: {record['error'].get('message', record['error'])}")
+
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        if response.get("status_code") != 200:
+            message = (body.get("error") or {}).get("message", body)
+            return BulkResult(False, f"Error: {response.get('status_code')} - {message}")
+
+        content = self.client._extract_content(body)
+        if content is None:
+            return BulkResult(False, "Error: Unexpected response format")
+        return BulkResult(True, content)
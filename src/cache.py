@@ -0,0 +1,158 @@
+"""
+Two-tier response cache for OpenAI requests (in-memory LRU + on-disk SQLite)
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .serialization import DEFAULT
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """Hash a request payload into a stable, content-addressed cache key"""
+    normalized = {k: v for k, v in payload.items() if v is not None}
+    return hashlib.sha256(DEFAULT.canonical(normalized)).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed cache with an LRU memory tier and a persistent SQLite tier"""
+
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl: float = 604800,
+        memory_entries: int = 256,
+        max_disk_bytes: int = 200 * 1024 * 1024
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+        if path:
+            self._open(path)
+
+    @classmethod
+    def from_config(cls, config) -> "ResponseCache":
+        """Build a cache from Config settings"""
+        return cls(
+            path=config.cache_path,
+            ttl=config.cache_ttl,
+            memory_entries=config.cache_memory_entries,
+            max_disk_bytes=config.cache_max_mb * 1024 * 1024
+        )
+
+    def _open(self, path: str):
+        """Open (or create) the SQLite store and drop expired rows"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            self._db.commit()
+            logger.info(f"Response cache opened at {path}")
+        except (OSError, sqlite3.Error) as e:
+            # A broken disk tier should never take the server down; fall back to memory only
+            logger.error(f"Could not open response cache at {path}: {e}")
+            self._db = None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if now - created_at <= self.ttl:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value
+            del self._memory[key]
+
+        if self._db is not None:
+            try:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if now - created_at <= self.ttl:
+                        self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, created_at, value)
+                        self.stats["disk_hits"] += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Response cache read failed: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str):
+        """Store a response in both tiers"""
+        now = time.time()
+        self._remember(key, now, value)
+        self.stats["writes"] += 1
+
+        if self._db is not None:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at, size) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, now, now, len(value.encode("utf-8")))
+                )
+                self._evict_disk()
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Response cache write failed: {e}")
+
+    def clear(self):
+        """Drop every cached response"""
+        self._memory.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        """Close the SQLite store"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, created_at: float, value: str):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Delete least recently used rows until the store fits max_disk_bytes"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
@@ -0,0 +1,102 @@
+"""
+Record/replay of OpenAI request/response pairs for deterministic offline runs
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay", "auto")
+
+
+class Recording(NamedTuple):
+    """A recorded response and how long the real request took"""
+    content: str
+    usage: Dict[str, int]
+    latency: float
+
+
+class Cassette:
+    """
+    Request/response pairs stored as JSON lines, keyed by the request's cache key
+
+    record: always call the API and (re)record the response
+    replay: serve recorded responses only; unrecorded requests fail
+    auto:   replay when recorded, otherwise call the API and record
+    """
+
+    def __init__(self, path: str, mode: str = "replay", simulate_latency: bool = False):
+        if mode not in CASSETTE_MODES or mode == "off":
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self._entries: Dict[str, Recording] = {}
+        self.stats: Dict[str, int] = {"replayed": 0, "misses": 0, "recorded": 0}
+        self._load()
+
+    @classmethod
+    def from_config(cls, config) -> "Cassette":
+        """Build a cassette from Config settings"""
+        return cls(
+            path=config.cassette_path,
+            mode=config.cassette_mode,
+            simulate_latency=config.cassette_simulate_latency
+        )
+
+    @property
+    def replays(self) -> bool:
+        """Whether recorded responses are served instead of calling the API"""
+        return self.mode in ("replay", "auto")
+
+    @property
+    def records(self) -> bool:
+        """Whether real responses are written to the cassette"""
+        return self.mode in ("record", "auto")
+
+    def _load(self):
+        """Read every recording into memory; later lines for the same key win"""
+        if not os.path.exists(self.path):
+            if self.mode == "replay":
+                logger.warning(f"Cassette {self.path} does not exist; every request will miss")
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    response = entry["response"]
+                    self._entries[entry["key"]] = Recording(
+                        response["content"], response.get("usage", {}), entry.get("latency", 0.0)
+                    )
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Skipping malformed cassette line {number} in {self.path}: {e}")
+        logger.info(f"Loaded {len(self._entries)} recordings from cassette {self.path} ({self.mode} mode)")
+
+    def get(self, key: str) -> Optional[Recording]:
+        """Return the recording for key, or None if there is none"""
+        recording = self._entries.get(key)
+        self.stats["misses" if recording is None else "replayed"] += 1
+        return recording
+
+    def record(self, key: str, payload: Dict[str, Any], content: str, usage: Dict[str, int], latency: float):
+        """Append a request/response pair to the cassette"""
+        self._entries[key] = Recording(content, usage, latency)
+        entry = {
+            "key": key,
+            "recorded_at": time.time(),
+            "latency": round(latency, 3),
+            "request": payload,
+            "response": {"content": content, "usage": usage}
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.stats["recorded"] += 1
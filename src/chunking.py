@@ -0,0 +1,144 @@
+"""
+Syntax-aware splitting of large source files into chunks
+"""
+
+import ast
+import re
+from typing import List, NamedTuple
+
+from .tokens import count_tokens
+
+# Lines at column 0 that usually start a top-level definition in C-like and scripting languages
+_DEFINITION_START = re.compile(
+    r"^(?:export\s+|pub(?:\([^)]*\))?\s+|async\s+|static\s+|public\s+|private\s+|protected\s+|abstract\s+|final\s+)*"
+    r"(?:def|class|function|func|fn|impl|struct|interface|enum|trait|type|module|namespace|object|template)\b"
+)
+# A closing brace at column 0 usually ends a top-level block
+_BLOCK_END = re.compile(r"^[}\]);]+\s*$")
+
+
+class Chunk(NamedTuple):
+    """A contiguous slice of a file; lines are 1-based and inclusive"""
+    start_line: int
+    end_line: int
+    text: str
+
+
+def _python_boundaries(code: str) -> List[int]:
+    """0-based line indices where each top-level Python statement starts"""
+    tree = ast.parse(code)
+    starts = []
+    for node in tree.body:
+        lines = [node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]
+        starts.append(min(lines) - 1)
+    return starts
+
+
+def _python_definitions(code: str) -> List[int]:
+    """0-based line indices where each top-level Python function or class starts"""
+    tree = ast.parse(code)
+    return [
+        min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+        for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    ]
+
+
+def _generic_boundaries(lines: List[str]) -> List[int]:
+    """0-based line indices where a top-level block probably starts"""
+    starts = []
+    for i, line in enumerate(lines):
+        if _DEFINITION_START.match(line):
+            starts.append(i)
+        elif i > 0 and _BLOCK_END.match(lines[i - 1]):
+            starts.append(i)
+    return starts
+
+
+def _boundaries(code: str, lines: List[str], language: str) -> List[int]:
+    if language.lower() in ("python", "py"):
+        try:
+            return _python_boundaries(code)
+        except SyntaxError:
+            pass
+    return _generic_boundaries(lines)
+
+
+def _definition_starts(code: str, lines: List[str], language: str) -> List[int]:
+    if language.lower() in ("python", "py"):
+        try:
+            return _python_definitions(code)
+        except SyntaxError:
+            pass
+    return [i for i, line in enumerate(lines) if _DEFINITION_START.match(line)]
+
+
+def split_code(code: str, language: str, max_tokens: int) -> List[Chunk]:
+    """
+    Split code into chunks of at most about max_tokens
+
+    Chunks break between top-level definitions (functions, classes, ...)
+    where possible. A single definition larger than max_tokens is split
+    between lines.
+    """
+    lines = code.splitlines(keepends=True)
+    if not lines:
+        return [Chunk(1, 1, code)]
+
+    starts = sorted({0, *(i for i in _boundaries(code, lines, language) if 0 < i < len(lines))})
+    segments = [(start, end) for start, end in zip(starts, starts[1:] + [len(lines)])]
+
+    chunks: List[Chunk] = []
+    current_start, current_end, current_tokens = 0, 0, 0
+
+    def flush():
+        if current_end > current_start:
+            chunks.append(Chunk(current_start + 1, current_end, "".join(lines[current_start:current_end])))
+
+    for start, end in segments:
+        tokens = count_tokens("".join(lines[start:end]))
+        if current_tokens + tokens <= max_tokens:
+            current_end, current_tokens = end, current_tokens + tokens
+            continue
+        flush()
+        if tokens <= max_tokens:
+            current_start, current_end, current_tokens = start, end, tokens
+            continue
+
+        # A single oversized definition: fall back to line-by-line packing
+        current_start, current_end, current_tokens = start, start, 0
+        for i in range(start, end):
+            line_tokens = count_tokens(lines[i])
+            if current_tokens + line_tokens > max_tokens and current_end > current_start:
+                flush()
+                current_start, current_tokens = i, 0
+            current_end, current_tokens = i + 1, current_tokens + line_tokens
+
+    flush()
+    return chunks
+
+
+def split_definitions(code: str, language: str, max_tokens: int) -> List[Chunk]:
+    """
+    Split code into one region per top-level definition
+
+    Statements between definitions stay with the definition before them, so
+    an edit to one function only changes the text of its own region. A
+    region larger than max_tokens is split further with split_code.
+    """
+    lines = code.splitlines(keepends=True)
+    if not lines:
+        return [Chunk(1, 1, code)]
+
+    starts = sorted({0, *(i for i in _definition_starts(code, lines, language) if 0 < i < len(lines))})
+
+    regions: List[Chunk] = []
+    for start, end in zip(starts, starts[1:] + [len(lines)]):
+        text = "".join(lines[start:end])
+        if count_tokens(text) <= max_tokens:
+            regions.append(Chunk(start + 1, end, text))
+            continue
+        regions.extend(
+            Chunk(start + chunk.start_line, start + chunk.end_line, chunk.text)
+            for chunk in split_code(text, language, max_tokens)
+        )
+    return regions
@@ -0,0 +1,219 @@
+"""
+Token-reducing compaction of code before it is sent to the model
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .tokens import count_tokens
+
+# Full-line comment prefixes and block comment delimiters per language
+_LINE_COMMENTS: Dict[str, Tuple[str, ...]] = {
+    **dict.fromkeys(("python", "py", "ruby", "rb", "shell", "bash", "sh", "zsh", "perl", "r", "yaml", "toml",
+                     "dockerfile", "makefile", "powershell", "elixir", "nim"), ("#",)),
+    **dict.fromkeys(("javascript", "js", "typescript", "ts", "tsx", "jsx", "java", "c", "cpp", "c++", "csharp",
+                     "c#", "go", "golang", "rust", "swift", "kotlin", "scala", "dart", "php", "objective-c",
+                     "groovy", "zig", "solidity"), ("//",)),
+    **dict.fromkeys(("sql", "lua", "haskell", "ada"), ("--",)),
+}
+_C_STYLE = {language for language, prefixes in _LINE_COMMENTS.items() if prefixes == ("//",)} | {"css", "scss", "less"}
+
+_LICENSE = re.compile(r"copyright|licen[cs]ed?\b|spdx-license-identifier|all rights reserved", re.IGNORECASE)
+_REGION_START = re.compile(r"\b(?:begin|start)\s+(?:of\s+)?(auto-?generated|generated|vendored|vendor)\b", re.IGNORECASE)
+_REGION_END = re.compile(r"\bend\s+(?:of\s+)?(?:auto-?generated|generated|vendored|vendor)\b", re.IGNORECASE)
+# Line references in model output: "line 12", "lines 12-15", "Lines 3 to 9", "L42"
+_LINE_REFERENCE = re.compile(
+    r"(?P<word>\b[Ll]ines?\s+|\bL)(?P<start>\d+)(?:(?P<sep>\s*(?:-|–|to|through)\s*)(?P<end>\d+))?\b"
+)
+# Fenced code blocks (up to the closing fence or the end of the text) and inline code spans
+_CODE = re.compile(r"^[ \t]*(```|~~~).*?(?:^[ \t]*\1[^\n]*$|\Z)|`[^`\n]+`", re.MULTILINE | re.DOTALL)
+
+
+class Compacted(NamedTuple):
+    """Compacted code; line_map[i] is the original line number of compacted line i + 1"""
+    text: str
+    line_map: List[int]
+    tokens_before: int
+    tokens_after: int
+    elided: Dict[str, int]
+
+
+def _comment_style(language: str) -> Tuple[Tuple[str, ...], bool]:
+    language = language.lower()
+    return _LINE_COMMENTS.get(language, ()), language in _C_STYLE
+
+
+def _marker(prefixes: Tuple[str, ...], text: str) -> str:
+    return f"{prefixes[0]} [{text}]" if prefixes else f"[{text}]"
+
+
+def _comment_lines(lines: List[str], prefixes: Tuple[str, ...], block_comments: bool) -> List[bool]:
+    """Which lines consist of nothing but a comment"""
+    flags = []
+    in_block = False
+    for line in lines:
+        stripped = line.strip()
+        if in_block:
+            flags.append(True)
+            if "*/" in stripped:
+                in_block = False
+                flags[-1] = stripped.endswith("*/")
+            continue
+        if block_comments and stripped.startswith("/*"):
+            closed = "*/" in stripped[2:]
+            in_block = not closed
+            flags.append(not closed or stripped.endswith("*/"))
+            continue
+        flags.append(bool(stripped) and stripped.startswith(prefixes) if prefixes else False)
+    return flags
+
+
+def _is_minified(line: str, max_line_chars: int) -> bool:
+    if len(line) <= max_line_chars:
+        return False
+    return sum(1 for char in line if char.isspace()) / len(line) < 0.05
+
+
+def compact_code(
+    code: str,
+    language: str,
+    max_comment_lines: int = 12,
+    min_duplicate_lines: int = 6,
+    max_line_chars: int = 1000
+) -> Compacted:
+    """
+    Shrink code without changing what it does
+
+    Trailing whitespace and runs of blank lines are removed, a leading
+    license header is elided, comment blocks longer than max_comment_lines
+    are cut to their first lines, regions marked as generated or vendored
+    and minified lines are elided, and blocks of min_duplicate_lines or more
+    that repeat earlier code are replaced by a reference to the first copy.
+    Elisions leave a one-line marker. Comment handling only applies to
+    languages whose comment syntax is known.
+    """
+    prefixes, block_comments = _comment_style(language)
+    lines = [line.rstrip() for line in code.splitlines()]
+    is_comment = _comment_lines(lines, prefixes, block_comments)
+    elided: Dict[str, int] = {}
+    # (original line number, text) for every line that will be sent
+    kept: List[Tuple[int, str]] = []
+
+    def elide(start: int, end: int, reason: str, text: Optional[str] = None):
+        count = end - start
+        elided[reason] = elided.get(reason, 0) + count
+        kept.append((start + 1, _marker(prefixes, text or f"{count} lines elided: {reason}")))
+
+    i = 0
+    # A license header: the first comment block (after a shebang or blank lines) that mentions a license
+    while i < len(lines) and (not lines[i] or lines[i].startswith("#!")):
+        kept.append((i + 1, lines[i]))
+        i += 1
+    header_end = i
+    while header_end < len(lines) and is_comment[header_end]:
+        header_end += 1
+    if header_end > i and _LICENSE.search("\n".join(lines[i:header_end])):
+        elide(i, header_end, "license header")
+        i = header_end
+
+    while i < len(lines):
+        line = lines[i]
+        if _REGION_START.search(line) and (not prefixes or is_comment[i]):
+            end = next((j for j in range(i + 1, len(lines)) if _REGION_END.search(lines[j])), None)
+            if end is not None:
+                reason = _REGION_START.search(line).group(1).lower().replace("auto-", "auto")
+                kept.append((i + 1, line))
+                elide(i + 1, end, f"{reason} code")
+                kept.append((end + 1, lines[end]))
+                i = end + 1
+                continue
+        if is_comment[i]:
+            end = i
+            while end < len(lines) and is_comment[end]:
+                end += 1
+            if end - i > max_comment_lines:
+                keep = min(3, max_comment_lines)
+                kept.extend((j + 1, lines[j]) for j in range(i, i + keep))
+                elide(i + keep, end, "comment")
+                i = end
+                continue
+        if _is_minified(line, max_line_chars):
+            elide(i, i + 1, "minified", f"minified line of {len(line):,} characters elided")
+            i += 1
+            continue
+        if not line and kept and not kept[-1][1]:
+            elided["blank"] = elided.get("blank", 0) + 1
+            i += 1
+            continue
+        kept.append((i + 1, line))
+        i += 1
+
+    kept = _collapse_duplicates(kept, prefixes, min_duplicate_lines, elided)
+    text = "\n".join(line for _, line in kept)
+    if code.endswith("\n"):
+        text += "\n"
+    return Compacted(text, [number for number, _ in kept], count_tokens(code), count_tokens(text), elided)
+
+
+def _collapse_duplicates(
+    kept: List[Tuple[int, str]],
+    prefixes: Tuple[str, ...],
+    min_lines: int,
+    elided: Dict[str, int]
+) -> List[Tuple[int, str]]:
+    """Replace blocks of at least min_lines lines that repeat an earlier block with a reference to it"""
+    if min_lines < 2 or len(kept) < 2 * min_lines:
+        return kept
+    texts = [line for _, line in kept]
+    first_seen: Dict[Tuple[str, ...], int] = {}
+    result: List[Tuple[int, str]] = []
+    # Compacted line number (1-based) of each input line that was kept as is
+    position: Dict[int, int] = {}
+    i = 0
+    while i < len(kept):
+        window = tuple(texts[i:i + min_lines])
+        earlier = first_seen.get(window) if len(window) == min_lines else None
+        if earlier is not None and earlier + min_lines <= i and sum(map(len, window)) >= 40:
+            length = min_lines
+            while i + length < len(kept) and earlier + length < i and texts[earlier + length] == texts[i + length]:
+                length += 1
+            if all(earlier + k in position for k in range(length)):
+                elided["duplicate"] = elided.get("duplicate", 0) + length
+                start = position[earlier]
+                result.append((kept[i][0], _marker(
+                    prefixes, f"{length} lines elided: identical to lines {start}-{start + length - 1}"
+                )))
+                i += length
+                continue
+        if len(window) == min_lines:
+            first_seen.setdefault(window, i)
+        result.append(kept[i])
+        position[i] = len(result)
+        i += 1
+    return result
+
+
+def restore_line_numbers(text: str, line_map: List[int]) -> str:
+    """
+    Rewrite line references in model output from compacted to original line numbers
+
+    Code blocks and inline code are left alone, so identifiers such as L1
+    and string literals in returned code are not rewritten.
+    """
+    def original(number: int) -> int:
+        return line_map[number - 1] if 1 <= number <= len(line_map) else number
+
+    def replace(match: "re.Match[str]") -> str:
+        restored = f"{match.group('word')}{original(int(match.group('start')))}"
+        if match.group("end") is not None:
+            restored += f"{match.group('sep')}{original(int(match.group('end')))}"
+        return restored
+
+    parts = []
+    position = 0
+    for code in _CODE.finditer(text):
+        parts.append(_LINE_REFERENCE.sub(replace, text[position:code.start()]))
+        parts.append(code.group())
+        position = code.end()
+    parts.append(_LINE_REFERENCE.sub(replace, text[position:]))
+    return "".join(parts)
@@ -3,11 +3,20 @@ Configuration management for Claude-OpenAI MCP
 """
 
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "name:value,name:value" into a dict"""
+    mapping = {}
+    for item in value.split(","):
+        if ":" in item:
+            key, _, val = item.partition(":")
+            mapping[key.strip()] = val.strip()
+    return mapping
+
 class Config:
     """Configuration class for the MCP server"""
     
@@ -26,7 +35,134 @@ class Config:
         
         # Safety
         self.safety_threshold: str = os.getenv("SAFETY_THRESHOLD", "medium")  # low, medium, high
-        
+
+        # HTTP connection pool (shared by all tools)
+        self.http_pool_enabled: bool = os.getenv("HTTP_POOL_ENABLED", "true").lower() == "true"
+        self.http_pool_size: int = int(os.getenv("HTTP_POOL_SIZE", "20"))
+        self.http_keepalive_timeout: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))
+        self.http_dns_cache_ttl: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+        # JSON library for request and response bodies: auto (orjson when installed), orjson or json
+        self.json_backend: str = os.getenv("JSON_BACKEND", "auto").lower()
+
+        # Response cache (memory LRU + persistent SQLite)
+        self.cache_enabled: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        self.cache_path: str = os.path.expanduser(
+            os.getenv("RESPONSE_CACHE_PATH", "~/.cache/claude-openai-mcp/responses.sqlite3")
+        )  # empty string keeps the cache in memory only
+        self.cache_ttl: float = float(os.getenv("RESPONSE_CACHE_TTL", "604800"))  # 7 days
+        self.cache_memory_entries: int = int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "256"))
+        self.cache_max_mb: int = int(os.getenv("RESPONSE_CACHE_MAX_MB", "200"))
+        self.cache_disabled_tools: List[str] = [
+            name.strip() for name in os.getenv("RESPONSE_CACHE_DISABLED_TOOLS", "").split(",") if name.strip()
+        ]
+
+        # Coalesce identical requests that are already in flight
+        self.singleflight_enabled: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+        # Background mode (submit, then poll the Responses API)
+        self.background_poll_interval: float = float(os.getenv("BACKGROUND_POLL_INTERVAL", "5"))
+        self.background_timeout: float = float(os.getenv("BACKGROUND_TIMEOUT", "3600"))  # 1 hour
+
+        # Scheduling of tool calls (priority classes: high, normal, low)
+        self.max_concurrent_requests: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "8"))
+        self.tool_concurrency: Dict[str, int] = {
+            tool: int(limit) for tool, limit in _parse_mapping(os.getenv("TOOL_CONCURRENCY", "o3_reasoning:2")).items()
+        }
+        self.tool_priorities: Dict[str, str] = _parse_mapping(os.getenv("TOOL_PRIORITIES", "o3_reasoning:low"))
+
+        # Per-call model routing across tiers (deep is OPENAI_MODEL) and the optional escalation cascade
+        self.routing_enabled: bool = os.getenv("ROUTING_ENABLED", "false").lower() == "true"
+        self.model_tiers: Dict[str, str] = {
+            "fast": "o4-mini",
+            "standard": "o3",
+            **_parse_mapping(os.getenv("MODEL_TIERS", ""))
+        }
+        self.tool_tiers: Dict[str, str] = _parse_mapping(os.getenv("TOOL_TIERS", ""))
+        self.routing_fast_max_tokens: int = int(os.getenv("ROUTING_FAST_MAX_TOKENS", "2000"))
+        self.routing_standard_max_tokens: int = int(os.getenv("ROUTING_STANDARD_MAX_TOKENS", "20000"))
+        self.cascade_enabled: bool = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+        self.cascade_min_confidence: float = float(os.getenv("CASCADE_MIN_CONFIDENCE", "7"))
+
+        # Hedged requests: a second request for calls slower than the tool's recent HEDGE_PERCENTILE latency
+        self.hedge_enabled: bool = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_percentile: float = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+        self.hedge_min_samples: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_window: int = int(os.getenv("HEDGE_WINDOW", "100"))
+        self.hedge_max_ratio: float = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+        self.hedge_model: str = os.getenv("HEDGE_MODEL", "")
+        self.hedge_base_url: str = os.getenv("HEDGE_BASE_URL", "")
+
+        # Client-side rate limiting (0 = learn the limit from response headers)
+        self.rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        self.rate_limit_rpm: float = float(os.getenv("RATE_LIMIT_RPM", "0"))
+        self.rate_limit_tpm: float = float(os.getenv("RATE_LIMIT_TPM", "0"))
+
+        # Spend budgets in USD (0 = unlimited); checked before a request is sent
+        self.budget_enabled: bool = os.getenv("BUDGET_ENABLED", "true").lower() == "true"
+        self.budget_per_call: float = float(os.getenv("BUDGET_PER_CALL", "10"))
+        self.budget_per_hour: float = float(os.getenv("BUDGET_PER_HOUR", "0"))
+        self.budget_per_day: float = float(os.getenv("BUDGET_PER_DAY", "0"))
+        self.budget_action: str = os.getenv("BUDGET_ACTION", "downgrade")  # downgrade, reject
+        self.budget_min_output_tokens: int = int(os.getenv("BUDGET_MIN_OUTPUT_TOKENS", "4000"))
+        self.budget_fallback_model: str = os.getenv("BUDGET_FALLBACK_MODEL", "")
+
+        # Map-reduce analysis of inputs larger than a single request should carry
+        self.chunk_threshold_tokens: int = int(os.getenv("CHUNK_THRESHOLD_TOKENS", "40000"))
+        self.chunk_max_tokens: int = int(os.getenv("CHUNK_MAX_TOKENS", "20000"))
+        self.chunk_concurrency: int = int(os.getenv("CHUNK_CONCURRENCY", "4"))
+
+        # Near-duplicate reuse of earlier tool results (MinHash similarity of free-text arguments)
+        self.near_duplicate_enabled: bool = os.getenv("NEAR_DUPLICATE_ENABLED", "false").lower() == "true"
+        self.near_duplicate_threshold: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+        self.near_duplicate_tool_thresholds: Dict[str, float] = {
+            tool: float(threshold)
+            for tool, threshold in _parse_mapping(os.getenv("NEAR_DUPLICATE_TOOL_THRESHOLDS", "o3_code:0.97")).items()
+        }
+        self.near_duplicate_max_entries: int = int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "1000"))
+
+        # Structured findings (JSON-schema response format) for o3_review, o3_safety and o3_analyze
+        self.structured_findings_enabled: bool = os.getenv("STRUCTURED_FINDINGS_ENABLED", "false").lower() == "true"
+
+        # Compaction of code inputs (license headers, long comments, generated regions, duplicates)
+        self.compaction_enabled: bool = os.getenv("COMPACTION_ENABLED", "false").lower() == "true"
+        self.compaction_max_comment_lines: int = int(os.getenv("COMPACTION_MAX_COMMENT_LINES", "12"))
+        self.compaction_min_duplicate_lines: int = int(os.getenv("COMPACTION_MIN_DUPLICATE_LINES", "6"))
+        self.compaction_max_line_chars: int = int(os.getenv("COMPACTION_MAX_LINE_CHARS", "1000"))
+
+        # Batch tools (many files per call)
+        self.batch_concurrency: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.batch_max_files: int = int(os.getenv("BATCH_MAX_FILES", "50"))
+
+        # Bulk mode through the OpenAI Batch API
+        self.bulk_completion_window: str = os.getenv("BULK_COMPLETION_WINDOW", "24h")
+
+        # Streaming (SSE) with MCP progress notifications
+        self.streaming_enabled: bool = os.getenv("STREAMING_ENABLED", "false").lower() == "true"
+        self.non_streaming_models: List[str] = [
+            name.strip() for name in os.getenv("NON_STREAMING_MODELS", "o3-pro").split(",") if name.strip()
+        ]
+        self.stream_progress_interval: float = float(os.getenv("STREAM_PROGRESS_INTERVAL", "1"))
+
+        # Retries for transient failures (exponential backoff with full jitter)
+        self.retry_max_attempts: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+        self.retry_base_delay: float = float(os.getenv("RETRY_BASE_DELAY", "1"))
+        self.retry_max_delay: float = float(os.getenv("RETRY_MAX_DELAY", "60"))
+        self.retry_deadline: float = float(os.getenv("RETRY_DEADLINE", "900"))  # 15 minutes overall
+        self.retry_statuses: List[int] = [
+            int(code) for code in os.getenv("RETRY_STATUSES", "408,409,429,500,502,503,504").split(",") if code.strip()
+        ]
+
+        # Record/replay of API responses for offline prompt iteration (off, record, replay or auto)
+        self.cassette_mode: str = os.getenv("CASSETTE_MODE", "off").lower()
+        self.cassette_path: str = os.path.expanduser(
+            os.getenv("CASSETTE_PATH", "~/.cache/claude-openai-mcp/cassette.jsonl")
+        )
+        self.cassette_simulate_latency: bool = os.getenv("CASSETTE_SIMULATE_LATENCY", "false").lower() == "true"
+
+        # Prometheus metrics endpoint (0 = disabled; the o3_status tool works either way)
+        self.metrics_port: int = int(os.getenv("METRICS_PORT", "0"))
+        self.metrics_host: str = os.getenv("METRICS_HOST", "127.0.0.1")
+
         # Logging
         self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
         
@@ -35,11 +171,66 @@ class Config:
     
     def _validate(self):
         """Validate required configuration"""
-        if not self.openai_api_key:
+        if not self.openai_api_key and self.cassette_mode != "replay":
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
         if self.reasoning_depth not in ["low", "medium", "high"]:
             raise ValueError("REASONING_DEPTH must be 'low', 'medium', or 'high'")
         
         if self.safety_threshold not in ["low", "medium", "high"]:
-            raise ValueError("SAFETY_THRESHOLD must be 'low', 'medium', or 'high'")
\ No newline at end of file
+            raise ValueError("SAFETY_THRESHOLD must be 'low', 'medium', or 'high'")
+
+        if self.http_pool_size < 1:
+            raise ValueError("HTTP_POOL_SIZE must be at least 1")
+        
+        if self.max_concurrent_requests < 1:
+            raise ValueError("MAX_CONCURRENT_REQUESTS must be at least 1")
+        
+        for tool, priority in self.tool_priorities.items():
+            if priority not in ["high", "normal", "low"]:
+                raise ValueError(f"TOOL_PRIORITIES for {tool} must be 'high', 'normal', or 'low'")
+        
+        for tier in self.model_tiers:
+            if tier not in ["fast", "standard", "deep"]:
+                raise ValueError(f"MODEL_TIERS has unknown tier {tier}; use fast, standard or deep")
+        
+        for tool, tier in self.tool_tiers.items():
+            if tier not in ["fast", "standard", "deep"]:
+                raise ValueError(f"TOOL_TIERS for {tool} must be 'fast', 'standard', or 'deep'")
+        
+        if not 0 < self.hedge_percentile < 1:
+            raise ValueError("HEDGE_PERCENTILE must be between 0 and 1")
+        
+        if self.hedge_min_samples < 1 or self.hedge_window < self.hedge_min_samples:
+            raise ValueError("HEDGE_MIN_SAMPLES must be at least 1 and no larger than HEDGE_WINDOW")
+        
+        if not 0 <= self.hedge_max_ratio <= 1:
+            raise ValueError("HEDGE_MAX_RATIO must be between 0 and 1")
+        
+        if self.chunk_max_tokens < 1 or self.chunk_concurrency < 1:
+            raise ValueError("CHUNK_MAX_TOKENS and CHUNK_CONCURRENCY must be at least 1")
+        
+        for tool, threshold in {"default": self.near_duplicate_threshold, **self.near_duplicate_tool_thresholds}.items():
+            if not 0 < threshold <= 1:
+                raise ValueError(f"NEAR_DUPLICATE threshold for {tool} must be between 0 and 1")
+        
+        if self.compaction_max_comment_lines < 1 or self.compaction_max_line_chars < 1:
+            raise ValueError("COMPACTION_MAX_COMMENT_LINES and COMPACTION_MAX_LINE_CHARS must be at least 1")
+        
+        if self.json_backend not in ["auto", "orjson", "json"]:
+            raise ValueError("JSON_BACKEND must be 'auto', 'orjson', or 'json'")
+        
+        if self.batch_concurrency < 1:
+            raise ValueError("BATCH_CONCURRENCY must be at least 1")
+        
+        if self.budget_action not in ["downgrade", "reject"]:
+            raise ValueError("BUDGET_ACTION must be 'downgrade' or 'reject'")
+        
+        if self.cassette_mode not in ["off", "record", "replay", "auto"]:
+            raise ValueError("CASSETTE_MODE must be 'off', 'record', 'replay', or 'auto'")
+        
+        if not 0 <= self.metrics_port <= 65535:
+            raise ValueError("METRICS_PORT must be between 0 and 65535")
+        
+        if self.retry_max_attempts < 1:
+            raise ValueError("RETRY_MAX_ATTEMPTS must be at least 1")
\ No newline at end of file
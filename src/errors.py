@@ -0,0 +1,57 @@
+"""
+Error types raised by the OpenAI client
+"""
+
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+
+class APIError(Exception):
+    """An OpenAI API call failed"""
+
+    retryable = False
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class RetryableAPIError(APIError):
+    """A transient failure (rate limit, overload, dropped connection) that may succeed if retried"""
+
+    retryable = True
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message, status)
+        self.retry_after = retry_after
+
+
+class FatalAPIError(APIError):
+    """A failure that will not go away by retrying (bad request, auth, timeout)"""
+
+
+class BudgetExceededError(FatalAPIError):
+    """A request was refused locally because it would exceed a spend budget"""
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait according to retry-after-ms / Retry-After headers, if present"""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
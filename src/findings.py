@@ -0,0 +1,171 @@
+"""
+Structured findings: JSON-schema response format, parsing and compact rendering
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+
+class Finding(NamedTuple):
+    """One issue reported by a review; line is 1-based in the code sent, or None"""
+    severity: str
+    line: Optional[int]
+    location: str
+    message: str
+    fix: str
+
+
+class Findings(NamedTuple):
+    """A structured response; parsed is False when the model returned something else (kept in summary)"""
+    summary: str
+    findings: List[Finding]
+    parsed: bool = True
+
+
+# Findings are ordered across the tools' severity scales by this rank
+SEVERITY_RANK = {
+    "critical": 0, "high": 1, "major": 1, "medium": 2, "minor": 2, "low": 3, "suggestion": 4
+}
+
+
+STRUCTURED_INSTRUCTIONS = """Report every issue as one finding:
+- severity: one of {severities}
+- line: the first affected line number, or null if the issue is not tied to a line
+- location: the function, class or section concerned (empty if none)
+- message: what is wrong and why it matters, in one or two sentences
+- fix: the concrete change to make, with a short code snippet only when it is clearer than prose
+Give the overall assessment in summary, in at most three sentences. Report each issue once; do not pad with restatements."""
+
+
+def response_format(severities: Sequence[str]) -> Dict[str, Any]:
+    """The Responses API text.format for findings with the given severity scale"""
+    finding = {
+        "type": "object",
+        "properties": {
+            "severity": {"type": "string", "enum": list(severities)},
+            "line": {"type": ["integer", "null"]},
+            "location": {"type": "string"},
+            "message": {"type": "string"},
+            "fix": {"type": "string"}
+        },
+        "required": ["severity", "line", "location", "message", "fix"],
+        "additionalProperties": False
+    }
+    return {
+        "format": {
+            "type": "json_schema",
+            "name": "findings",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "summary": {"type": "string"},
+                    "findings": {"type": "array", "items": finding}
+                },
+                "required": ["summary", "findings"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def instructions(severities: Sequence[str]) -> str:
+    return STRUCTURED_INSTRUCTIONS.format(severities=", ".join(severities))
+
+
+def parse_findings(text: str) -> Findings:
+    """Parse a structured response; raises ValueError if it is not a findings object"""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Response is not JSON: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get("findings"), list):
+        raise ValueError("Response has no findings list")
+
+    findings = []
+    for item in data["findings"]:
+        if not isinstance(item, dict) or not item.get("message"):
+            raise ValueError(f"Malformed finding: {item!r}")
+        line = item.get("line")
+        findings.append(Finding(
+            severity=str(item.get("severity") or "unknown").lower(),
+            line=line if isinstance(line, int) and line > 0 else None,
+            location=str(item.get("location") or ""),
+            message=str(item["message"]).strip(),
+            fix=str(item.get("fix") or "").strip()
+        ))
+    return Findings(str(data.get("summary") or "").strip(), findings)
+
+
+def to_json(result: Findings) -> str:
+    """Compact JSON form of parsed findings, as stored in caches"""
+    return json.dumps(
+        {"summary": result.summary, "findings": [finding._asdict() for finding in result.findings]},
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+
+
+def map_lines(findings: Iterable[Finding], line_map: Optional[List[int]] = None, offset: int = 0) -> List[Finding]:
+    """
+    Translate line numbers of the code sent to lines of the original file
+
+    line_map maps the lines sent to the lines they came from (see
+    compaction); offset is then added for code that starts part-way into
+    a file.
+    """
+    mapped = []
+    for finding in findings:
+        line = finding.line
+        if line is not None and line_map:
+            line = line_map[min(line, len(line_map)) - 1]
+        if line is not None:
+            line += offset
+        mapped.append(finding._replace(line=line))
+    return mapped
+
+
+def merge(findings: Iterable[Finding]) -> List[Finding]:
+    """Deduplicate findings and order them by severity, then line"""
+    seen = set()
+    unique = []
+    for finding in findings:
+        key = (finding.severity, finding.line, " ".join(finding.message.lower().split()))
+        if key not in seen:
+            seen.add(key)
+            unique.append(finding)
+    return sorted(unique, key=lambda f: (SEVERITY_RANK.get(f.severity, len(SEVERITY_RANK)), f.line is None, f.line or 0))
+
+
+def render(result: Findings) -> str:
+    """Concise markdown: the summary, a count per severity, then one bullet per finding in the given order"""
+    summary, findings = result.summary, result.findings
+    if not result.parsed:
+        return summary
+    if not findings:
+        return f"{summary}\n\nNo issues found." if summary else "No issues found."
+
+    counts: Dict[str, int] = {}
+    for finding in findings:
+        counts[finding.severity] = counts.get(finding.severity, 0) + 1
+    lines = [summary, ""] if summary else []
+    lines.append("**Findings:** " + ", ".join(f"{count} {severity}" for severity, count in counts.items()))
+    for finding in findings:
+        where = ", ".join(part for part in (
+            f"line {finding.line}" if finding.line is not None else "",
+            f"`{finding.location}`" if finding.location else ""
+        ) if part)
+        bullet = f"- **{finding.severity}**" + (f" ({where})" if where else "") + f": {finding.message}"
+        if finding.fix:
+            bullet += f"\n  Fix: {finding.fix}"
+        lines.append(bullet)
+    return "\n".join(lines)
+
+
+def render_text(text: str) -> str:
+    """Render text if it is a structured findings response, otherwise return it unchanged"""
+    try:
+        result = parse_findings(text)
+    except ValueError:
+        return text
+    return render(result._replace(findings=merge(result.findings)))
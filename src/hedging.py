@@ -0,0 +1,121 @@
+"""
+Hedged requests: send a backup request when the first one runs long
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from .metrics import HEDGES
+
+logger = logging.getLogger(__name__)
+
+
+class Hedger:
+    """
+    Race a backup request against a slow one
+
+    A call that has not finished after the HEDGE_PERCENTILE latency of the
+    tool's recent calls gets a second request. The first to succeed wins and
+    the other is cancelled. Hedges are capped at HEDGE_MAX_RATIO of all calls
+    so the extra spend stays bounded.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        window: int = 100,
+        max_ratio: float = 0.1,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.max_ratio = max_ratio
+        self.model = model
+        self.base_url = base_url
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.stats: Dict[str, int] = {"calls": 0, "hedged": 0, "hedge_wins": 0, "over_budget": 0}
+
+    @classmethod
+    def from_config(cls, config) -> "Hedger":
+        """Build a hedger from Config settings"""
+        return cls(
+            percentile=config.hedge_percentile,
+            min_samples=config.hedge_min_samples,
+            window=config.hedge_window,
+            max_ratio=config.hedge_max_ratio,
+            model=config.hedge_model or None,
+            base_url=config.hedge_base_url or None
+        )
+
+    def delay_for(self, tool: str) -> Optional[float]:
+        """Seconds to wait before hedging a call for tool, or None until enough calls have been seen"""
+        samples = self._latencies.get(tool)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+
+    async def run(
+        self,
+        tool: str,
+        primary: Callable[[], Awaitable[Any]],
+        backup: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Await primary(), racing it against backup() if it outlives the hedge delay"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.stats["calls"] += 1
+        delay = self.delay_for(tool)
+
+        tasks = {asyncio.ensure_future(primary()): "primary"}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(set(tasks), timeout=delay)
+                if not done:
+                    if self._within_budget():
+                        logger.info(f"{tool}: no response after {delay:.1f}s; sending a hedged request")
+                        self.stats["hedged"] += 1
+                        tasks[asyncio.ensure_future(backup())] = "hedge"
+                    else:
+                        self.stats["over_budget"] += 1
+                        HEDGES.inc(tool=tool, outcome="over_budget")
+
+            pending = set(tasks)
+            errors: Dict[str, BaseException] = {}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # exception() raises on a cancelled task, so check for cancellation first
+                    if task.cancelled():
+                        errors[tasks[task]] = asyncio.CancelledError()
+                        continue
+                    if task.exception() is not None:
+                        errors[tasks[task]] = task.exception()
+                        continue
+                    self._observe(tool, loop.time() - started)
+                    if len(tasks) > 1:
+                        winner = tasks[task]
+                        if winner == "hedge":
+                            self.stats["hedge_wins"] += 1
+                        HEDGES.inc(tool=tool, outcome=f"{winner}_won")
+                    return task.result()
+            # Both failed: the first request's error decides retries (a hedge may only have hit the budget)
+            raise errors.get("primary") or errors["hedge"]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _within_budget(self) -> bool:
+        return self.stats["hedged"] + 1 <= self.max_ratio * self.stats["calls"]
+
+    def _observe(self, tool: str, latency: float):
+        samples = self._latencies.get(tool)
+        if samples is None:
+            samples = self._latencies[tool] = deque(maxlen=self.window)
+        samples.append(latency)
@@ -0,0 +1,86 @@
+"""
+Changed-line detection for incremental reviews
+"""
+
+import difflib
+import re
+from typing import Any, Dict, List, Set, Tuple
+
+from .cache import make_cache_key
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def changed_lines_from_diff(diff: str) -> Set[int]:
+    """
+    Line numbers of the new file touched by a unified diff
+
+    Added lines count as changed; a deletion marks the line that now
+    follows it. Expects the diff of a single file.
+    """
+    changed: Set[int] = set()
+    hunks = 0
+    line = old_left = new_left = 0
+    for text in diff.splitlines():
+        header = _HUNK_HEADER.match(text)
+        if header:
+            hunks += 1
+            old_left = int(header.group(1) or 1)
+            line = int(header.group(2))
+            new_left = int(header.group(3) or 1)
+            continue
+        # Anything outside a hunk's line counts is a file header or commentary
+        if old_left <= 0 and new_left <= 0:
+            continue
+        if text.startswith("+"):
+            changed.add(line)
+            line += 1
+            new_left -= 1
+        elif text.startswith("-"):
+            changed.add(max(line, 1))
+            old_left -= 1
+        elif not text.startswith("\\"):
+            line += 1
+            old_left -= 1
+            new_left -= 1
+    if not hunks:
+        raise ValueError("diff has no hunks (expected a unified diff with @@ headers)")
+    return changed
+
+
+def changed_lines_between(previous: str, current: str) -> Set[int]:
+    """Line numbers of current that differ from previous (deletions mark the following line)"""
+    matcher = difflib.SequenceMatcher(None, previous.splitlines(), current.splitlines(), autojunk=False)
+    changed: Set[int] = set()
+    for tag, _, _, j1, j2 in matcher.get_opcodes():
+        if tag in ("replace", "insert"):
+            changed.update(range(j1 + 1, j2 + 1))
+        elif tag == "delete":
+            changed.add(j1 + 1)
+    return changed
+
+
+def line_ranges(lines: Set[int]) -> List[Tuple[int, int]]:
+    """Collapse line numbers into sorted inclusive (start, end) ranges"""
+    ranges: List[Tuple[int, int]] = []
+    for number in sorted(lines):
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], number)
+        else:
+            ranges.append((number, number))
+    return ranges
+
+
+def format_ranges(ranges: List[Tuple[int, int]]) -> str:
+    return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+
+
+def region_key(prompt: str, settings: Dict[str, Any]) -> str:
+    """
+    Cache key for the findings of one region
+
+    prompt is the region's user content as sent (its code plus the
+    per-call context), and settings everything else that shapes the
+    review: system prompt, instructions, model and sampling options.
+    """
+    return make_cache_key({"kind": "review_region", "prompt": prompt, **settings})
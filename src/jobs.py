@@ -0,0 +1,112 @@
+"""
+Background job tracking for long-running tool calls
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A tool call running in the background"""
+
+    def __init__(self, tool: str, task: "asyncio.Task[str]"):
+        self.id = f"job_{uuid.uuid4().hex[:12]}"
+        self.tool = tool
+        self.task = task
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        """One of running, completed, failed or cancelled"""
+        if not self.task.done():
+            return "running"
+        if self.task.cancelled():
+            return "cancelled"
+        if self.task.exception() is not None:
+            return "failed"
+        return "completed"
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since submission, or total run time once finished"""
+        return (self.finished_at or time.time()) - self.created_at
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary used by the job status tool"""
+        info = {
+            "job_id": self.id,
+            "tool": self.tool,
+            "status": self.status,
+            "elapsed_seconds": round(self.elapsed, 1)
+        }
+        if self.status == "failed":
+            info["error"] = str(self.task.exception())
+        return info
+
+
+class JobManager:
+    """Run tool calls as asyncio tasks and keep their results for later retrieval"""
+
+    def __init__(self, max_finished: int = 100):
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def submit(self, tool: str, coro: Awaitable[str]) -> Job:
+        """Start coro in the background and return its job"""
+        job = Job(tool, asyncio.ensure_future(coro))
+        job.task.add_done_callback(lambda task: self._finish(job))
+        self._jobs[job.id] = job
+        logger.info(f"Submitted background job {job.id} for {tool}")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """Look up a job by id"""
+        if job_id not in self._jobs:
+            raise ValueError(f"Unknown job: {job_id}")
+        return self._jobs[job_id]
+
+    def list(self) -> List[Job]:
+        """All tracked jobs, oldest first"""
+        return list(self._jobs.values())
+
+    async def wait(self, job_id: str, timeout: float) -> Job:
+        """Wait up to timeout seconds for a job to finish"""
+        job = self.get(job_id)
+        if not job.task.done() and timeout > 0:
+            await asyncio.wait([job.task], timeout=timeout)
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a running job; the upstream request is cancelled as the task unwinds"""
+        job = self.get(job_id)
+        if not job.task.done():
+            job.task.cancel()
+            logger.info(f"Cancelled background job {job.id}")
+        return job
+
+    async def shutdown(self):
+        """Cancel every running job"""
+        running = [job.task for job in self._jobs.values() if not job.task.done()]
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def _finish(self, job: Job):
+        """Record completion and prune the oldest finished jobs"""
+        job.finished_at = time.time()
+        if job.status == "failed":
+            logger.error(f"Background job {job.id} failed: {job.task.exception()}")
+        else:
+            logger.info(f"Background job {job.id} {job.status} after {job.elapsed:.1f}s")
+
+        finished = [job_id for job_id, j in self._jobs.items() if j.task.done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
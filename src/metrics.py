@@ -0,0 +1,285 @@
+"""
+In-process metrics with Prometheus text exposition
+"""
+
+import bisect
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; o3-pro calls routinely take minutes, so the upper buckets are wide
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600
+)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """A named metric with a fixed set of label names"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    """A monotonically increasing count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def items(self) -> List[Tuple[Dict[str, str], float]]:
+        return [(dict(zip(self.labelnames, key)), value) for key, value in sorted(self._values.items())]
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        if not self.labelnames and not self._values:
+            lines.append(f"{self.name} 0")
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class _HistogramSeries:
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    """Bucketed observations per label set, with quantile estimates"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries(len(self.buckets))
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series.count if series else 0
+
+    def quantile(self, q: float, **labels: str) -> Optional[float]:
+        """Estimate the q-quantile by linear interpolation inside its bucket (like histogram_quantile)"""
+        series = self._series.get(self._key(labels))
+        if series is None or series.count == 0:
+            return None
+        rank = q * series.count
+        cumulative = 0
+        for i, count in enumerate(series.counts):
+            if cumulative + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def label_sets(self) -> List[Dict[str, str]]:
+        return [dict(zip(self.labelnames, key)) for key in sorted(self._series)]
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(series.sum)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """The set of metrics exported by this process"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_CALLS = REGISTRY.counter(
+    "mcp_tool_calls_total", "Tool calls handled, by outcome", ("tool", "status")
+)
+TOOL_LATENCY = REGISTRY.histogram(
+    "mcp_tool_latency_seconds", "End-to-end latency of tool calls that finished (cancelled calls excluded)", ("tool",)
+)
+REQUEST_PHASE_LATENCY = REGISTRY.histogram(
+    "openai_request_phase_seconds",
+    "Time spent per request phase: queue (scheduler and rate limiter), network, parse",
+    ("tool", "phase")
+)
+TOKENS = REGISTRY.counter(
+    "openai_tokens_total", "Tokens reported in response usage", ("tool", "kind")
+)
+HTTP_RESPONSES = REGISTRY.counter(
+    "openai_http_responses_total", "HTTP responses from the OpenAI API by status code", ("status",)
+)
+RETRIES = REGISTRY.counter(
+    "openai_retries_total", "Requests retried after a transient failure"
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "openai_response_cache_lookups_total", "Response cache lookups by result", ("result",)
+)
+COALESCED = REGISTRY.counter(
+    "openai_coalesced_requests_total", "Requests served by an identical in-flight request"
+)
+ROUTING_DECISIONS = REGISTRY.counter(
+    "openai_routing_decisions_total", "Model tier chosen per call and the rule that chose it", ("tool", "tier", "reason")
+)
+ROUTING_LATENCY_SAVED = REGISTRY.counter(
+    "openai_routing_latency_saved_seconds_total",
+    "Estimated seconds saved by serving calls below the deep tier", ("tool",)
+)
+CASCADE_OUTCOMES = REGISTRY.counter(
+    "openai_cascade_outcomes_total", "Cascade first attempts accepted or escalated to the deep tier", ("tool", "outcome")
+)
+CASCADE_ESCALATION_SECONDS = REGISTRY.counter(
+    "openai_cascade_escalation_seconds_total", "Seconds spent on first attempts that were then escalated", ("tool",)
+)
+COMPACTION_TOKENS = REGISTRY.counter(
+    "openai_compaction_tokens_total", "Tokens of code inputs before and after compaction", ("tool", "stage")
+)
+REVIEW_REGIONS = REGISTRY.counter(
+    "mcp_incremental_review_regions_total",
+    "Regions of incremental reviews: reviewed (changed), uncached (unchanged, no cached findings) or reused", ("outcome",)
+)
+NEAR_DUPLICATE_LOOKUPS = REGISTRY.counter(
+    "mcp_near_duplicate_lookups_total", "Near-duplicate result lookups by tool and result", ("tool", "result")
+)
+UPSTREAM_CANCELLATIONS = REGISTRY.counter(
+    "openai_upstream_cancellations_total",
+    "Upstream requests abandoned before they finished: connection (HTTP request aborted) or background (cancel call sent)",
+    ("tool", "mode")
+)
+CANCELLATION_SAVED_SECONDS = REGISTRY.counter(
+    "mcp_cancellation_saved_seconds_total",
+    "Estimated seconds of upstream work avoided by cancelled calls (median latency of finished calls minus time spent)",
+    ("tool",)
+)
+STRUCTURED_FINDINGS = REGISTRY.counter(
+    "mcp_structured_findings_total",
+    "Findings returned in structured mode (finding) and structured responses that could not be parsed (parse_error)",
+    ("tool", "result")
+)
+HEDGES = REGISTRY.counter(
+    "openai_hedged_requests_total",
+    "Hedged calls by outcome: primary_won, hedge_won, or over_budget (hedge skipped)", ("tool", "outcome")
+)
+
+
+def tool_summary() -> Dict[str, Dict[str, Any]]:
+    """Per-tool call counts, error rate, latency percentiles and token totals for the status tool"""
+    calls: Dict[str, Dict[str, float]] = {}
+    for labels, value in TOOL_CALLS.items():
+        calls.setdefault(labels["tool"], {})[labels["status"]] = value
+    tokens: Dict[str, Dict[str, int]] = {}
+    for labels, value in TOKENS.items():
+        tokens.setdefault(labels["tool"], {})[labels["kind"]] = int(value)
+
+    summary = {}
+    for tool in sorted(set(calls) | set(tokens)):
+        counts = calls.get(tool, {})
+        total = sum(counts.values())
+        latency = {}
+        if TOOL_LATENCY.count(tool=tool):
+            latency = {
+                f"p{int(q * 100)}_seconds": round(TOOL_LATENCY.quantile(q, tool=tool), 3)
+                for q in (0.5, 0.95, 0.99)
+            }
+        phases = {
+            labels["phase"]: round(REQUEST_PHASE_LATENCY.quantile(0.95, **labels), 3)
+            for labels in REQUEST_PHASE_LATENCY.label_sets() if labels["tool"] == tool
+        }
+        summary[tool] = {
+            "calls": int(total),
+            "errors": int(counts.get("error", 0)),
+            "cancelled": int(counts.get("cancelled", 0)),
+            "error_rate": round(counts.get("error", 0) / total, 3) if total else 0.0,
+            **latency,
+            "p95_phase_seconds": phases,
+            "tokens": tokens.get(tool, {})
+        }
+    return summary
@@ -4,12 +4,70 @@ OpenAI API client wrapper for o3_pro model
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
 import aiohttp
-import json
+
+from .budget import SpendBudget
+from .cache import ResponseCache, make_cache_key
+from .cassette import Cassette
+from .errors import FatalAPIError
+from .hedging import Hedger
+from .metrics import (
+    CACHE_LOOKUPS, CASCADE_ESCALATION_SECONDS, CASCADE_OUTCOMES, HTTP_RESPONSES,
+    REQUEST_PHASE_LATENCY, ROUTING_DECISIONS, ROUTING_LATENCY_SAVED, TOKENS, UPSTREAM_CANCELLATIONS
+)
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .routing import SELF_CHECK_INSTRUCTION, Router
+from .serialization import get_serializer
+from .singleflight import SingleFlight
+from .usage import PromptCacheStats
+from .tokens import count_tokens, estimate_cost, estimate_tokens, normalize_usage
 
 logger = logging.getLogger(__name__)
 
+# Set by the server around each tool call; streaming requests report (chars received, message) to it
+ProgressReporter = Callable[[int, str], Awaitable[None]]
+progress_reporter: ContextVar[Optional[ProgressReporter]] = ContextVar("progress_reporter", default=None)
+
+# Tool the current request is made for; labels the request metrics
+request_tool: ContextVar[str] = ContextVar("request_tool", default="other")
+
+# Set by the server around each tool call; completions the response cache does not keep (partial,
+# downgraded by the budget or answered by a hedge model) add their model to it
+uncached_completions: ContextVar[Optional[List[str]]] = ContextVar("uncached_completions", default=None)
+
+class Completion(NamedTuple):
+    """Text of a finished request plus its normalized token usage"""
+    content: str
+    usage: Dict[str, int]
+    cacheable: bool = True
+    # Set for a hedge's answer: the model that served it, and that its cost was settled already
+    model: Optional[str] = None
+    hedged: bool = False
+
+# Responses API text.format that returns the reasoning and the final answer as separate fields
+REASONED_ANSWER_FORMAT = {
+    "format": {
+        "type": "json_schema",
+        "name": "reasoned_answer",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "reasoning": {"type": "string", "description": "The reasoning that leads to the answer"},
+                "answer": {"type": "string", "description": "The final answer, complete on its own"}
+            },
+            "required": ["reasoning", "answer"],
+            "additionalProperties": False
+        }
+    }
+}
+
 class OpenAIClient:
     """Wrapper for OpenAI API with o3_pro optimizations using Responses API"""
     
@@ -18,6 +76,49 @@ class OpenAIClient:
         self.api_key = config.openai_api_key
         self.base_url = config.openai_base_url or "https://api.openai.com"
         self.model = config.openai_model
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Bodies are encoded to bytes here rather than by aiohttp's stdlib-json path
+        self.json = get_serializer(config.json_backend)
+        self.cache: Optional[ResponseCache] = ResponseCache.from_config(config) if config.cache_enabled else None
+        self.singleflight: Optional[SingleFlight] = SingleFlight() if config.singleflight_enabled else None
+        self.retry = RetryPolicy.from_config(config)
+        self.rate_limiter: Optional[RateLimiter] = RateLimiter.from_config(config) if config.rate_limit_enabled else None
+        self.budget: Optional[SpendBudget] = SpendBudget.from_config(config) if config.budget_enabled else None
+        self.prompt_cache_stats = PromptCacheStats()
+        self.cassette: Optional[Cassette] = Cassette.from_config(config) if config.cassette_mode != "off" else None
+        self.router: Optional[Router] = Router.from_config(config) if config.routing_enabled else None
+        self.hedger: Optional[Hedger] = Hedger.from_config(config) if config.hedge_enabled else None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared pooled session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.http_pool_size,
+                keepalive_timeout=self.config.http_keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.config.http_dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            logger.info(f"Opened HTTP connection pool (size={self.config.http_pool_size})")
+        return self._session
+    
+    @asynccontextmanager
+    async def _session_scope(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Yield the pooled session, or a throwaway one when pooling is disabled"""
+        if self.config.http_pool_enabled:
+            yield self._get_session()
+        else:
+            async with aiohttp.ClientSession() as session:
+                yield session
+    
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed HTTP connection pool")
+        self._session = None
+        if self.cache is not None:
+            self.cache.close()
         
     async def complete(
         self,
@@ -25,6 +126,12 @@ class OpenAIClient:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         top_p: Optional[float] = None,
+        use_cache: bool = True,
+        background: bool = False,
+        stream: Optional[bool] = None,
+        tool: Optional[str] = None,
+        tier: Optional[str] = None,
+        depth: Optional[str] = None,
         **kwargs
     ) -> str:
         """
@@ -36,70 +143,565 @@ class OpenAIClient:
             temperature: Override default temperature
             max_tokens: Override default max_tokens
             top_p: Override default top_p
+            use_cache: Serve identical earlier requests from the response cache
+            background: Submit in Responses API background mode and poll for the result
+            stream: Consume the response as an SSE stream (defaults to STREAMING_ENABLED;
+                ignored for models in NON_STREAMING_MODELS)
+            tool: Tool name the metrics and prompt-cache statistics are reported under
+            tier: Model tier (fast, standard or deep) when routing is enabled
+            depth: Requested reasoning depth, used by routing
             **kwargs: Additional parameters for the API
         
         Returns:
             Completion text
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
+        options = {
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": top_p,
+            "use_cache": use_cache,
+            "background": background,
+            "stream": stream,
+            "tool": tool,
+            **kwargs
         }
+        if self.router is None or "model" in kwargs:
+            return await self._complete_model(messages, **options)
         
-        # o3-pro uses the Responses API endpoint
-        url = f"{self.base_url}/v1/responses"
+        label = tool or "other"
+        decision = self.router.route(tool, estimate_tokens(messages), depth, tier)
+        ROUTING_DECISIONS.inc(tool=label, tier=decision.tier, reason=decision.reason)
+        logger.info(f"Routing {label} to {decision.model} ({decision.tier} tier, by {decision.reason})")
+        # A json_schema text format leaves no room for the self-check line, so structured calls skip the cascade
+        if not decision.cascade or background or "text" in kwargs:
+            return await self._complete_model(messages, model=decision.model, **options)
+        
+        # Cascade: try the cheaper model with a self-check and escalate if it is not confident
+        started = time.monotonic()
+        checked = self._append_to_system(messages, SELF_CHECK_INSTRUCTION)
+        content = await self._complete_model(checked, model=decision.model, **options)
+        passed, answer = self.router.check(content)
+        if passed:
+            CASCADE_OUTCOMES.inc(tool=label, outcome="accepted")
+            return answer
+        
+        CASCADE_OUTCOMES.inc(tool=label, outcome="escalated")
+        CASCADE_ESCALATION_SECONDS.inc(time.monotonic() - started, tool=label)
+        logger.info(f"{label}: {decision.model} failed its self-check; escalating to {self.router.models['deep']}")
+        return await self._complete_model(messages, model=self.router.models["deep"], **options)
+    
+    async def _complete_model(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None,
+        use_cache: bool = True,
+        background: bool = False,
+        stream: Optional[bool] = None,
+        tool: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """Send one request for a fixed model (see complete) through the cache, coalescing, budget and retries"""
+        payload = self.build_payload(messages, temperature, max_tokens, top_p, **kwargs)
+        
+        request_key = make_cache_key(payload)
+        
+        if self.cassette is not None and self.cassette.replays:
+            recording = self.cassette.get(request_key)
+            if recording is not None:
+                if self.cassette.simulate_latency:
+                    await asyncio.sleep(recording.latency)
+                return recording.content
+            if self.cassette.mode == "replay":
+                raise FatalAPIError(
+                    f"No recorded response for request {request_key[:12]} in cassette {self.cassette.path}"
+                )
+        
+        cache_key = request_key if self.cache is not None and use_cache else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+            if cached is not None:
+                logger.info(f"Response cache hit ({cache_key[:12]})")
+                return cached
+        
+        if stream is None:
+            stream = self.config.streaming_enabled
+        
+        if background:
+            request = self._request_background
+        elif stream and self.supports_streaming(payload["model"]):
+            request = self._request_stream
+        elif self.hedger is not None:
+            request = partial(self._hedged_request, tool=tool or "other")
+        else:
+            request = self._request
+        
+        async def send() -> Completion:
+            # Budget checks happen here, before any network I/O, and only for the call that actually sends
+            body, admission = self._preflight(payload)
+            label = request_tool.set(tool or "other")
+            started = time.monotonic()
+            try:
+                if background:
+                    # Each submit/poll call retries on its own; retrying the whole job would resubmit it
+                    completion = await request(body)
+                else:
+                    completion = await self.retry.run(lambda: request(body), f"{body['model']} request")
+            except BaseException:
+                if admission is not None:
+                    self.budget.release(admission.reservation)
+                raise
+            finally:
+                request_tool.reset(label)
+            
+            for kind, count in completion.usage.items():
+                TOKENS.inc(count, tool=tool or "other", kind=kind.replace("_tokens", ""))
+            latency = time.monotonic() - started
+            if self.router is not None:
+                saved = self.router.latency_saved(body["model"], latency)
+                if saved:
+                    ROUTING_LATENCY_SAVED.inc(saved, tool=tool or "other")
+                self.router.observe(body["model"], latency)
+            self.prompt_cache_stats.record(tool or "other", body["model"], completion.usage, latency)
+            if admission is not None:
+                # A winning hedge settled its own reservation; the cancelled first request is charged its input
+                cost = self._input_cost(body) if completion.hedged else self._actual_cost(body, completion)
+                self.budget.settle(admission.reservation, cost)
+            if body is not payload:
+                # A downgraded request's answer is not this payload's
+                completion = completion._replace(cacheable=False)
+            if cache_key is not None and completion.cacheable and completion.content:
+                self.cache.set(cache_key, completion.content)
+            if self.cassette is not None and self.cassette.records and completion.cacheable:
+                self.cassette.record(request_key, payload, completion.content, completion.usage, latency)
+            return completion
+        
+        if self.singleflight is not None:
+            completion = await self.singleflight.do(request_key, send)
+        else:
+            completion = await send()
+        uncached = uncached_completions.get()
+        if uncached is not None and not completion.cacheable:
+            uncached.append(completion.model or payload["model"])
+        return completion.content
+    
+    async def _hedged_request(self, payload: Dict[str, Any], tool: str) -> Completion:
+        """Send a request, racing it against a hedge to HEDGE_MODEL / HEDGE_BASE_URL if it runs long"""
+        hedge_payload = {**payload, "model": self.hedger.model} if self.hedger.model else payload
         
-        payload = {
-            "model": self.model,
+        async def hedge() -> Completion:
+            # The hedge is a second paid request, so it reserves and settles budget like the first
+            body, admission = self._preflight(hedge_payload)
+            try:
+                completion = await self._request(body, base_url=self.hedger.base_url)
+            except asyncio.CancelledError:
+                if admission is not None:
+                    self.budget.settle(admission.reservation, self._input_cost(body))
+                raise
+            except BaseException:
+                if admission is not None:
+                    self.budget.release(admission.reservation)
+                raise
+            completion = completion._replace(model=body["model"], hedged=True)
+            if admission is not None:
+                self.budget.settle(admission.reservation, self._actual_cost(body, completion))
+            # A different model's answer must not be cached or recorded under this request's key
+            return completion if body == payload else completion._replace(cacheable=False)
+        
+        return await self.hedger.run(tool, lambda: self._request(payload), hedge)
+    
+    def build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build the request body for the Responses API, filling in configured defaults"""
+        return {
+            "model": model or self.model,
             "messages": messages,
             "temperature": temperature or self.config.temperature,
             "max_tokens": max_tokens or self.config.max_tokens,
             "top_p": top_p or self.config.top_p,
             **kwargs
         }
+    
+    def _preflight(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Any]]:
+        """Check the payload against the spend budget; returns the (possibly downgraded) payload"""
+        if self.budget is None:
+            return payload, None
+        
+        input_tokens = estimate_tokens(payload["messages"])
+        admission = self.budget.admit(payload["model"], input_tokens, payload["max_tokens"])
+        logger.info(
+            f"Pre-flight: ~{input_tokens:,} input tokens, worst case ${admission.estimated_cost:.2f} "
+            f"on {admission.model}"
+        )
+        if admission.model != payload["model"] or admission.max_tokens != payload["max_tokens"]:
+            payload = {**payload, "model": admission.model, "max_tokens": admission.max_tokens}
+        return payload, admission
+    
+    @staticmethod
+    def _actual_cost(payload: Dict[str, Any], completion: Completion) -> float:
+        """Cost of a finished request from its usage, priced at the model that served it"""
+        usage = completion.usage
+        input_tokens = usage.get("input_tokens") or estimate_tokens(payload["messages"])
+        output_tokens = usage.get("output_tokens") or count_tokens(completion.content)
+        model = completion.model or payload["model"]
+        return estimate_cost(model, input_tokens, output_tokens, usage.get("cached_tokens", 0))
+    
+    @staticmethod
+    def _input_cost(payload: Dict[str, Any]) -> float:
+        """Estimated cost of a request cancelled in flight: its input was processed, its output unknown"""
+        return estimate_cost(payload["model"], estimate_tokens(payload["messages"]), 0)
+    
+    def supports_streaming(self, model: str) -> bool:
+        """Whether a model can stream its response"""
+        return model not in self.config.non_streaming_models
+    
+    async def _acquire_rate_limit(self, payload: Dict[str, Any]):
+        """Queue until the local request/token buckets can admit this payload"""
+        if self.rate_limiter is not None:
+            started = time.monotonic()
+            await self.rate_limiter.acquire(estimate_tokens(payload.get("messages", [])))
+            self._observe_phase("queue", time.monotonic() - started)
+    
+    @staticmethod
+    def _observe_phase(phase: str, seconds: float):
+        """Record time spent in one phase (queue, network, parse) of the current request"""
+        REQUEST_PHASE_LATENCY.observe(seconds, tool=request_tool.get(), phase=phase)
+    
+    def _observe_response(self, response: aiohttp.ClientResponse):
+        """Count the status code and feed x-ratelimit-* headers back into the local buckets"""
+        HTTP_RESPONSES.inc(status=str(response.status))
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_from_headers(response.headers)
+    
+    def _headers(self) -> Dict[str, str]:
+        """HTTP headers for every API call"""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    @staticmethod
+    def _extract_content(data: Dict[str, Any]) -> Optional[str]:
+        """Pull the completion text out of a response body, or None if it has none"""
+        if "choices" in data and data["choices"]:
+            return data["choices"][0]["message"]["content"] or ""
+        if "output_text" in data:
+            return data["output_text"] or ""
+        if "output" in data:
+            texts = [
+                part.get("text", "")
+                for item in data["output"] if item.get("type") == "message"
+                for part in item.get("content", []) if part.get("type") == "output_text"
+            ]
+            return "".join(texts)
+        return None
+    
+    async def _request(self, payload: Dict[str, Any], base_url: Optional[str] = None) -> Completion:
+        """POST a payload to the Responses API (at base_url, default OPENAI_BASE_URL) and return the completion"""
+        headers = self._headers()
+        
+        # o3-pro uses the Responses API endpoint
+        url = f"{base_url or self.base_url}/v1/responses"
+        
+        await self._acquire_rate_limit(payload)
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._session_scope() as session:
                 # Set a long timeout for o3-pro as it can take several minutes
                 timeout = aiohttp.ClientTimeout(total=600)  # 10 minutes
+                started = time.monotonic()
                 
                 async with session.post(
                     url, 
                     headers=headers, 
-                    json=payload,
+                    data=self.json.dumps(payload),
                     timeout=timeout
                 ) as response:
+                    self._observe_response(response)
                     if response.status == 200:
-                        data = await response.json()
+                        raw = await response.read()
+                        received = time.monotonic()
+                        self._observe_phase("network", received - started)
+                        data = self.json.loads(raw)
                         # Extract response from the Responses API format
-                        if "choices" in data and data["choices"]:
-                            return data["choices"][0]["message"]["content"] or ""
+                        content = self._extract_content(data)
+                        self._observe_phase("parse", time.monotonic() - received)
+                        if content is not None:
+                            return Completion(content, normalize_usage(data.get("usage")))
                         else:
                             logger.error(f"Unexpected response format: {data}")
-                            return "Error: Unexpected response format"
+                            return Completion("Error: Unexpected response format", {}, cacheable=False)
                     else:
                         error_text = await response.text()
                         logger.error(f"OpenAI API error: {response.status} - {error_text}")
-                        raise Exception(f"API Error: {response.status} - {error_text}")
-                        
+                        raise self.retry.error_for_status(response.status, error_text, response.headers)
+
+        except asyncio.CancelledError:
+            # Unwinding the request context closes the connection, which ends the upstream request
+            UPSTREAM_CANCELLATIONS.inc(tool=request_tool.get(), mode="connection")
+            raise
         except asyncio.TimeoutError:
             logger.error("Request timed out. o3-pro can take several minutes for complex requests.")
-            raise Exception("Request timed out. Try using background mode for long-running requests.")
+            raise FatalAPIError("Request timed out. Try using background mode (background: true) for long-running requests.")
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
     
-    async def complete_with_reasoning(
+    @staticmethod
+    async def _iter_sse(response: aiohttp.ClientResponse) -> AsyncIterator[str]:
+        """Yield the data field of each server-sent event"""
+        data_lines: List[str] = []
+        async for raw_line in response.content:
+            line = raw_line.decode("utf-8").rstrip("\r\n")
+            if not line:
+                if data_lines:
+                    yield "\n".join(data_lines)
+                    data_lines = []
+            elif line.startswith("data:"):
+                data_lines.append(line[5:].lstrip())
+        if data_lines:
+            yield "\n".join(data_lines)
+    
+    @staticmethod
+    def _extract_delta(event: Dict[str, Any]) -> str:
+        """Pull the text increment out of a streaming event"""
+        if event.get("type") == "response.output_text.delta":
+            return event.get("delta", "")
+        if "choices" in event and event["choices"]:
+            return event["choices"][0].get("delta", {}).get("content") or ""
+        return ""
+    
+    async def _request_stream(self, payload: Dict[str, Any]) -> Completion:
+        """
+        POST a payload with stream enabled and assemble the text as it arrives
+        
+        Progress is reported to the active progress_reporter. If the request
+        times out after some text has arrived, the partial text is returned.
+        """
+        url = f"{self.base_url}/v1/responses"
+        report = progress_reporter.get()
+        loop = asyncio.get_running_loop()
+        interval = self.config.stream_progress_interval
+        last_report = 0.0
+        chunks: List[str] = []
+        received = 0
+        usage: Dict[str, int] = {}
+        
+        await self._acquire_rate_limit(payload)
+        
+        try:
+            async with self._session_scope() as session:
+                timeout = aiohttp.ClientTimeout(total=600)  # 10 minutes
+                started = time.monotonic()
+                
+                async with session.post(
+                    url,
+                    headers=self._headers(),
+                    data=self.json.dumps({**payload, "stream": True}),
+                    timeout=timeout
+                ) as response:
+                    self._observe_response(response)
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.error(f"OpenAI API error: {response.status} - {error_text}")
+                        raise self.retry.error_for_status(response.status, error_text, response.headers)
+                    
+                    async for data in self._iter_sse(response):
+                        if data == "[DONE]":
+                            break
+                        event = self.json.loads(data)
+                        if event.get("type") in ("error", "response.failed"):
+                            error = event.get("error") or event.get("response", {}).get("error") or {}
+                            raise FatalAPIError(f"Streaming error: {error.get('message', event)}")
+                        
+                        if event.get("usage") or event.get("response", {}).get("usage"):
+                            usage = normalize_usage(event.get("usage") or event["response"]["usage"])
+                        
+                        delta = self._extract_delta(event)
+                        if not delta:
+                            continue
+                        chunks.append(delta)
+                        received += len(delta)
+                        
+                        if report is not None and loop.time() - last_report >= interval:
+                            last_report = loop.time()
+                            await report(received, f"Received {received} characters")
+                    
+                    # Parsing is interleaved with the transfer, so the whole stream counts as network time
+                    self._observe_phase("network", time.monotonic() - started)
+
+        except asyncio.CancelledError:
+            UPSTREAM_CANCELLATIONS.inc(tool=request_tool.get(), mode="connection")
+            raise
+        except asyncio.TimeoutError:
+            if not chunks:
+                logger.error("Request timed out. o3-pro can take several minutes for complex requests.")
+                raise FatalAPIError("Request timed out. Try using background mode (background: true) for long-running requests.")
+            logger.warning(f"Streaming request timed out; returning {received} characters of partial output")
+            partial = "".join(chunks) + "\n\n[Response incomplete: the request timed out before the model finished]"
+            return Completion(partial, usage, cacheable=False)
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+        
+        if report is not None:
+            await report(received, "Response complete")
+        return Completion("".join(chunks), usage)
+    
+    async def _call(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a short API call, retrying transient failures, and return the decoded JSON body"""
+        return await self.retry.run(lambda: self._call_once(method, path, payload), f"{method} {path}")
+    
+    async def _call_once(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a single short API call and return the decoded JSON body"""
+        url = f"{self.base_url}{path}"
+        timeout = aiohttp.ClientTimeout(total=60)
+        if payload is not None:
+            await self._acquire_rate_limit(payload)
+        started = time.monotonic()
+        async with self._session_scope() as session:
+            async with session.request(
+                method,
+                url,
+                headers=self._headers(),
+                data=self.json.dumps(payload) if payload is not None else None,
+                timeout=timeout
+            ) as response:
+                self._observe_response(response)
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"OpenAI API error: {response.status} - {error_text}")
+                    raise self.retry.error_for_status(response.status, error_text, response.headers)
+                raw = await response.read()
+                received = time.monotonic()
+                self._observe_phase("network", received - started)
+                data = self.json.loads(raw)
+                self._observe_phase("parse", time.monotonic() - received)
+                return data
+    
+    async def _request_background(self, payload: Dict[str, Any]) -> Completion:
+        """
+        Submit a payload in background mode and poll until it finishes
+        
+        Each poll is a short request, so no connection is held open while
+        o3-pro works. Cancelling the awaiting task cancels the upstream response.
+        """
+        data = await self._call("POST", "/v1/responses", {**payload, "background": True, "store": True})
+        response_id = data["id"]
+        logger.info(f"Submitted background response {response_id}")
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.background_timeout
+        try:
+            while data.get("status") in ("queued", "in_progress"):
+                if loop.time() >= deadline:
+                    raise FatalAPIError(
+                        f"Background response {response_id} did not finish within "
+                        f"{self.config.background_timeout:.0f}s"
+                    )
+                await asyncio.sleep(self.config.background_poll_interval)
+                data = await self._call("GET", f"/v1/responses/{response_id}")
+        except BaseException:
+            # Stop paying for a response nobody will read
+            UPSTREAM_CANCELLATIONS.inc(tool=request_tool.get(), mode="background")
+            await asyncio.shield(self.cancel_response(response_id))
+            raise
+        
+        status = data.get("status")
+        if status != "completed":
+            error = data.get("error") or {}
+            raise FatalAPIError(f"Background response {response_id} {status}: {error.get('message', 'no details')}")
+        
+        content = self._extract_content(data)
+        if content is None:
+            logger.error(f"Unexpected response format: {data}")
+            return Completion("Error: Unexpected response format", {}, cacheable=False)
+        return Completion(content, normalize_usage(data.get("usage")))
+    
+    async def upload_file(self, data: bytes, filename: str, purpose: str = "batch") -> Dict[str, Any]:
+        """Upload a file (e.g. batch input JSONL) and return the file object"""
+        async def upload() -> Dict[str, Any]:
+            form = aiohttp.FormData()
+            form.add_field("purpose", purpose)
+            form.add_field("file", data, filename=filename, content_type="application/jsonl")
+            async with self._session_scope() as session:
+                async with session.post(
+                    f"{self.base_url}/v1/files",
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    data=form,
+                    timeout=aiohttp.ClientTimeout(total=300)
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.error(f"OpenAI API error: {response.status} - {error_text}")
+                        raise self.retry.error_for_status(response.status, error_text, response.headers)
+                    return self.json.loads(await response.read())
+        
+        return await self.retry.run(upload, "file upload")
+    
+    async def download_file(self, file_id: str) -> bytes:
+        """Download the contents of a file (e.g. batch output JSONL)"""
+        async def download() -> bytes:
+            async with self._session_scope() as session:
+                async with session.get(
+                    f"{self.base_url}/v1/files/{file_id}/content",
+                    headers=self._headers(),
+                    timeout=aiohttp.ClientTimeout(total=300)
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.error(f"OpenAI API error: {response.status} - {error_text}")
+                        raise self.retry.error_for_status(response.status, error_text, response.headers)
+                    return await response.read()
+        
+        return await self.retry.run(download, f"download {file_id}")
+    
+    async def create_batch(self, input_file_id: str, metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Create a Batch API job over an uploaded JSONL file of /v1/responses requests"""
+        return await self._call("POST", "/v1/batches", {
+            "input_file_id": input_file_id,
+            "endpoint": "/v1/responses",
+            "completion_window": self.config.bulk_completion_window,
+            "metadata": metadata or {}
+        })
+    
+    async def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Fetch a Batch API job"""
+        return await self._call("GET", f"/v1/batches/{batch_id}")
+    
+    async def cancel_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Cancel a Batch API job"""
+        return await self._call("POST", f"/v1/batches/{batch_id}/cancel")
+    
+    async def cancel_response(self, response_id: str) -> bool:
+        """Ask the API to cancel a background response; returns False if that failed"""
+        try:
+            await self._call("POST", f"/v1/responses/{response_id}/cancel")
+            logger.info(f"Cancelled background response {response_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Could not cancel background response {response_id}: {e}")
+            return False
+    
+    def reasoning_messages(
         self,
         messages: List[Dict[str, str]],
-        reasoning_depth: Optional[str] = None,
-        **kwargs
-    ) -> Dict[str, Any]:
+        reasoning_depth: Optional[str] = None
+    ) -> List[Dict[str, str]]:
         """
-        Complete with explicit reasoning steps (for o3_pro)
-        o3-pro naturally provides reasoning in its responses
-        
-        Returns dict with 'reasoning' and 'answer' keys
+        Return a copy of messages with the reasoning instruction for the given depth added
+
+        The instruction goes at the end of the system message so it stays part
+        of the static prompt prefix the provider can cache.
         """
         depth = reasoning_depth or self.config.reasoning_depth
         
@@ -110,23 +712,43 @@ class OpenAIClient:
             "high": "Provide detailed reasoning, exploring multiple approaches and trade-offs before arriving at your answer."
         }
         
-        # Modify the last user message to include reasoning instruction
+        return self._append_to_system(messages, reasoning_prompts[depth])
+    
+    @staticmethod
+    def _append_to_system(messages: List[Dict[str, str]], text: str) -> List[Dict[str, str]]:
+        """Return a copy of messages with text appended to the system message (added if missing)"""
         messages_copy = messages.copy()
-        if messages_copy and messages_copy[-1]["role"] == "user":
-            messages_copy[-1]["content"] = f"{messages_copy[-1]['content']}\n\n{reasoning_prompts[depth]}"
-        
-        response = await self.complete(messages_copy, **kwargs)
-        
-        # Parse reasoning and answer
-        # o3-pro typically includes reasoning in its responses
-        parts = response.split("\n\n")
-        if len(parts) >= 2:
-            return {
-                "reasoning": "\n\n".join(parts[:-1]),
-                "answer": parts[-1]
-            }
+        if messages_copy and messages_copy[0]["role"] == "system":
+            first = messages_copy[0]
+            messages_copy[0] = {**first, "content": f"{first['content']}\n\n{text}"}
         else:
-            return {
-                "reasoning": "",
-                "answer": response
-            }
\ No newline at end of file
+            messages_copy.insert(0, {"role": "system", "content": text})
+        return messages_copy
+    
+    async def complete_with_reasoning(
+        self,
+        messages: List[Dict[str, str]],
+        reasoning_depth: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Complete with explicit reasoning steps (for o3_pro)
+        
+        The reasoning and the answer are requested as separate fields of a
+        JSON-schema response, so neither depends on how the text is laid out.
+        
+        Returns dict with 'reasoning' and 'answer' keys
+        """
+        messages_copy = self.reasoning_messages(messages, reasoning_depth)
+        
+        response = await self.complete(messages_copy, depth=reasoning_depth, text=REASONED_ANSWER_FORMAT, **kwargs)
+        
+        try:
+            data = self.json.loads(response)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and isinstance(data.get("answer"), str):
+            return {"reasoning": str(data.get("reasoning") or ""), "answer": data["answer"]}
+        
+        # Not in the requested format (an error message, a partial streamed response): all of it is the answer
+        return {"reasoning": "", "answer": response}
\ No newline at end of file
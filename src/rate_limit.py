@@ -0,0 +1,124 @@
+"""
+Client-side token-bucket rate limiting for request and token quotas
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: str) -> Optional[float]:
+    """Parse an x-ratelimit-reset-* value such as "1s", "6m0s" or "20ms" into seconds"""
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """A bucket refilling continuously to `capacity` once per minute; None capacity means unlimited"""
+
+    def __init__(self, per_minute: Optional[float]):
+        self.capacity = per_minute
+        self.tokens = per_minute or 0.0
+        self.updated = time.monotonic()
+
+    @property
+    def limited(self) -> bool:
+        return self.capacity is not None
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.limited:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)"""
+        if not self.limited:
+            return 0.0
+        self._refill()
+        # A single request larger than the whole bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60 / self.capacity
+
+    def consume(self, amount: float):
+        if self.limited:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float], reset: Optional[float]):
+        """Align the bucket with the server's view of the quota"""
+        if limit is not None and limit > 0:
+            if self.capacity != limit:
+                logger.info(f"Rate limit updated from headers: {limit:.0f}/min")
+            if self.capacity is None:
+                self.tokens = limit
+            self.capacity = limit
+        if not self.limited or remaining is None:
+            return
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0 and reset:
+            # Empty until the server's window resets
+            self.tokens = -reset * self.capacity / 60
+
+
+class RateLimiter:
+    """Queue callers until both the requests-per-minute and tokens-per-minute buckets have room"""
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._lock = asyncio.Lock()
+        self.stats: Dict[str, float] = {"acquired": 0, "waited": 0, "wait_seconds": 0.0}
+
+    @classmethod
+    def from_config(cls, config) -> "RateLimiter":
+        """Build a limiter from Config settings (0 leaves a quota unlimited until headers report it)"""
+        return cls(rpm=config.rate_limit_rpm or None, tpm=config.rate_limit_tpm or None)
+
+    async def acquire(self, tokens: int):
+        """Wait in FIFO order until one request and `tokens` tokens can be spent"""
+        async with self._lock:
+            waited = 0.0
+            while True:
+                delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if delay <= 0:
+                    break
+                if not waited:
+                    logger.info(f"Rate limit reached; queueing request for {delay:.1f}s")
+                await asyncio.sleep(delay)
+                waited += delay
+
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.stats["acquired"] += 1
+            if waited:
+                self.stats["waited"] += 1
+                self.stats["wait_seconds"] += waited
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Apply x-ratelimit-* response headers to both buckets"""
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            bucket.sync(
+                _to_float(headers.get(f"x-ratelimit-limit-{kind}")),
+                _to_float(headers.get(f"x-ratelimit-remaining-{kind}")),
+                parse_reset(headers.get(f"x-ratelimit-reset-{kind}", ""))
+            )
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
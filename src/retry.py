@@ -0,0 +1,103 @@
+"""
+Retry policy with exponential backoff, full jitter and Retry-After support
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Mapping, Optional, Tuple, Type
+
+import aiohttp
+
+from .errors import APIError, FatalAPIError, RetryableAPIError, parse_retry_after
+from .metrics import RETRIES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRYABLE_EXCEPTIONS: Tuple[Type[BaseException], ...] = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+)
+
+
+class RetryPolicy:
+    """Decide which failures to retry and how long to wait between attempts"""
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        deadline: float = 900.0,
+        retryable_statuses: FrozenSet[int] = frozenset({408, 409, 429, 500, 502, 503, 504}),
+        retryable_exceptions: Tuple[Type[BaseException], ...] = DEFAULT_RETRYABLE_EXCEPTIONS
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retryable_statuses = retryable_statuses
+        self.retryable_exceptions = retryable_exceptions
+        self.stats: Dict[str, int] = {"retries": 0, "retried_calls": 0, "exhausted": 0}
+
+    @classmethod
+    def from_config(cls, config) -> "RetryPolicy":
+        """Build a policy from Config settings"""
+        return cls(
+            max_attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay,
+            deadline=config.retry_deadline,
+            retryable_statuses=frozenset(config.retry_statuses)
+        )
+
+    def error_for_status(self, status: int, text: str, headers: Mapping[str, str]) -> APIError:
+        """Build the typed error for a non-200 response"""
+        message = f"API Error: {status} - {text}"
+        if status in self.retryable_statuses:
+            return RetryableAPIError(message, status, parse_retry_after(headers))
+        return FatalAPIError(message, status)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before the next attempt: full jitter, but never sooner than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def run(self, fn: Callable[[], Awaitable[Any]], description: str = "request") -> Any:
+        """Await fn(), retrying transient failures until attempts or the deadline run out"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        attempt = 0
+
+        while True:
+            try:
+                result = await fn()
+                if attempt:
+                    logger.info(f"{description} succeeded after {attempt} retries")
+                return result
+            except RetryableAPIError as e:
+                error: BaseException = e
+                retry_after = e.retry_after
+            except self.retryable_exceptions as e:
+                error = e
+                retry_after = None
+
+            attempt += 1
+            delay = self.backoff(attempt - 1, retry_after)
+            if attempt >= self.max_attempts or loop.time() + delay > deadline:
+                self.stats["exhausted"] += 1
+                logger.error(f"{description} failed after {attempt} attempts: {error}")
+                if isinstance(error, APIError):
+                    raise error
+                raise RetryableAPIError(f"Connection error after {attempt} attempts: {error}") from error
+
+            if attempt == 1:
+                self.stats["retried_calls"] += 1
+            self.stats["retries"] += 1
+            RETRIES.inc()
+            logger.warning(
+                f"{description} failed ({error}); retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,116 @@
+"""
+Per-call model routing across fast, standard and deep tiers, with an optional escalation cascade
+"""
+
+import logging
+import re
+from typing import Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("fast", "standard", "deep")
+
+# Appended to the system prompt of a cascade's first attempt
+SELF_CHECK_INSTRUCTION = (
+    "After your answer, rate how confident you are that it is correct and complete "
+    "on a final line of the form 'Confidence: N/10'. Use a low score if the task needs "
+    "deeper analysis than you were able to give."
+)
+_CONFIDENCE_LINE = re.compile(r"\n*\s*\**confidence\**\s*:\s*\**(\d+(?:\.\d+)?)\s*/\s*10\**\s*$", re.IGNORECASE)
+
+
+class RouteDecision(NamedTuple):
+    """The tier and model chosen for a call, and why"""
+    tier: str
+    model: str
+    reason: str
+    cascade: bool = False
+
+
+class Router:
+    """
+    Choose a model tier per call
+
+    In order: an explicit tier argument, the tool's pinned tier (TOOL_TIERS),
+    the requested reasoning depth (high -> deep, low -> fast), then input size.
+    With the cascade enabled, calls routed below deep by size alone go to the
+    fast model first and escalate to deep when its self-reported confidence
+    is too low.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, str],
+        tool_tiers: Optional[Dict[str, str]] = None,
+        fast_max_tokens: int = 2000,
+        standard_max_tokens: int = 20000,
+        cascade: bool = False,
+        min_confidence: float = 7
+    ):
+        self.models = models
+        self.tool_tiers = tool_tiers or {}
+        self.fast_max_tokens = fast_max_tokens
+        self.standard_max_tokens = standard_max_tokens
+        self.cascade = cascade
+        self.min_confidence = min_confidence
+        # Moving average latency per model, used to estimate the time a cheaper tier saved
+        self._latency: Dict[str, float] = {}
+
+    @classmethod
+    def from_config(cls, config) -> "Router":
+        """Build a router from Config settings"""
+        return cls(
+            models={"deep": config.openai_model, **config.model_tiers},
+            tool_tiers=config.tool_tiers,
+            fast_max_tokens=config.routing_fast_max_tokens,
+            standard_max_tokens=config.routing_standard_max_tokens,
+            cascade=config.cascade_enabled,
+            min_confidence=config.cascade_min_confidence
+        )
+
+    def route(
+        self,
+        tool: Optional[str],
+        input_tokens: int,
+        depth: Optional[str] = None,
+        tier: Optional[str] = None
+    ) -> RouteDecision:
+        """Pick the tier and model for one call"""
+        if tier is not None:
+            if tier not in TIERS:
+                raise ValueError(f"Unknown tier: {tier} (expected fast, standard or deep)")
+            return RouteDecision(tier, self.models[tier], "explicit")
+        if tool in self.tool_tiers:
+            pinned = self.tool_tiers[tool]
+            return RouteDecision(pinned, self.models[pinned], "tool")
+        if depth == "high":
+            return RouteDecision("deep", self.models["deep"], "depth")
+        if depth == "low":
+            return RouteDecision("fast", self.models["fast"], "depth")
+
+        if input_tokens <= self.fast_max_tokens:
+            chosen = "fast"
+        elif input_tokens <= self.standard_max_tokens:
+            chosen = "standard"
+        else:
+            chosen = "deep"
+        return RouteDecision(chosen, self.models[chosen], "size", cascade=self.cascade and chosen != "deep")
+
+    def check(self, content: str) -> Tuple[bool, str]:
+        """Whether a cascade attempt passes its self-check, and the content without the confidence line"""
+        match = _CONFIDENCE_LINE.search(content)
+        if match is None:
+            return False, content
+        return float(match.group(1)) >= self.min_confidence, content[:match.start()].rstrip()
+
+    def observe(self, model: str, latency: float):
+        """Fold a finished call's latency into the model's moving average"""
+        previous = self._latency.get(model)
+        self._latency[model] = latency if previous is None else 0.8 * previous + 0.2 * latency
+
+    def latency_saved(self, model: str, latency: float) -> Optional[float]:
+        """Estimated seconds saved by serving a call with model instead of the deep tier"""
+        deep = self._latency.get(self.models["deep"])
+        if deep is None or model == self.models["deep"]:
+            return None
+        return max(0.0, deep - latency)
@@ -0,0 +1,134 @@
+"""
+Priority scheduler with global and per-tool concurrency limits
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class _Waiter:
+    """A queued tool call waiting for a slot"""
+
+    def __init__(self, tool: str, priority: int, seq: int):
+        self.tool = tool
+        self.priority = priority
+        self.seq = seq
+        self.future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+
+    def sort_key(self):
+        return (self.priority, self.seq)
+
+
+class Scheduler:
+    """
+    Admit tool calls in priority order (FIFO within a priority)
+
+    A waiter whose tool is at its own cap does not block lower-priority
+    calls for other tools, so a burst of heavy calls cannot starve quick ones.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        tool_limits: Optional[Dict[str, int]] = None,
+        tool_priorities: Optional[Dict[str, str]] = None
+    ):
+        self.max_concurrent = max_concurrent
+        self.tool_limits = tool_limits or {}
+        self.tool_priorities = tool_priorities or {}
+        self._queue: List[_Waiter] = []
+        self._running: Dict[str, int] = {}
+        self._total_running = 0
+        self._seq = itertools.count()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_config(cls, config) -> "Scheduler":
+        """Build a scheduler from Config settings"""
+        return cls(
+            max_concurrent=config.max_concurrent_requests,
+            tool_limits=config.tool_concurrency,
+            tool_priorities=config.tool_priorities
+        )
+
+    def priority_for(self, tool: str, priority: Optional[str] = None) -> int:
+        """Resolve the per-call priority, falling back to the tool's and then to normal"""
+        name = priority or self.tool_priorities.get(tool, "normal")
+        if name not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {name} (expected high, normal or low)")
+        return PRIORITIES[name]
+
+    @asynccontextmanager
+    async def slot(self, tool: str, priority: Optional[str] = None) -> AsyncIterator[float]:
+        """Wait for a slot for tool and hold it for the duration of the block; yields the queue wait"""
+        waiter = _Waiter(tool, self.priority_for(tool, priority), next(self._seq))
+        self._queue.append(waiter)
+        started = time.monotonic()
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._queue:
+                self._queue.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as we were cancelled: hand the slot back
+                self._release(tool)
+            raise
+
+        waited = time.monotonic() - started
+        self._record_wait(tool, waited)
+        if waited >= 0.1:
+            logger.info(f"{tool} waited {waited:.2f}s in the scheduler queue")
+
+        try:
+            yield waited
+        finally:
+            self._release(tool)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Running and queued calls per tool"""
+        tools = set(self._running) | {w.tool for w in self._queue}
+        return {
+            tool: {
+                "running": self._running.get(tool, 0),
+                "queued": sum(1 for w in self._queue if w.tool == tool)
+            }
+            for tool in sorted(tools)
+        }
+
+    def _has_capacity(self, tool: str) -> bool:
+        if self._total_running >= self.max_concurrent:
+            return False
+        limit = self.tool_limits.get(tool)
+        return limit is None or self._running.get(tool, 0) < limit
+
+    def _dispatch(self):
+        """Admit as many queued waiters as the limits allow, best priority first"""
+        for waiter in sorted(self._queue, key=_Waiter.sort_key):
+            if self._total_running >= self.max_concurrent:
+                break
+            if self._has_capacity(waiter.tool):
+                self._queue.remove(waiter)
+                self._running[waiter.tool] = self._running.get(waiter.tool, 0) + 1
+                self._total_running += 1
+                waiter.future.set_result(None)
+
+    def _release(self, tool: str):
+        self._running[tool] -= 1
+        self._total_running -= 1
+        self._dispatch()
+
+    def _record_wait(self, tool: str, waited: float):
+        stats = self.stats.setdefault(tool, {"calls": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0})
+        stats["calls"] += 1
+        stats["wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
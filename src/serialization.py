@@ -0,0 +1,77 @@
+"""
+JSON encoding and decoding of request and response bodies
+"""
+
+import json
+import math
+from typing import Any, Callable, NamedTuple, Union
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the standard library encoder
+    orjson = None
+
+BACKENDS = ("auto", "orjson", "json")
+
+
+class Serializer(NamedTuple):
+    """
+    A JSON backend: dumps returns UTF-8 bytes ready to send, loads accepts bytes or str
+
+    canonical returns the sorted-key compact form used for content hashing.
+    It is byte-identical across backends, so cache and cassette keys do not
+    change with JSON_BACKEND.
+    """
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[Union[bytes, str]], Any]
+    canonical: Callable[[Any], bytes]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    # ASCII escaping is the stdlib encoder's fast path; the result is valid UTF-8 either way
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _json_canonical(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _has_exponent_floats(obj: Any) -> bool:
+    """Whether obj holds a float the standard library writes in exponent form (1e-05) or as NaN/Infinity"""
+    if isinstance(obj, float):
+        return not math.isfinite(obj) or "e" in repr(obj)
+    if isinstance(obj, dict):
+        return any(_has_exponent_floats(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_exponent_floats(value) for value in obj)
+    return False
+
+
+def _orjson_canonical(obj: Any) -> bytes:
+    # orjson matches the standard library byte for byte except on such floats (0.00001, 1e20, null)
+    if _has_exponent_floats(obj):
+        return _json_canonical(obj)
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+
+
+STDLIB = Serializer("json", _json_dumps, json.loads, _json_canonical)
+
+ORJSON = Serializer("orjson", orjson.dumps, orjson.loads, _orjson_canonical) if orjson is not None else None
+
+
+def get_serializer(backend: str = "auto") -> Serializer:
+    """Serializer for a JSON_BACKEND value; "auto" prefers orjson when it is installed"""
+    if backend == "json":
+        return STDLIB
+    if backend == "orjson":
+        if ORJSON is None:
+            raise ValueError("JSON_BACKEND is orjson but orjson is not installed (pip install orjson)")
+        return ORJSON
+    if backend != "auto":
+        raise ValueError(f"Unknown JSON backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return ORJSON or STDLIB
+
+
+# Used where no Config is at hand, e.g. for cache keys
+DEFAULT = get_serializer()
@@ -9,17 +9,24 @@ import json
 import logging
 import os
 import sys
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional, Union
 
+import jsonschema
 from mcp.server import Server
-from mcp.server.models import InitializationOptions
+from mcp.server.stdio import stdio_server
 import mcp.types as types
 
-from tools import (
-    CodeTool, AnalyzeTool, DebugTool, RefactorTool,
-    ReviewTool, SafetyReviewTool, ReasoningTool
+# The OpenAI client, aiohttp and the tool modules are imported on first use
+# so that the server answers initialize and tools/list quickly
+from .tools.registry import TOOL_SPECS, ToolSpec, load_class, load_manifest, tool_metadata
+from .config import Config
+from .jobs import JobManager
+from .metrics import (
+    CANCELLATION_SAVED_SECONDS, NEAR_DUPLICATE_LOOKUPS, REGISTRY, REQUEST_PHASE_LATENCY, TOOL_CALLS, TOOL_LATENCY
 )
-from config import Config
+from .scheduler import Scheduler
+from .similarity import NearDuplicateIndex
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,26 +35,91 @@ class OpenAIMCPServer:
     def __init__(self):
         self.server = Server("claude-openai-mcp")
         self.config = Config()
-        self.tools = {}
-        self._initialize_tools()
+        self._client = None
+        self._bulk_runner = None
+        self.jobs = JobManager()
+        self.scheduler = Scheduler.from_config(self.config)
+        self.near_duplicates: Optional[NearDuplicateIndex] = (
+            NearDuplicateIndex.from_config(self.config) if self.config.near_duplicate_enabled else None
+        )
+        # Tools are instantiated on first call; see get_tool
+        self.tools: Dict[str, Any] = {}
+        self._specs = {spec.name: spec for spec in TOOL_SPECS}
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        self._tool_list = [types.Tool(**entry) for entry in self._manifest.values()]
+        self._validators: Dict[str, Any] = {}
         self._setup_handlers()
     
-    def _initialize_tools(self):
-        """Initialize all available tools"""
-        tool_classes = [
-            CodeTool,
-            AnalyzeTool,
-            DebugTool,
-            RefactorTool,
-            ReviewTool,
-            SafetyReviewTool,
-            ReasoningTool
-        ]
+    @property
+    def client(self):
+        """The server-wide OpenAI client, created on first use"""
+        if self._client is None:
+            from .openai_client import OpenAIClient
+            self._client = OpenAIClient(self.config)
+        return self._client
+    
+    @property
+    def bulk_runner(self):
+        """Runner for the OpenAI Batch API, created on first use"""
+        if self._bulk_runner is None:
+            from .bulk import BulkRunner
+            self._bulk_runner = BulkRunner(self.client)
+        return self._bulk_runner
+    
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Precomputed tool metadata by name, regenerated from the tools if manifest.json is missing"""
+        try:
+            entries = load_manifest()
+        except FileNotFoundError:
+            logger.warning("src/tools/manifest.json is missing; building tool metadata from the tools")
+            # get_tool checks tools against the manifest, and there is none to check against yet
+            self._manifest = {}
+            entries = [tool_metadata(self.get_tool(spec.name)) for spec in TOOL_SPECS]
+        return {entry["name"]: entry for entry in entries}
+    
+    def get_tool(self, name: str):
+        """Return the named tool, importing and constructing it on first use"""
+        tool = self.tools.get(name)
+        if tool is not None:
+            return tool
+        spec = self._specs.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown tool: {name}")
+        tool = self._create_tool(spec)
+        self.tools[name] = tool
+        logger.info(f"Initialized tool: {name}")
         
-        for tool_class in tool_classes:
-            tool = tool_class(self.config)
-            self.tools[tool.name] = tool
-            logger.info(f"Initialized tool: {tool.name}")
+        expected = self._manifest.get(name)
+        if expected is not None and tool_metadata(tool) != expected:
+            logger.warning(f"{name}: metadata differs from src/tools/manifest.json; run python -m src.tools.registry")
+        return tool
+    
+    def _create_tool(self, spec: ToolSpec):
+        tool_class = load_class(spec)
+        if spec.kind == "batch":
+            # Files go through _run_tool so each one is scheduled and measured like a direct call
+            return tool_class(self.config, self.client, self.get_tool(spec.targets[0]), self._run_tool)
+        if spec.kind == "jobs":
+            return tool_class(self.config, self.client, self.jobs)
+        if spec.kind == "bulk":
+            return tool_class(self.config, self.client, self.bulk_runner)
+        if spec.kind == "bulk_submit":
+            # Bulk mode sends the same per-file requests through the OpenAI Batch API
+            targets = {target: self.get_tool(target) for target in spec.targets}
+            return tool_class(self.config, self.client, self.bulk_runner, targets)
+        if spec.kind == "status":
+            return tool_class(self.config, self.client, self.scheduler, self.jobs)
+        return tool_class(self.config, self.client)
+    
+    def _validation_error(self, name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Check arguments against the tool's input schema with a validator compiled once per tool"""
+        validator = self._validators.get(name)
+        if validator is None:
+            schema = self._manifest[name]["inputSchema"]
+            validator = jsonschema.validators.validator_for(schema)(schema)
+            self._validators[name] = validator
+        error = jsonschema.exceptions.best_match(validator.iter_errors(arguments))
+        return error.message if error is not None else None
     
     def _setup_handlers(self):
         """Set up MCP protocol handlers"""
@@ -55,27 +127,40 @@ class OpenAIMCPServer:
         @self.server.list_tools()
         async def handle_list_tools() -> list[types.Tool]:
             """Return list of available tools"""
-            tools = []
-            for tool in self.tools.values():
-                tools.append(types.Tool(
-                    name=tool.name,
-                    description=tool.description,
-                    inputSchema=tool.get_schema()
-                ))
-            return tools
+            return self._tool_list
         
-        @self.server.call_tool()
+        # Arguments are validated here against validators built once per tool, not per call
+        @self.server.call_tool(validate_input=False)
         async def handle_call_tool(
             name: str,
             arguments: Optional[Dict[str, Any]] = None
-        ) -> list[types.TextContent]:
+        ) -> Union[list[types.TextContent], types.CallToolResult]:
             """Handle tool execution requests"""
-            if name not in self.tools:
+            if name not in self._specs:
                 raise ValueError(f"Unknown tool: {name}")
             
-            tool = self.tools[name]
+            arguments = arguments or {}
+            error = self._validation_error(name, arguments)
+            if error is not None:
+                return types.CallToolResult(
+                    content=[types.TextContent(type="text", text=f"Input validation error: {error}")],
+                    isError=True
+                )
+            
+            from .openai_client import progress_reporter
+            tool = self.get_tool(name)
+            
+            if tool.common_options and arguments.get("background"):
+                job = self.jobs.submit(name, self._run_tool(tool, arguments))
+                return [types.TextContent(
+                    type="text",
+                    text=f"Started background job {job.id} for {name}. "
+                         f"Use o3_job_status or o3_job_result with job_id \"{job.id}\" to collect it."
+                )]
+            
+            token = progress_reporter.set(self._progress_reporter())
             try:
-                result = await tool.execute(arguments or {})
+                result = await self._run_tool(tool, arguments)
                 return [types.TextContent(
                     type="text",
                     text=result
@@ -86,11 +171,122 @@ class OpenAIMCPServer:
                     type="text",
                     text=f"Error: {str(e)}"
                 )]
+            finally:
+                progress_reporter.reset(token)
+    
+    async def _run_tool(self, tool, arguments: Dict[str, Any]) -> str:
+        """Execute a tool once the scheduler admits it, recording its latency and outcome"""
+        started = time.monotonic()
+        status = "error"
+        try:
+            if not tool.common_options:
+                result = await tool.execute(arguments)
+            else:
+                from .openai_client import uncached_completions
+                reused = self._near_duplicate(tool, arguments)
+                if reused is not None:
+                    status = "ok"
+                    return reused
+                uncached: List[str] = []
+                token = uncached_completions.set(uncached)
+                try:
+                    if tool.scheduled:
+                        async with self.scheduler.slot(tool.name, arguments.get("priority")) as waited:
+                            REQUEST_PHASE_LATENCY.observe(waited, tool=tool.name, phase="queue")
+                            result = await tool.execute(arguments)
+                    else:
+                        result = await tool.execute(arguments)
+                finally:
+                    uncached_completions.reset(token)
+                # Only results built from completions the response cache keeps are offered for reuse
+                if self.near_duplicates is not None and not uncached and not result.startswith("Error"):
+                    self.near_duplicates.add(tool.name, arguments, result)
+            status = "ok"
+            return result
+        except asyncio.CancelledError:
+            status = "cancelled"
+            self._record_cancellation(tool.name, time.monotonic() - started)
+            raise
+        finally:
+            TOOL_CALLS.inc(tool=tool.name, status=status)
+            if status != "cancelled":
+                TOOL_LATENCY.observe(time.monotonic() - started, tool=tool.name)
+    
+    def _record_cancellation(self, tool: str, elapsed: float):
+        """
+        Log a cancelled call and estimate the upstream time it saved
+        
+        Cancellation unwinds through the scheduler, the retry loop and the
+        client, which aborts the HTTP request (or sends a cancel call for a
+        background response). The estimate is the median latency of the
+        tool's finished calls minus the time already spent, so it is zero
+        until the tool has finished a call.
+        """
+        typical = TOOL_LATENCY.quantile(0.5, tool=tool) if TOOL_LATENCY.count(tool=tool) else None
+        saved = max(0.0, typical - elapsed) if typical is not None else 0.0
+        CANCELLATION_SAVED_SECONDS.inc(saved, tool=tool)
+        logger.info(f"{tool} cancelled after {elapsed:.1f}s (about {saved:.0f}s of upstream work avoided)")
+    
+    def _near_duplicate(self, tool, arguments: Dict[str, Any]) -> Optional[str]:
+        """An earlier result for a near-identical request, with a note saying so, or None"""
+        if self.near_duplicates is None or arguments.get("no_cache") or tool.name in self.config.cache_disabled_tools:
+            return None
+        match = self.near_duplicates.lookup(tool.name, arguments)
+        NEAR_DUPLICATE_LOOKUPS.inc(tool=tool.name, result="miss" if match is None else "hit")
+        if match is None:
+            return None
+        logger.info(f"{tool.name}: reusing the result of a near-duplicate request (similarity {match.similarity:.2f})")
+        return (
+            f"_Reused the result of a near-identical request from {match.age / 60:.0f} minutes ago "
+            f"(similarity {match.similarity:.2f}). Call again with no_cache: true for a fresh answer._\n\n"
+            f"{match.result}"
+        )
+    
+    def _progress_reporter(self):
+        """Return a callback that sends MCP progress notifications for the current request, if requested"""
+        try:
+            ctx = self.server.request_context
+        except LookupError:
+            return None
+        progress_token = ctx.meta.progressToken if ctx.meta else None
+        if progress_token is None:
+            return None
+        
+        async def report(progress: int, message: str):
+            try:
+                await ctx.session.send_progress_notification(progress_token, progress, message=message)
+            except Exception as e:
+                logger.debug(f"Could not send progress notification: {e}")
+        
+        return report
+    
+    async def _start_metrics_server(self):
+        """Serve REGISTRY in Prometheus text format on METRICS_HOST:METRICS_PORT"""
+        from aiohttp import web
+        
+        async def handle_metrics(request):
+            return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8")
+        
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, self.config.metrics_host, self.config.metrics_port).start()
+        logger.info(f"Serving metrics on http://{self.config.metrics_host}:{self.config.metrics_port}/metrics")
+        return runner
     
     async def run(self):
         """Run the MCP server"""
-        async with self.server.run_stdio():
-            await self.server._stopped.wait()
+        metrics_runner = await self._start_metrics_server() if self.config.metrics_port else None
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+        finally:
+            await self.jobs.shutdown()
+            if self._client is not None:
+                await self._client.close()
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
 
 def main():
     """Main entry point"""
@@ -0,0 +1,189 @@
+"""
+Near-duplicate lookup of earlier tool results with MinHash fingerprints and an LSH index
+"""
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Free-text arguments compared by similarity; every other argument must match exactly
+FUZZY_ARGUMENTS = frozenset({
+    "code", "focus", "context", "requirements", "problem", "pr_description", "standards",
+    "goals", "constraints", "error", "expected", "stack_trace", "environment"
+})
+# Per-call options that do not change the answer
+IGNORED_ARGUMENTS = frozenset({"no_cache", "background", "priority", "stream"})
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_EMPTY = (1 << 64) - 1
+# Fields shorter than this many tokens are compared as sets of words rather than shingles
+_SHORT_FIELD_TOKENS = 24
+
+
+def _hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def features(text: str, shingle_size: int = 3) -> Set[int]:
+    """Hashed token shingles of text, ignoring case and whitespace"""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < _SHORT_FIELD_TOKENS:
+        return {_hash(token) for token in tokens}
+    return {_hash(" ".join(tokens[i:i + shingle_size])) for i in range(len(tokens) - shingle_size + 1)}
+
+
+def signature(hashes: Set[int], size: int) -> Tuple[int, ...]:
+    """
+    MinHash signature of a feature set (one-permutation variant)
+
+    Each hash falls into one of size bins and the smallest value per bin is
+    kept, so a signature costs one pass over the features. The signature of
+    a union is the element-wise minimum of the parts' signatures.
+    """
+    bins = [_EMPTY] * size
+    for value in hashes:
+        index = value % size
+        rest = value // size
+        if rest < bins[index]:
+            bins[index] = rest
+    return tuple(bins)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the sets behind two signatures"""
+    used = [(x, y) for x, y in zip(a, b) if x != _EMPTY or y != _EMPTY]
+    if not used:
+        return 1.0
+    return sum(1 for x, y in used if x == y) / len(used)
+
+
+class Match(NamedTuple):
+    """An earlier result found for a near-duplicate request"""
+    result: str
+    similarity: float
+    age: float
+
+
+class _Entry(NamedTuple):
+    scope: str
+    fields: Dict[str, Tuple[int, ...]]
+    combined: Tuple[int, ...]
+    result: str
+    created_at: float
+
+
+class NearDuplicateIndex:
+    """
+    In-memory index of earlier tool results keyed by MinHash fingerprints
+
+    A request is fingerprinted per free-text argument (code, focus,
+    context, ...). Arguments outside FUZZY_ARGUMENTS, such as language, must
+    match exactly. Candidates come from locality-sensitive hashing over the
+    combined signature. A candidate is a match when every free-text argument
+    is at least the tool's threshold similar.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        tool_thresholds: Optional[Dict[str, float]] = None,
+        max_entries: int = 1000,
+        ttl: float = 86400,
+        num_bins: int = 128,
+        bands: int = 32
+    ):
+        if num_bins % bands:
+            raise ValueError("num_bins must be a multiple of bands")
+        self.threshold = threshold
+        self.tool_thresholds = tool_thresholds or {}
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.num_bins = num_bins
+        self.bands = bands
+        self._rows = num_bins // bands
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[int]] = {}
+        self._next_id = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "entries": 0}
+
+    @classmethod
+    def from_config(cls, config) -> "NearDuplicateIndex":
+        """Build an index from Config settings"""
+        return cls(
+            threshold=config.near_duplicate_threshold,
+            tool_thresholds=config.near_duplicate_tool_thresholds,
+            max_entries=config.near_duplicate_max_entries,
+            ttl=config.cache_ttl
+        )
+
+    def _fingerprint(self, tool: str, arguments: Dict[str, Any]) -> Tuple[str, Dict[str, Tuple[int, ...]]]:
+        exact = {
+            name: value for name, value in arguments.items()
+            if name not in IGNORED_ARGUMENTS and not (name in FUZZY_ARGUMENTS and isinstance(value, str))
+        }
+        scope = hashlib.sha256(
+            (tool + ":" + json.dumps(exact, sort_keys=True, default=str)).encode("utf-8")
+        ).hexdigest()
+        fields = {
+            name: signature(features(value), self.num_bins)
+            for name, value in arguments.items()
+            if name in FUZZY_ARGUMENTS and isinstance(value, str) and value.strip()
+        }
+        return scope, fields
+
+    def _combine(self, fields: Dict[str, Tuple[int, ...]]) -> Tuple[int, ...]:
+        if not fields:
+            return (_EMPTY,) * self.num_bins
+        return tuple(map(min, *fields.values())) if len(fields) > 1 else next(iter(fields.values()))
+
+    def _band_keys(self, scope: str, combined: Tuple[int, ...]) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        return [
+            (scope, band, combined[band * self._rows:(band + 1) * self._rows])
+            for band in range(self.bands)
+        ]
+
+    def lookup(self, tool: str, arguments: Dict[str, Any]) -> Optional[Match]:
+        """Return the most similar earlier result at or above the tool's threshold, if any"""
+        scope, fields = self._fingerprint(tool, arguments)
+        combined = self._combine(fields)
+        threshold = self.tool_thresholds.get(tool, self.threshold)
+        now = time.time()
+
+        candidates: Set[int] = set()
+        for key in self._band_keys(scope, combined):
+            candidates.update(self._buckets.get(key, ()))
+
+        best: Optional[Match] = None
+        for entry_id in candidates:
+            entry = self._entries.get(entry_id)
+            if entry is None or now - entry.created_at > self.ttl or set(entry.fields) != set(fields):
+                continue
+            score = min((similarity(fields[name], entry.fields[name]) for name in fields), default=1.0)
+            if score >= threshold and (best is None or score > best.similarity):
+                best = Match(entry.result, score, now - entry.created_at)
+
+        self.stats["misses" if best is None else "hits"] += 1
+        return best
+
+    def add(self, tool: str, arguments: Dict[str, Any], result: str):
+        """Index the result of a finished request"""
+        scope, fields = self._fingerprint(tool, arguments)
+        combined = self._combine(fields)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = _Entry(scope, fields, combined, result, time.time())
+        for key in self._band_keys(scope, combined):
+            self._buckets.setdefault(key, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            old_id, old = self._entries.popitem(last=False)
+            for key in self._band_keys(old.scope, old.combined):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(old_id)
+                    if not bucket:
+                        del self._buckets[key]
+        self.stats["entries"] = len(self._entries)
@@ -0,0 +1,66 @@
+"""
+Single-flight coalescing of identical in-flight requests
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from .metrics import COALESCED
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A shared in-flight call and the number of callers waiting on it"""
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call per key; concurrent callers with the same key share its result"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.stats: Dict[str, int] = {"leaders": 0, "coalesced": 0, "failed": 0}
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn() for the first caller of key and attach later callers to the same task
+
+        Every caller receives the leader's result or exception. The underlying
+        task keeps running while at least one caller is still waiting and is
+        cancelled once all of them have gone away.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            COALESCED.inc()
+            logger.info(f"Coalesced duplicate request {key[:12]} onto in-flight call")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                logger.info(f"Cancelling request {key[:12]}: no callers left")
+                call.task.cancel()
+
+    def _finish(self, key: str, call: _Call):
+        """Forget a completed call so the next request for key starts fresh"""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.stats["failed"] += 1
@@ -0,0 +1,111 @@
+"""
+Token estimation and cost accounting for requests
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character-based estimate
+    tiktoken = None
+
+# Rough average for English text and source code
+CHARS_PER_TOKEN = 4
+
+# USD per 1M tokens (input, output); see the pricing notes in the README
+PRICES: Dict[str, Tuple[float, float]] = {
+    "o3-pro": (20.00, 80.00),
+    "o3": (2.00, 8.00),
+    "o4-mini": (1.10, 4.40),
+}
+
+# Input tokens served from the provider's prompt cache are billed at this fraction of the input price
+CACHED_INPUT_PRICE_RATIO = 0.25
+
+# Token counts of recently seen texts (e.g. system prompts sent on every call), keyed by digest
+TOKEN_COUNT_CACHE_SIZE = 512
+
+_encoding = None
+_token_counts: "OrderedDict[bytes, int]" = OrderedDict()
+
+
+def _get_encoding():
+    """Load the tokenizer once; None when tiktoken is unavailable"""
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer, using character estimate: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in text with tiktoken when installed, else estimate from its length
+
+    Without tiktoken the estimate is CHARS_PER_TOKEN characters per token.
+    Exact counts are cached under a digest of the text, so the cache holds
+    counts rather than the (possibly very large) texts themselves.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    count = _token_counts.get(key)
+    if count is not None:
+        _token_counts.move_to_end(key)
+        return count
+    count = len(encoding.encode(text, disallowed_special=()))
+    _token_counts[key] = count
+    if len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+        _token_counts.popitem(last=False)
+    return count
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimate the input tokens of a message list, including per-message overhead"""
+    return sum(count_tokens(message.get("content") or "") + 4 for message in messages)
+
+
+def price_for(model: str) -> Tuple[float, float]:
+    """(input, output) USD per 1M tokens; unknown models are priced like o3-pro to stay conservative"""
+    if model in PRICES:
+        return PRICES[model]
+    for name, price in sorted(PRICES.items(), key=lambda item: -len(item[0])):
+        if model.startswith(name):
+            return price
+    return PRICES["o3-pro"]
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """Cost in USD of a request with the given token counts; cached_tokens is the cached part of input_tokens"""
+    input_price, output_price = price_for(model)
+    billed_input = input_tokens - cached_tokens * (1 - CACHED_INPUT_PRICE_RATIO)
+    return (billed_input * input_price + output_tokens * output_price) / 1_000_000
+
+
+def cache_savings(model: str, cached_tokens: int) -> float:
+    """USD saved on a request because cached_tokens of its input hit the provider's prompt cache"""
+    input_price, _ = price_for(model)
+    return cached_tokens * input_price * (1 - CACHED_INPUT_PRICE_RATIO) / 1_000_000
+
+
+def normalize_usage(usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Map Responses API or Chat Completions usage onto input/output/reasoning/cached token counts"""
+    if not usage:
+        return {}
+    input_details = usage.get("input_tokens_details") or usage.get("prompt_tokens_details") or {}
+    output_details = usage.get("output_tokens_details") or usage.get("completion_tokens_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens", usage.get("prompt_tokens", 0)) or 0,
+        "output_tokens": usage.get("output_tokens", usage.get("completion_tokens", 0)) or 0,
+        "reasoning_tokens": output_details.get("reasoning_tokens", 0) or 0,
+        "cached_tokens": input_details.get("cached_tokens", 0) or 0,
+    }
@@ -1,23 +1,37 @@
 """
 Tools package for Claude-OpenAI MCP
+
+Tool classes are imported on first access so that listing tools does not
+load the OpenAI client and its HTTP stack.
 """
 
-from .base import BaseTool
-from .code import CodeTool
-from .analyze import AnalyzeTool
-from .debug import DebugTool
-from .refactor import RefactorTool
-from .review import ReviewTool
-from .safety_review import SafetyReviewTool
-from .reasoning import ReasoningTool
+import importlib
+
+_EXPORTS = {
+    'BaseTool': 'base',
+    'CodeTool': 'code',
+    'AnalyzeTool': 'analyze',
+    'DebugTool': 'debug',
+    'RefactorTool': 'refactor',
+    'ReviewTool': 'review',
+    'SafetyReviewTool': 'safety_review',
+    'ReasoningTool': 'reasoning',
+    'JobStatusTool': 'jobs',
+    'JobResultTool': 'jobs',
+    'JobCancelTool': 'jobs',
+    'BatchTool': 'batch',
+    'BulkSubmitTool': 'bulk',
+    'BulkStatusTool': 'bulk',
+    'BulkResultsTool': 'bulk',
+    'BulkCancelTool': 'bulk',
+    'StatusTool': 'status'
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'BaseTool',
-    'CodeTool',
-    'AnalyzeTool',
-    'DebugTool',
-    'RefactorTool',
-    'ReviewTool',
-    'SafetyReviewTool',
-    'ReasoningTool'
-]
\ No newline at end of file
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -2,13 +2,16 @@
 Code analysis tool using o3_pro
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Tuple
 from .base import BaseTool
 from ..prompts import get_prompt
 
 class AnalyzeTool(BaseTool):
     """Analyze code for quality, performance, and best practices"""
     
+    severities = ("critical", "high", "medium", "low")
+    supports_bulk = True
+    
     @property
     def name(self) -> str:
         return "o3_analyze"
@@ -38,39 +41,83 @@ class AnalyzeTool(BaseTool):
                     "type": "string",
                     "description": "Additional context about the codebase or requirements",
                     "optional": True
+                },
+                "structured": {
+                    "type": "boolean",
+                    "description": "Return compact findings (severity, line, location, message, fix) instead of a prose report (default: STRUCTURED_FINDINGS_ENABLED)",
+                    "optional": True
+                },
+                "chunked": {
+                    "type": "boolean",
+                    "description": "Split large code into chunks analyzed in parallel (default: automatic for very large inputs)",
+                    "optional": True
+                },
+                "compact": {
+                    "type": "boolean",
+                    "description": "Strip license headers, long comments, generated regions and repeated blocks before sending (default: COMPACTION_ENABLED)",
+                    "optional": True
                 }
             },
             "required": ["code", "language"]
         }
     
-    async def execute(self, arguments: Dict[str, Any]) -> str:
-        self._validate_arguments(arguments, ["code", "language"])
-        
-        code = arguments["code"]
+    def _content_builder(self, arguments: Dict[str, Any]) -> Tuple[Callable[[str], str], str]:
+        """Return a user-content builder for the code (or a chunk of it) and the tool's fixed instructions"""
         language = arguments["language"]
         focus = arguments.get("focus", "")
         context = arguments.get("context", "")
         
-        user_content = f"""Analyze the following {language} code:
-
-```{language}
-{code}
-```
+        instructions = "Provide a comprehensive analysis with specific recommendations."
+        
+        def build_content(code: str) -> str:
+            # Shared context first, then the per-call parts, so calls on the same project share a prefix
+            user_content = f"Context:\n{context}\n\n" if context else ""
+            user_content += f"""Analyze the following {language} code:
 
 Language: {language}"""
 
-        if focus:
-            user_content += f"\nFocus Area: {focus}"
+            if focus:
+                user_content += f"\nFocus Area: {focus}"
+            
+            return user_content + f"\n\n```{language}\n{code}\n```"
         
-        if context:
-            user_content += f"\n\nContext:\n{context}"
+        return build_content, instructions
+    
+    def build_request(self, arguments: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        self._validate_arguments(arguments, ["code", "language"])
+        
+        build_content, instructions = self._content_builder(arguments)
+        if self._structured(arguments):
+            messages, options = self._findings_request(get_prompt(self.name), build_content(arguments["code"]))
+            return messages, {"temperature": 0.1, **options}
+        messages = self._build_messages(get_prompt(self.name), build_content(arguments["code"]), instructions)
+        return messages, {"temperature": 0.1}
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["code", "language"])
         
-        user_content += "\n\nProvide a comprehensive analysis with specific recommendations."
+        language = arguments["language"]
+        code, line_map = self._compact(arguments, arguments["code"], language)
+        build_content, instructions = self._content_builder(arguments)
         
         system_prompt = get_prompt(self.name)
+        options = {
+            "temperature": 0.1,  # Lower temperature for analytical tasks
+            **self._client_options(arguments)
+        }
+        
+        if self._structured(arguments):
+            return await self._execute_findings(arguments, system_prompt, code, build_content, line_map, **options)
         
-        return await self._execute_with_context(
-            system_prompt,
-            user_content,
-            temperature=0.1  # Lower temperature for analytical tasks
-        )
\ No newline at end of file
+        if self._should_chunk(arguments, code):
+            result = await self._execute_chunked(
+                system_prompt, code, language, build_content, instructions, **options
+            )
+        else:
+            result = await self._execute_with_context(
+                system_prompt,
+                build_content(code),
+                instructions,
+                **options
+            )
+        return self._restore_lines(result, line_map)
\ No newline at end of file
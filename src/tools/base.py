@@ -3,19 +3,69 @@ Base tool class for all OpenAI MCP tools
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
 import logging
 
+from .. import findings as structured
+from ..chunking import split_code
+from ..compaction import compact_code, restore_line_numbers
+from ..metrics import COMPACTION_TOKENS, STRUCTURED_FINDINGS
 from ..openai_client import OpenAIClient
+from ..tokens import count_tokens
 
 logger = logging.getLogger(__name__)
 
+# Per-call options accepted by every tool on top of its own schema
+COMMON_PROPERTIES: Dict[str, Any] = {
+    "no_cache": {
+        "type": "boolean",
+        "description": "Bypass the response cache and always query the model",
+        "optional": True
+    },
+    "background": {
+        "type": "boolean",
+        "description": "Return a job id immediately and run the request in the background; use o3_job_status / o3_job_result to collect it",
+        "optional": True
+    },
+    "priority": {
+        "type": "string",
+        "enum": ["high", "normal", "low"],
+        "description": "Scheduling priority for this call (default depends on the tool)",
+        "optional": True
+    },
+    "stream": {
+        "type": "boolean",
+        "description": "Stream the response and report progress while it arrives (models that support streaming only)",
+        "optional": True
+    },
+    "tier": {
+        "type": "string",
+        "enum": ["fast", "standard", "deep"],
+        "description": "Model tier for this call when routing is enabled (default: chosen from the input)",
+        "optional": True
+    }
+}
+
 class BaseTool(ABC):
     """Abstract base class for all tools"""
     
-    def __init__(self, config):
+    # Whether the tool accepts COMMON_PROPERTIES (caching, background mode, ...)
+    common_options: bool = True
+    
+    # Whether a call holds a scheduler slot while it runs (batch tools schedule each file instead)
+    scheduled: bool = True
+    
+    # Whether build_request is implemented, so o3_bulk_submit can run the tool through the Batch API
+    supports_bulk: bool = False
+    
+    # Severity scale of tools that can return structured findings (empty: not supported)
+    severities: Tuple[str, ...] = ()
+    
+    def __init__(self, config, client: Optional[OpenAIClient] = None):
         self.config = config
-        self.client = OpenAIClient(config)
+        # Tools share the server-wide client (and its connection pool) when given one
+        self.client = client or OpenAIClient(config)
         self._name = None
         self._description = None
     
@@ -36,19 +86,49 @@ class BaseTool(ABC):
         """Return JSON schema for tool parameters"""
         pass
     
+    def get_input_schema(self) -> Dict[str, Any]:
+        """Return the tool schema extended with the common per-call options"""
+        schema = self.get_schema()
+        if not self.common_options:
+            return schema
+        return {**schema, "properties": {**schema.get("properties", {}), **COMMON_PROPERTIES}}
+    
     @abstractmethod
     async def execute(self, arguments: Dict[str, Any]) -> str:
         """Execute the tool with given arguments"""
         pass
     
+    def build_request(self, arguments: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Return the messages and sampling options execute() would send, without sending them (see supports_bulk)"""
+        raise NotImplementedError(f"{self.name} does not support bulk submission")
+    
     def _validate_arguments(self, arguments: Dict[str, Any], required: list[str]) -> None:
         """Validate required arguments are present"""
         missing = [arg for arg in required if arg not in arguments]
         if missing:
             raise ValueError(f"Missing required arguments: {', '.join(missing)}")
     
-    def _build_messages(self, system_prompt: str, user_content: str) -> list[Dict[str, str]]:
-        """Build messages list for OpenAI API"""
+    def _client_options(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-call options forwarded to the OpenAI client"""
+        use_cache = self.name not in self.config.cache_disabled_tools and not arguments.get("no_cache", False)
+        return {
+            "use_cache": use_cache,
+            "background": bool(arguments.get("background", False)),
+            "stream": arguments.get("stream"),
+            "tool": self.name,
+            "tier": arguments.get("tier")
+        }
+    
+    def _build_messages(self, system_prompt: str, user_content: str, instructions: str = "") -> list[Dict[str, str]]:
+        """
+        Build messages list for OpenAI API
+        
+        Static text (system prompt, then the tool's fixed instructions) comes
+        first so requests from the same tool share a prefix the provider can
+        cache; user_content should likewise put shared context before the code.
+        """
+        if instructions:
+            system_prompt = f"{system_prompt}\n\n{instructions}"
         return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_content}
@@ -58,10 +138,15 @@ class BaseTool(ABC):
         self,
         system_prompt: str,
         user_content: str,
+        instructions: str = "",
+        reasoning_depth: Optional[str] = None,
         **kwargs
     ) -> str:
-        """Common execution pattern for most tools"""
-        messages = self._build_messages(system_prompt, user_content)
+        """Common execution pattern for most tools; reasoning_depth adds the depth directive and routes on it"""
+        messages = self._build_messages(system_prompt, user_content, instructions)
+        if reasoning_depth is not None:
+            messages = self.client.reasoning_messages(messages, reasoning_depth)
+            kwargs["depth"] = reasoning_depth
         
         try:
             response = await self.client.complete(messages, **kwargs)
@@ -69,4 +154,194 @@ class BaseTool(ABC):
                 
         except Exception as e:
             logger.error(f"Error in {self.name}: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def _compact(self, arguments: Dict[str, Any], code: str, language: str) -> Tuple[str, Optional[List[int]]]:
+        """
+        Compact code before prompt assembly when enabled (COMPACTION_ENABLED or the compact argument)
+        
+        Returns the code to send and, when lines were removed, a map from
+        its line numbers to the original ones for _restore_lines.
+        """
+        enabled = arguments.get("compact")
+        if not (self.config.compaction_enabled if enabled is None else enabled):
+            return code, None
+        
+        result = compact_code(
+            code,
+            language,
+            max_comment_lines=self.config.compaction_max_comment_lines,
+            min_duplicate_lines=self.config.compaction_min_duplicate_lines,
+            max_line_chars=self.config.compaction_max_line_chars
+        )
+        COMPACTION_TOKENS.inc(result.tokens_before, tool=self.name, stage="before")
+        if result.tokens_after >= result.tokens_before:
+            # Markers can outweigh what they replace in small inputs
+            COMPACTION_TOKENS.inc(result.tokens_before, tool=self.name, stage="after")
+            return code, None
+        COMPACTION_TOKENS.inc(result.tokens_after, tool=self.name, stage="after")
+        logger.info(
+            f"{self.name}: compacted input from {result.tokens_before:,} to {result.tokens_after:,} tokens "
+            f"({1 - result.tokens_after / max(result.tokens_before, 1):.0%} saved; elided {result.elided})"
+        )
+        if result.line_map == list(range(1, len(result.line_map) + 1)):
+            return result.text, None
+        return result.text, result.line_map
+    
+    @staticmethod
+    def _restore_lines(text: str, line_map: Optional[List[int]]) -> str:
+        """Point line references in a response at the original, uncompacted code"""
+        return restore_line_numbers(text, line_map) if line_map else text
+    
+    def _structured(self, arguments: Dict[str, Any]) -> bool:
+        """Return structured findings when supported and enabled (STRUCTURED_FINDINGS_ENABLED or the structured argument)"""
+        if not self.severities:
+            return False
+        enabled = arguments.get("structured")
+        return self.config.structured_findings_enabled if enabled is None else bool(enabled)
+    
+    def _findings_request(self, system_prompt: str, user_content: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Messages and client options asking for findings in the JSON-schema response format"""
+        messages = self._build_messages(system_prompt, user_content, structured.instructions(self.severities))
+        return messages, {"text": structured.response_format(self.severities)}
+    
+    async def _request_findings(self, system_prompt: str, user_content: str, **kwargs) -> structured.Findings:
+        """
+        Send one request for structured findings and parse the response
+        
+        A response that is not a findings object (an error message, or a
+        model that ignored the format) comes back unparsed in summary.
+        """
+        messages, options = self._findings_request(system_prompt, user_content)
+        text = await self.client.complete(messages, **options, **kwargs)
+        try:
+            result = structured.parse_findings(text)
+        except ValueError as e:
+            if not text.startswith("Error"):
+                logger.warning(f"{self.name}: structured response could not be parsed ({e}); returning it as text")
+                STRUCTURED_FINDINGS.inc(tool=self.name, result="parse_error")
+            return structured.Findings(text, [], parsed=False)
+        STRUCTURED_FINDINGS.inc(len(result.findings), tool=self.name, result="finding")
+        return result
+    
+    async def _execute_findings(
+        self,
+        arguments: Dict[str, Any],
+        system_prompt: str,
+        code: str,
+        build_content: Callable[[str], str],
+        line_map: Optional[List[int]] = None,
+        **kwargs
+    ) -> str:
+        """
+        Structured-findings execution, chunked like _execute_chunked for large inputs
+        
+        Each chunk numbers its lines from 1 and its findings are shifted to
+        file lines, so chunk results are merged and deduplicated locally
+        instead of by a reduce request.
+        """
+        chunks = split_code(code, arguments["language"], self.config.chunk_max_tokens) if self._should_chunk(arguments, code) else []
+        if len(chunks) <= 1:
+            result = await self._request_findings(system_prompt, build_content(code), **kwargs)
+            if not result.parsed:
+                return self._restore_lines(result.summary, line_map)
+            findings = structured.map_lines(result.findings, line_map)
+            return structured.render(result._replace(findings=structured.merge(findings)))
+        
+        logger.info(f"{self.name}: analyzing {len(chunks)} chunks of up to {self.config.chunk_max_tokens} tokens")
+        semaphore = asyncio.Semaphore(self.config.chunk_concurrency)
+        
+        async def run_chunk(index: int, chunk) -> structured.Findings:
+            note = (
+                f"This is part {index} of {len(chunks)} of a larger file. Number lines from 1 at the first "
+                f"line shown and only report on this part."
+            )
+            async with semaphore:
+                return await self._request_findings(system_prompt, f"{build_content(chunk.text)}\n\n{note}", **kwargs)
+        
+        tasks = [asyncio.ensure_future(run_chunk(i, chunk)) for i, chunk in enumerate(chunks, 1)]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        findings: List[structured.Finding] = []
+        summaries = []
+        for chunk, result in zip(chunks, results):
+            span = f"Lines {self._original_line(chunk.start_line, line_map)}-{self._original_line(chunk.end_line, line_map)}"
+            if not result.parsed:
+                summaries.append(f"- {span} (unstructured response):\n{result.summary}")
+            elif result.summary:
+                summaries.append(f"- {span}: {result.summary}")
+            findings.extend(structured.map_lines(
+                structured.map_lines(result.findings, offset=chunk.start_line - 1), line_map
+            ))
+        return structured.render(structured.Findings("\n".join(summaries), structured.merge(findings)))
+    
+    @staticmethod
+    def _original_line(line: int, line_map: Optional[List[int]]) -> int:
+        return line_map[min(line, len(line_map)) - 1] if line_map else line
+    
+    def _should_chunk(self, arguments: Dict[str, Any], code: str) -> bool:
+        """Use map-reduce when asked to, or automatically for inputs above CHUNK_THRESHOLD_TOKENS"""
+        if arguments.get("chunked") is not None:
+            return bool(arguments["chunked"])
+        return count_tokens(code) > self.config.chunk_threshold_tokens
+    
+    async def _execute_chunked(
+        self,
+        system_prompt: str,
+        code: str,
+        language: str,
+        build_content: Callable[[str], str],
+        instructions: str,
+        reasoning_depth: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """
+        Map-reduce execution for large inputs
+        
+        The code is split at top-level definitions, each chunk is sent
+        through build_content concurrently (at most CHUNK_CONCURRENCY at a
+        time), and the partial results are merged by one final request.
+        A reasoning_depth applies to every chunk and to the merge.
+        """
+        kwargs["reasoning_depth"] = reasoning_depth
+        chunks = split_code(code, language, self.config.chunk_max_tokens)
+        if len(chunks) == 1:
+            return await self._execute_with_context(system_prompt, build_content(code), instructions, **kwargs)
+        
+        logger.info(f"{self.name}: analyzing {len(chunks)} chunks of up to {self.config.chunk_max_tokens} tokens")
+        semaphore = asyncio.Semaphore(self.config.chunk_concurrency)
+        
+        async def run_chunk(index: int, chunk) -> str:
+            note = (
+                f"This is part {index} of {len(chunks)} of a larger file (lines {chunk.start_line}-{chunk.end_line}). "
+                f"The first line shown is line {chunk.start_line} of the file; use file line numbers "
+                f"and only report on this part."
+            )
+            async with semaphore:
+                return await self._execute_with_context(
+                    system_prompt, f"{build_content(chunk.text)}\n\n{note}", instructions, **kwargs
+                )
+        
+        tasks = [asyncio.ensure_future(run_chunk(i, chunk)) for i, chunk in enumerate(chunks, 1)]
+        try:
+            partials = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        sections = "\n\n".join(
+            f"## Part {i} (lines {chunk.start_line}-{chunk.end_line})\n{partial}"
+            for i, (chunk, partial) in enumerate(zip(chunks, partials), 1)
+        )
+        reduce_content = f"""A {language} file was examined in {len(chunks)} parts. Merge the partial results below into a single report.
+Remove duplicates, keep line references, and order findings by severity.
+
+{sections}"""
+        
+        return await self._execute_with_context(system_prompt, reduce_content, instructions, **kwargs)
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Batch variants of the per-file tools: many files, one MCP call
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .base import BaseTool
+from ..openai_client import progress_reporter
+
+# Runs one tool call the way the server does: scheduler slot, metrics, near-duplicate reuse
+ToolRunner = Callable[[BaseTool, Dict[str, Any]], Awaitable[str]]
+
+class BatchTool(BaseTool):
+    """Run a per-file tool over many files concurrently and aggregate the results"""
+
+    # Each file takes its own scheduler slot; holding one for the whole batch as well could deadlock
+    scheduled = False
+
+    def __init__(self, config, client, target: BaseTool, runner: Optional[ToolRunner] = None):
+        super().__init__(config, client)
+        self.target = target
+        self.runner = runner
+
+    async def _run_target(self, arguments: Dict[str, Any]) -> str:
+        if self.runner is None:
+            return await self.target.execute(arguments)
+        return await self.runner(self.target, arguments)
+
+    @property
+    def name(self) -> str:
+        return f"{self.target.name}_batch"
+
+    @property
+    def description(self) -> str:
+        return (
+            f"Batch version of {self.target.name}: process many files concurrently in one call "
+            f"and return per-file results with a summary."
+        )
+
+    def get_schema(self) -> Dict[str, Any]:
+        target_schema = self.target.get_schema()
+        shared = {
+            key: {**value, "optional": True}
+            for key, value in target_schema["properties"].items()
+            if key not in ("code", "language")
+        }
+        return {
+            "type": "object",
+            "properties": {
+                "files": {
+                    "type": "array",
+                    "description": "Files to process",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "path": {"type": "string", "description": "File path or label"},
+                            "code": {"type": "string", "description": "File contents"},
+                            "language": {"type": "string", "description": "Programming language (overrides the default)"}
+                        },
+                        "required": ["path", "code"]
+                    }
+                },
+                "language": {
+                    "type": "string",
+                    "description": "Default programming language for files that do not set one",
+                    "optional": True
+                },
+                **shared
+            },
+            "required": ["files"]
+        }
+
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["files"])
+
+        files = arguments["files"]
+        if not files:
+            raise ValueError("files must contain at least one file")
+        if len(files) > self.config.batch_max_files:
+            raise ValueError(f"Too many files: {len(files)} (BATCH_MAX_FILES is {self.config.batch_max_files})")
+        for entry in files:
+            if "path" not in entry or "code" not in entry:
+                raise ValueError("Each file needs 'path' and 'code'")
+            if not (entry.get("language") or arguments.get("language")):
+                raise ValueError(f"No language given for {entry['path']}")
+
+        # Everything except the file list is shared; background applies to the batch as a whole
+        shared = {
+            key: value for key, value in arguments.items()
+            if key not in ("files", "language", "background")
+        }
+        report = progress_reporter.get()
+        semaphore = asyncio.Semaphore(self.config.batch_concurrency)
+        started = time.monotonic()
+        done = 0
+
+        async def run_file(entry: Dict[str, Any]) -> Tuple[str, bool, float]:
+            nonlocal done
+            # Only the batch reports progress, not the calls for each file
+            progress_reporter.set(None)
+            async with semaphore:
+                file_started = time.monotonic()
+                try:
+                    result = await self._run_target({
+                        **shared,
+                        "code": entry["code"],
+                        "language": entry.get("language") or arguments["language"]
+                    })
+                    ok = True
+                except Exception as e:
+                    result = f"Error: {e}"
+                    ok = False
+            elapsed = time.monotonic() - file_started
+            done += 1
+            if report is not None:
+                status = "done" if ok else "failed"
+                await report(done, f"{entry['path']}: {status} ({done}/{len(files)})\n\n{result}")
+            return result, ok, elapsed
+
+        tasks = [asyncio.ensure_future(run_file(entry)) for entry in files]
+        try:
+            results: List[Tuple[str, bool, float]] = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        succeeded = sum(1 for _, ok, _ in results if ok)
+        lines = [
+            f"# {self.target.name} batch: {len(files)} files "
+            f"({succeeded} succeeded, {len(files) - succeeded} failed) in {time.monotonic() - started:.1f}s",
+            "",
+            "| File | Status | Time |",
+            "|------|--------|------|"
+        ]
+        for entry, (_, ok, elapsed) in zip(files, results):
+            lines.append(f"| {entry['path']} | {'ok' if ok else 'failed'} | {elapsed:.1f}s |")
+        for entry, (result, _, _) in zip(files, results):
+            lines.extend(["", f"## {entry['path']}", "", result])
+        return "\n".join(lines)
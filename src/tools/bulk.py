@@ -0,0 +1,183 @@
+"""
+Bulk tools: submit many files through the OpenAI Batch API and collect the results later
+"""
+
+import json
+from typing import Any, Dict
+
+from .base import BaseTool
+from .. import findings as structured
+from ..bulk import BulkRunner
+
+class BulkTool(BaseTool):
+    """Base class for tools that drive Batch API jobs instead of calling the model directly"""
+    
+    common_options = False
+    
+    def __init__(self, config, client, runner: BulkRunner):
+        super().__init__(config, client)
+        self.runner = runner
+    
+    def _batch_id_schema(self, description: str) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "batch_id": {
+                    "type": "string",
+                    "description": description
+                }
+            },
+            "required": ["batch_id"]
+        }
+
+class BulkSubmitTool(BulkTool):
+    """Submit a per-file tool over many files as one Batch API job"""
+    
+    def __init__(self, config, client, runner: BulkRunner, targets: Dict[str, BaseTool]):
+        super().__init__(config, client, runner)
+        unsupported = sorted(name for name, tool in targets.items() if not tool.supports_bulk)
+        if unsupported:
+            raise ValueError(f"Tools without bulk support cannot be bulk targets: {', '.join(unsupported)}")
+        self.targets = targets
+    
+    @property
+    def name(self) -> str:
+        return "o3_bulk_submit"
+    
+    @property
+    def description(self) -> str:
+        return (
+            "Submit o3_review, o3_analyze or o3_safety over many files through the OpenAI Batch API. "
+            "Costs about half as much as interactive calls but completes within the batch window "
+            "(usually well under 24h). Returns a batch_id for o3_bulk_status and o3_bulk_results."
+        )
+    
+    def get_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "tool": {
+                    "type": "string",
+                    "description": "Tool to run on every file",
+                    "enum": sorted(self.targets)
+                },
+                "files": {
+                    "type": "array",
+                    "description": "Files to process",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "path": {"type": "string", "description": "File path or label (must be unique)"},
+                            "code": {"type": "string", "description": "File contents"},
+                            "language": {"type": "string", "description": "Programming language (overrides the default)"}
+                        },
+                        "required": ["path", "code"]
+                    }
+                },
+                "language": {
+                    "type": "string",
+                    "description": "Default programming language for files that do not set one",
+                    "optional": True
+                },
+                "options": {
+                    "type": "object",
+                    "description": "Tool-specific arguments shared by every file (e.g. focus, analysis_type, context)",
+                    "optional": True
+                }
+            },
+            "required": ["tool", "files"]
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["tool", "files"])
+        
+        if arguments["tool"] not in self.targets:
+            raise ValueError(f"Unsupported tool for bulk mode: {arguments['tool']}")
+        files = arguments["files"]
+        if not files:
+            raise ValueError("files must contain at least one file")
+        for entry in files:
+            if "path" not in entry or "code" not in entry:
+                raise ValueError("Each file needs 'path' and 'code'")
+            if not (entry.get("language") or arguments.get("language")):
+                raise ValueError(f"No language given for {entry['path']}")
+        
+        shared = {**arguments.get("options", {}), "language": arguments.get("language")}
+        batch = await self.runner.submit(self.targets[arguments["tool"]], files, shared)
+        return (
+            f"Submitted batch {batch['id']} with {len(files)} {arguments['tool']} requests "
+            f"(status: {batch.get('status')}). Use o3_bulk_status or o3_bulk_results with "
+            f"batch_id \"{batch['id']}\" to collect it."
+        )
+
+class BulkStatusTool(BulkTool):
+    """Report the status of a Batch API job"""
+    
+    @property
+    def name(self) -> str:
+        return "o3_bulk_status"
+    
+    @property
+    def description(self) -> str:
+        return "Check the status and request counts of a batch submitted with o3_bulk_submit."
+    
+    def get_schema(self) -> Dict[str, Any]:
+        return self._batch_id_schema("Batch id returned by o3_bulk_submit")
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["batch_id"])
+        return json.dumps(await self.runner.status(arguments["batch_id"]), indent=2)
+
+class BulkResultsTool(BulkTool):
+    """Fetch the per-file results of a finished Batch API job"""
+    
+    @property
+    def name(self) -> str:
+        return "o3_bulk_results"
+    
+    @property
+    def description(self) -> str:
+        return "Fetch per-file results of a finished batch submitted with o3_bulk_submit."
+    
+    def get_schema(self) -> Dict[str, Any]:
+        return self._batch_id_schema("Batch id returned by o3_bulk_submit")
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["batch_id"])
+        
+        status = await self.runner.status(arguments["batch_id"])
+        results = await self.runner.results(arguments["batch_id"])
+        succeeded = sum(1 for result in results.values() if result.ok)
+        
+        lines = [
+            f"# Batch {status['batch_id']} ({status['tool']}, {status['status']}): "
+            f"{len(results)} results ({succeeded} succeeded, {len(results) - succeeded} failed)",
+            "",
+            "| File | Status |",
+            "|------|--------|"
+        ]
+        for path, result in results.items():
+            lines.append(f"| {path} | {'ok' if result.ok else 'failed'} |")
+        for path, result in results.items():
+            # Files submitted with structured=true come back as findings JSON
+            lines.extend(["", f"## {path}", "", structured.render_text(result.text)])
+        return "\n".join(lines)
+
+class BulkCancelTool(BulkTool):
+    """Cancel a Batch API job"""
+    
+    @property
+    def name(self) -> str:
+        return "o3_bulk_cancel"
+    
+    @property
+    def description(self) -> str:
+        return "Cancel a batch submitted with o3_bulk_submit. Requests already finished are still billed."
+    
+    def get_schema(self) -> Dict[str, Any]:
+        return self._batch_id_schema("Batch id to cancel")
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["batch_id"])
+        batch = await self.runner.cancel(arguments["batch_id"])
+        return f"Batch {batch['id']} is {batch.get('status')}."
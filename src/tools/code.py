@@ -57,8 +57,9 @@ class CodeTool(BaseTool):
         framework = arguments.get("framework", "")
         style = arguments.get("style", "")
         
-        # Build comprehensive prompt
-        user_content = f"""Generate {language} code for the following requirements:
+        # Build comprehensive prompt; shared context leads so calls on the same project share a prefix
+        user_content = f"Additional Context:\n{context}\n\n" if context else ""
+        user_content += f"""Generate {language} code for the following requirements:
 
 Requirements: {requirements}
 
@@ -70,10 +71,7 @@ Language: {language}"""
         if style:
             user_content += f"\nStyle: {style}"
         
-        if context:
-            user_content += f"\n\nAdditional Context:\n{context}"
-        
-        user_content += "\n\nProvide complete, production-ready code with proper error handling and best practices."
+        instructions = "Provide complete, production-ready code with proper error handling and best practices."
         
         system_prompt = get_prompt(self.name)
         
@@ -81,5 +79,7 @@ Language: {language}"""
         return await self._execute_with_context(
             system_prompt,
             user_content,
-            temperature=0.3
+            instructions,
+            temperature=0.3,
+            **self._client_options(arguments)
         )
\ No newline at end of file
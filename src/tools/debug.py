@@ -61,7 +61,8 @@ class DebugTool(BaseTool):
         stack_trace = arguments.get("stack_trace", "")
         environment = arguments.get("environment", "")
         
-        user_content = f"""Debug the following {language} code:
+        user_content = f"Environment: {environment}\n\n" if environment else ""
+        user_content += f"""Debug the following {language} code:
 
 ```{language}
 {code}
@@ -74,17 +75,15 @@ Expected Behavior: {expected}"""
         if stack_trace:
             user_content += f"\n\nStack Trace:\n```\n{stack_trace}\n```"
         
-        if environment:
-            user_content += f"\n\nEnvironment: {environment}"
-        
-        user_content += "\n\nIdentify the root cause and provide a solution with corrected code."
+        instructions = "Identify the root cause and provide a solution with corrected code."
         
         system_prompt = get_prompt(self.name)
         
         # Use reasoning mode for debugging
         result = await self.client.complete_with_reasoning(
-            self._build_messages(system_prompt, user_content),
-            reasoning_depth="high"
+            self._build_messages(system_prompt, user_content, instructions),
+            reasoning_depth="high",
+            **self._client_options(arguments)
         )
         
         return f"{result['reasoning']}\n\n**Solution:**\n{result['answer']}"
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Background job tools: status, result and cancellation
+"""
+
+import json
+from typing import Any, Dict
+
+from .base import BaseTool
+from ..jobs import JobManager
+
+class JobTool(BaseTool):
+    """Base class for tools that inspect background jobs instead of calling the model"""
+    
+    common_options = False
+    
+    def __init__(self, config, client, jobs: JobManager):
+        super().__init__(config, client)
+        self.jobs = jobs
+
+class JobStatusTool(JobTool):
+    """Report the status of background jobs"""
+    
+    @property
+    def name(self) -> str:
+        return "o3_job_status"
+    
+    @property
+    def description(self) -> str:
+        return "Check the status of background o3_pro jobs. Omit job_id to list all jobs."
+    
+    def get_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "string",
+                    "description": "Job id returned when the request was submitted",
+                    "optional": True
+                }
+            },
+            "required": []
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        job_id = arguments.get("job_id")
+        if job_id:
+            return json.dumps(self.jobs.get(job_id).describe(), indent=2)
+        
+        jobs = [job.describe() for job in self.jobs.list()]
+        if not jobs:
+            return "No background jobs."
+        return json.dumps(jobs, indent=2)
+
+class JobResultTool(JobTool):
+    """Fetch the result of a background job"""
+    
+    @property
+    def name(self) -> str:
+        return "o3_job_result"
+    
+    @property
+    def description(self) -> str:
+        return "Fetch the result of a background o3_pro job, optionally waiting a short while for it to finish."
+    
+    def get_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "string",
+                    "description": "Job id returned when the request was submitted"
+                },
+                "wait": {
+                    "type": "number",
+                    "description": "Seconds to wait for the job to finish (default: 0, max: 60)",
+                    "optional": True
+                }
+            },
+            "required": ["job_id"]
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["job_id"])
+        
+        wait = min(max(float(arguments.get("wait", 0)), 0), 60)
+        job = await self.jobs.wait(arguments["job_id"], wait)
+        
+        status = job.status
+        if status == "completed":
+            return job.task.result()
+        if status == "running":
+            return f"Job {job.id} is still running ({job.elapsed:.0f}s elapsed). Check again later."
+        if status == "failed":
+            return f"Job {job.id} failed: {job.task.exception()}"
+        return f"Job {job.id} was cancelled."
+
+class JobCancelTool(JobTool):
+    """Cancel a background job"""
+    
+    @property
+    def name(self) -> str:
+        return "o3_job_cancel"
+    
+    @property
+    def description(self) -> str:
+        return "Cancel a running background o3_pro job and its upstream request."
+    
+    def get_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "string",
+                    "description": "Job id to cancel"
+                }
+            },
+            "required": ["job_id"]
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["job_id"])
+        
+        job = self.jobs.get(arguments["job_id"])
+        if job.task.done():
+            return f"Job {job.id} already finished ({job.status})."
+        self.jobs.cancel(job.id)
+        return f"Job {job.id} cancelled."
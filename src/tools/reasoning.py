@@ -59,22 +59,19 @@ class ReasoningTool(BaseTool):
         options = arguments.get("options", "")
         depth = arguments.get("depth", "high")
         
-        user_content = f"""Solve the following problem using deep reasoning:
+        # Shared context leads so related questions share a prefix
+        user_content = f"Context:\n{context}\n\n" if context else ""
+        user_content += f"""Solve the following problem using deep reasoning:
 
 Problem: {problem}"""
 
-        if context:
-            user_content += f"\n\nContext:\n{context}"
-        
         if constraints:
             user_content += f"\n\nConstraints:\n{constraints}"
         
         if options:
             user_content += f"\n\nPotential Approaches:\n{options}"
         
-        user_content += """
-
-Apply systematic reasoning to:
+        instructions = """Apply systematic reasoning to:
 1. Analyze the problem thoroughly
 2. Consider multiple approaches
 3. Evaluate trade-offs
@@ -85,8 +82,9 @@ Apply systematic reasoning to:
         
         # Always use complete_with_reasoning for this tool
         result = await self.client.complete_with_reasoning(
-            self._build_messages(system_prompt, user_content),
-            reasoning_depth=depth
+            self._build_messages(system_prompt, user_content, instructions),
+            reasoning_depth=depth,
+            **self._client_options(arguments)
         )
         
         return f"**Reasoning Process:**\n{result['reasoning']}\n\n**Recommendation:**\n{result['answer']}"
\ No newline at end of file
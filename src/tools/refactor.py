@@ -71,15 +71,16 @@ Refactoring Goals: {goals}"""
         if target_patterns:
             user_content += f"\nTarget Patterns: {target_patterns}"
         
-        user_content += """
-
-Provide the refactored code with explanations for significant changes.
+        instructions = """Provide the refactored code with explanations for significant changes.
 Ensure the refactored code maintains the same functionality while improving quality."""
         
         system_prompt = get_prompt(self.name)
         
+        # The answer is rewritten code, so the input is never compacted: elided regions would be lost
         return await self._execute_with_context(
             system_prompt,
             user_content,
-            temperature=0.2
+            instructions,
+            temperature=0.2,
+            **self._client_options(arguments)
         )
\ No newline at end of file
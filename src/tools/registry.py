@@ -0,0 +1,90 @@
+"""
+Static registry of the server's tools and their precomputed MCP metadata
+
+The server lists tools from manifest.json and imports a tool's module only
+when the tool is first called. Regenerate the manifest after changing a
+tool's name, description or schema:
+
+    python -m src.tools.registry
+"""
+
+import importlib
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "manifest.json")
+
+# Tools whose per-file requests can be fanned out by the batch and bulk tools
+BATCH_TARGETS = ("o3_review", "o3_analyze", "o3_safety")
+
+
+class ToolSpec(NamedTuple):
+    """
+    Where a tool is implemented and what it needs to be constructed
+
+    kind selects the constructor arguments: "model" tools take the config
+    and client, "batch" wraps the tool named in targets, "jobs" and "status"
+    take the job manager (and scheduler), "bulk" takes the Batch API
+    runner and "bulk_submit" also takes the tools named in targets.
+    """
+    name: str
+    module: str
+    class_name: str
+    kind: str = "model"
+    targets: Tuple[str, ...] = ()
+
+
+TOOL_SPECS: Tuple[ToolSpec, ...] = (
+    ToolSpec("o3_code", "code", "CodeTool"),
+    ToolSpec("o3_analyze", "analyze", "AnalyzeTool"),
+    ToolSpec("o3_debug", "debug", "DebugTool"),
+    ToolSpec("o3_refactor", "refactor", "RefactorTool"),
+    ToolSpec("o3_review", "review", "ReviewTool"),
+    ToolSpec("o3_safety", "safety_review", "SafetyReviewTool"),
+    ToolSpec("o3_reasoning", "reasoning", "ReasoningTool"),
+    *(ToolSpec(f"{target}_batch", "batch", "BatchTool", "batch", (target,)) for target in BATCH_TARGETS),
+    ToolSpec("o3_job_status", "jobs", "JobStatusTool", "jobs"),
+    ToolSpec("o3_job_result", "jobs", "JobResultTool", "jobs"),
+    ToolSpec("o3_job_cancel", "jobs", "JobCancelTool", "jobs"),
+    ToolSpec("o3_bulk_submit", "bulk", "BulkSubmitTool", "bulk_submit", BATCH_TARGETS),
+    ToolSpec("o3_bulk_status", "bulk", "BulkStatusTool", "bulk"),
+    ToolSpec("o3_bulk_results", "bulk", "BulkResultsTool", "bulk"),
+    ToolSpec("o3_bulk_cancel", "bulk", "BulkCancelTool", "bulk"),
+    ToolSpec("o3_status", "status", "StatusTool", "status"),
+)
+
+
+def load_class(spec: ToolSpec):
+    """Import the module implementing a tool and return its class"""
+    module = importlib.import_module(f".{spec.module}", __package__)
+    return getattr(module, spec.class_name)
+
+
+def tool_metadata(tool) -> Dict[str, Any]:
+    """The MCP listing entry of an instantiated tool"""
+    return {"name": tool.name, "description": tool.description, "inputSchema": tool.get_input_schema()}
+
+
+def load_manifest() -> List[Dict[str, Any]]:
+    """Precomputed listing entries, in TOOL_SPECS order"""
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    """Instantiate every tool and write its metadata to manifest.json"""
+    # Metadata does not depend on credentials; Config only insists that a key is set
+    os.environ.setdefault("OPENAI_API_KEY", "manifest-generation")
+    from ..server import OpenAIMCPServer
+
+    server = OpenAIMCPServer()
+    manifest = [tool_metadata(server.get_tool(spec.name)) for spec in TOOL_SPECS]
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"Wrote {len(manifest)} tools to {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,30 @@
 Code review tool using o3_pro
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+import asyncio
+import logging
+import re
+
+from .. import findings as structured
 from .base import BaseTool
+from ..chunking import Chunk, split_definitions
+from ..compaction import restore_line_numbers
+from ..incremental import changed_lines_between, changed_lines_from_diff, format_ranges, line_ranges, region_key
+from ..metrics import REVIEW_REGIONS
 from ..prompts import get_prompt
 
+logger = logging.getLogger(__name__)
+
+# A region heading in a whole-file review split by region
+_REGION_HEADING = re.compile(r"^#+ *Lines (?P<start>\d+)-(?P<end>\d+)[^\n]*$", re.MULTILINE)
+
 class ReviewTool(BaseTool):
     """Perform comprehensive code reviews"""
     
+    severities = ("critical", "major", "minor", "suggestion")
+    supports_bulk = True
+    
     @property
     def name(self) -> str:
         return "o3_review"
@@ -43,46 +60,345 @@ class ReviewTool(BaseTool):
                     "type": "string",
                     "description": "Specific coding standards to check against",
                     "optional": True
+                },
+                "previous_code": {
+                    "type": "string",
+                    "description": "The previously reviewed version of the code; only changed regions are re-reviewed",
+                    "optional": True
+                },
+                "diff": {
+                    "type": "string",
+                    "description": "Unified diff from the previously reviewed version to this code (alternative to previous_code)",
+                    "optional": True
+                },
+                "structured": {
+                    "type": "boolean",
+                    "description": "Return compact findings (severity, line, location, message, fix) instead of a prose report (default: STRUCTURED_FINDINGS_ENABLED)",
+                    "optional": True
+                },
+                "chunked": {
+                    "type": "boolean",
+                    "description": "Split large code into chunks analyzed in parallel (default: automatic for very large inputs)",
+                    "optional": True
+                },
+                "compact": {
+                    "type": "boolean",
+                    "description": "Strip license headers, long comments, generated regions and repeated blocks before sending (default: COMPACTION_ENABLED)",
+                    "optional": True
                 }
             },
             "required": ["code", "language"]
         }
     
-    async def execute(self, arguments: Dict[str, Any]) -> str:
-        self._validate_arguments(arguments, ["code", "language"])
-        
-        code = arguments["code"]
+    def _content_builder(self, arguments: Dict[str, Any]) -> Tuple[Callable[[str], str], str]:
+        """Return a user-content builder for the code (or a chunk of it) and the tool's fixed instructions"""
         language = arguments["language"]
         code_type = arguments.get("type", "general")
         pr_description = arguments.get("pr_description", "")
         standards = arguments.get("standards", "")
         
-        user_content = f"""Review the following {language} code:
-
-```{language}
-{code}
-```
+        instructions = """Provide a detailed review with:
+1. Issues found (with severity: critical, major, minor, suggestion)
+2. Specific line references where applicable
+3. Recommended fixes
+4. Overall assessment"""
+        
+        def build_content(code: str) -> str:
+            # Standards and PR description are shared by every file of a PR, so they lead the prompt
+            user_content = ""
+            if standards:
+                user_content += f"Coding Standards:\n{standards}\n\n"
+            
+            if pr_description:
+                user_content += f"PR Description:\n{pr_description}\n\n"
+            
+            user_content += f"""Review the following {language} code:
 
 Code Type: {code_type}"""
 
-        if pr_description:
-            user_content += f"\n\nPR Description:\n{pr_description}"
+            return user_content + f"\n\n```{language}\n{code}\n```"
         
-        if standards:
-            user_content += f"\n\nCoding Standards:\n{standards}"
+        return build_content, instructions
+    
+    def build_request(self, arguments: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        self._validate_arguments(arguments, ["code", "language"])
         
-        user_content += """
-
-Provide a detailed review with:
-1. Issues found (with severity: critical, major, minor, suggestion)
-2. Specific line references where applicable
-3. Recommended fixes
-4. Overall assessment"""
+        build_content, instructions = self._content_builder(arguments)
+        if self._structured(arguments):
+            messages, options = self._findings_request(get_prompt(self.name), build_content(arguments["code"]))
+            return messages, {"temperature": 0.1, **options}
+        messages = self._build_messages(get_prompt(self.name), build_content(arguments["code"]), instructions)
+        return messages, {"temperature": 0.1}
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["code", "language"])
+        
+        build_content, instructions = self._content_builder(arguments)
         
         system_prompt = get_prompt(self.name)
+        options = {
+            "temperature": 0.1,
+            **self._client_options(arguments)
+        }
+        
+        if arguments.get("previous_code") is not None or arguments.get("diff"):
+            return await self._execute_incremental(arguments, system_prompt, build_content, instructions, **options)
+        return await self._execute_full(arguments, system_prompt, build_content, instructions, **options)
+    
+    async def _execute_full(
+        self,
+        arguments: Dict[str, Any],
+        system_prompt: str,
+        build_content: Callable[[str], str],
+        instructions: str,
+        **options
+    ) -> str:
+        """Review the whole file: one request, or map-reduce over chunks for large inputs"""
+        language = arguments["language"]
+        code, line_map = self._compact(arguments, arguments["code"], language)
+        if self._structured(arguments):
+            return await self._execute_findings(arguments, system_prompt, code, build_content, line_map, **options)
+        
+        if self._should_chunk(arguments, code):
+            result = await self._execute_chunked(
+                system_prompt, code, language, build_content, instructions, **options
+            )
+        else:
+            result = await self._execute_with_context(
+                system_prompt,
+                build_content(code),
+                instructions,
+                **options
+            )
+        return self._restore_lines(result, line_map)
+    
+    async def _execute_incremental(
+        self,
+        arguments: Dict[str, Any],
+        system_prompt: str,
+        build_content: Callable[[str], str],
+        instructions: str,
+        **kwargs
+    ) -> str:
+        """
+        Review a new version of a file, re-sending only what an earlier review does not cover
+        
+        The file is split into one region per top-level definition, and each
+        region's findings are cached under its full prompt (code and every
+        argument that shapes the review). Regions with cached findings reuse
+        them; the others are reviewed on their own, concurrently: changed
+        regions with a note on what changed, unchanged ones in full. Findings
+        are merged in file order, so once a file has been reviewed this way
+        the cost follows the size of the change. In structured mode regions
+        cache their findings as records, which are shifted to file lines and
+        merged into one list.
+        
+        When no region has cached findings yet, the file is reviewed in one
+        request (unless it is large enough to be chunked anyway) and the
+        findings are split by region to seed the cache. Without the response
+        cache there is nothing to reuse, so this is an ordinary review.
+        """
+        code = arguments["code"]
+        language = arguments["language"]
+        if arguments.get("diff"):
+            changed = changed_lines_from_diff(arguments["diff"])
+        else:
+            changed = changed_lines_between(arguments["previous_code"], code)
+        
+        regions = split_definitions(code, language, self.config.chunk_max_tokens)
+        use_structured = self._structured(arguments)
+        settings = {
+            "system_prompt": system_prompt,
+            "instructions": structured.instructions(self.severities) if use_structured else instructions,
+            "model": self.config.openai_model,
+            "tier": arguments.get("tier"),
+            "temperature": kwargs.get("temperature"),
+            "structured": use_structured
+        }
+        cache = self.client.cache
+        use_cache = cache is not None and kwargs.get("use_cache", True)
+        if not use_cache:
+            logger.info(f"{self.name}: response cache not in use, reviewing the whole file")
+            return await self._execute_full(arguments, system_prompt, build_content, instructions, **kwargs)
+        
+        # The prompt of each region without the note on changed lines, which differs between reviews
+        prompts: List[Tuple[str, Optional[List[int]]]] = []
+        for region in regions:
+            region_code, line_map = self._compact(arguments, region.text.rstrip("\n"), language)
+            prompts.append((build_content(region_code), line_map))
+        
+        def cached_findings(index: int) -> Union[str, structured.Findings, None]:
+            findings = cache.get(region_key(prompts[index][0], settings))
+            if findings is None or not use_structured:
+                return findings
+            try:
+                return structured.parse_findings(findings)
+            except ValueError:
+                return None
+        
+        def region_changes(region: Chunk) -> Set[int]:
+            return {line - region.start_line + 1 for line in changed if region.start_line <= line <= region.end_line}
+        
+        semaphore = asyncio.Semaphore(self.config.chunk_concurrency)
+        
+        async def review_region(index: int) -> Union[str, structured.Findings]:
+            region = regions[index]
+            content, line_map = prompts[index]
+            region_changed = region_changes(region)
+            if region_changed:
+                note = (
+                    f"This is an excerpt (lines {region.start_line}-{region.end_line}) of a larger file that was "
+                    f"reviewed before. Number lines from 1 at the first line shown. Lines changed since the last "
+                    f"review: {format_ranges(line_ranges(region_changed))}. Focus on the changes and their "
+                    f"effect on the rest of the excerpt, but report any issue you find in it."
+                )
+            else:
+                note = (
+                    f"This is an excerpt (lines {region.start_line}-{region.end_line}) of a larger file. Number "
+                    f"lines from 1 at the first line shown and review the excerpt in full."
+                )
+            if use_structured:
+                async with semaphore:
+                    result = await self._request_findings(system_prompt, f"{content}\n\n{note}", **kwargs)
+                if not result.parsed:
+                    return self._restore_lines(result.summary, line_map)
+                result = result._replace(findings=structured.map_lines(result.findings, line_map))
+                cache.set(region_key(content, settings), structured.to_json(result))
+                return result
+            
+            async with semaphore:
+                findings = await self._execute_with_context(
+                    system_prompt, f"{content}\n\n{note}", instructions, **kwargs
+                )
+            findings = self._restore_lines(findings, line_map)
+            if not findings.startswith("Error"):
+                cache.set(region_key(content, settings), findings)
+            return findings
+        
+        results: Dict[int, Tuple[str, Union[str, structured.Findings]]] = {}
+        to_review: List[int] = []
+        for index, region in enumerate(regions):
+            findings = cached_findings(index)
+            if findings is not None:
+                results[index] = ("reused", findings)
+            else:
+                to_review.append(index)
+        
+        overview = ""
+        if not results and not self._should_chunk(arguments, code):
+            logger.info(f"{self.name}: no cached findings for the file, reviewing it in one request")
+            whole = await self._review_by_region(arguments, regions, system_prompt, build_content, instructions, **kwargs)
+            if isinstance(whole, str):
+                return whole
+            overview, reviewed = whole
+            for (content, _), findings in zip(prompts, reviewed):
+                cache.set(region_key(content, settings), structured.to_json(findings) if use_structured else findings)
+        else:
+            logger.info(
+                f"{self.name}: incremental review of {len(to_review)} of {len(regions)} regions "
+                f"({len(changed)} changed lines)"
+            )
+            tasks = [asyncio.ensure_future(review_region(index)) for index in to_review]
+            try:
+                reviewed = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+        for index, findings in zip(to_review, reviewed):
+            # Unchanged regions are only sent when no earlier findings were cached for them
+            results[index] = ("reviewed" if region_changes(regions[index]) else "uncached", findings)
+        
+        labels = {
+            "reviewed": "changed, reviewed",
+            "uncached": "unchanged, no cached findings",
+            "reused": "from an earlier review"
+        }
+        sections = []
+        merged: List[structured.Finding] = []
+        notes = []
+        counts = {outcome: 0 for outcome in labels}
+        for index, region in enumerate(regions):
+            outcome, findings = results[index]
+            counts[outcome] += 1
+            REVIEW_REGIONS.inc(outcome=outcome)
+            label = labels[outcome]
+            if isinstance(findings, structured.Findings):
+                merged.extend(structured.map_lines(findings.findings, offset=region.start_line - 1))
+                if findings.summary:
+                    notes.append(f"- Lines {region.start_line}-{region.end_line} ({label}): {findings.summary}")
+                continue
+            # Findings are numbered from the start of their region
+            findings = restore_line_numbers(findings, list(range(region.start_line, region.end_line + 1)))
+            sections.append(f"### Lines {region.start_line}-{region.end_line} ({label})\n{findings}")
+        
+        changes = format_ranges(line_ranges(changed)) if changed else "none"
+        summary = (
+            f"**Incremental review** (changed lines: {changes}): {counts['reviewed']} changed region(s) reviewed, "
+            f"{counts['uncached']} unchanged region(s) reviewed because no earlier findings were cached, "
+            f"{counts['reused']} reused from earlier reviews."
+        )
+        if use_structured:
+            if overview:
+                notes.insert(0, f"- Whole file: {overview}")
+            if merged or notes:
+                sections.insert(0, structured.render(structured.Findings("\n".join(notes), structured.merge(merged))))
+        elif overview:
+            sections.insert(0, overview)
+        return "\n\n".join([summary] + sections)
+    
+    async def _review_by_region(
+        self,
+        arguments: Dict[str, Any],
+        regions: List[Chunk],
+        system_prompt: str,
+        build_content: Callable[[str], str],
+        instructions: str,
+        **kwargs
+    ) -> Union[str, Tuple[str, List[Union[str, structured.Findings]]]]:
+        """
+        Review a whole file in one request and split the findings by region
+        
+        Returns an overview of the file and each region's findings, numbered
+        from the region's first line as cached by incremental reviews. A
+        response that cannot be split (unparsed structured output, or text
+        without one heading per region) is returned as text.
+        """
+        if self._structured(arguments):
+            code, line_map = self._compact(arguments, arguments["code"], arguments["language"])
+            result = await self._request_findings(system_prompt, build_content(code), **kwargs)
+            if not result.parsed:
+                return self._restore_lines(result.summary, line_map)
+            parts: List[List[structured.Finding]] = [[] for _ in regions]
+            for finding in structured.map_lines(result.findings, line_map):
+                # Findings without a line in any region are kept with the first one
+                index = next((
+                    index for index, region in enumerate(regions)
+                    if finding.line is not None and region.start_line <= finding.line <= region.end_line
+                ), 0)
+                parts[index].append(finding)
+            return result.summary, [
+                structured.Findings("", structured.map_lines(found, offset=1 - region.start_line))
+                for region, found in zip(regions, parts)
+            ]
         
-        return await self._execute_with_context(
-            system_prompt,
-            user_content,
-            temperature=0.1
-        )
\ No newline at end of file
+        # Not compacted: the headings refer to lines of the file as sent
+        headings = ", ".join(f"### Lines {region.start_line}-{region.end_line}" for region in regions)
+        note = (
+            f"Group the findings by region, under these headings in this order: {headings}. Number lines as "
+            f"in the file, and write \"No issues found.\" under a heading without findings."
+        )
+        text = await self._execute_with_context(
+            system_prompt, f"{build_content(arguments['code'])}\n\n{note}", instructions, **kwargs
+        )
+        found = list(_REGION_HEADING.finditer(text))
+        if [(int(m.group("start")), int(m.group("end"))) for m in found] != [(r.start_line, r.end_line) for r in regions]:
+            return text
+        sections = []
+        for heading, following, region in zip(found, found[1:] + [None], regions):
+            section = text[heading.end():following.start() if following else len(text)].strip()
+            # Cached findings are numbered from the region's first line
+            sections.append(restore_line_numbers(
+                section, list(range(2 - region.start_line, region.end_line - region.start_line + 2))
+            ))
+        return text[:found[0].start()].strip(), sections
@@ -2,13 +2,16 @@
 Safety and security review tool using o3_pro
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Tuple
 from .base import BaseTool
 from ..prompts import get_prompt
 
 class SafetyReviewTool(BaseTool):
     """Perform security and safety analysis of code"""
     
+    severities = ("critical", "high", "medium", "low")
+    supports_bulk = True
+    
     @property
     def name(self) -> str:
         return "o3_safety"
@@ -43,49 +46,89 @@ class SafetyReviewTool(BaseTool):
                     "type": "string",
                     "description": "Compliance requirements (e.g., OWASP, PCI-DSS, HIPAA)",
                     "optional": True
+                },
+                "structured": {
+                    "type": "boolean",
+                    "description": "Return compact findings (severity, line, location, message, fix) instead of a prose report (default: STRUCTURED_FINDINGS_ENABLED)",
+                    "optional": True
+                },
+                "chunked": {
+                    "type": "boolean",
+                    "description": "Split large code into chunks analyzed in parallel (default: automatic for very large inputs)",
+                    "optional": True
                 }
             },
             "required": ["code", "language"]
         }
     
-    async def execute(self, arguments: Dict[str, Any]) -> str:
-        self._validate_arguments(arguments, ["code", "language"])
-        
-        code = arguments["code"]
+    def _content_builder(self, arguments: Dict[str, Any]) -> Tuple[Callable[[str], str], str]:
+        """Return a user-content builder for the code (or a chunk of it) and the tool's fixed instructions"""
         language = arguments["language"]
         context = arguments.get("context", "general application")
         sensitivity = arguments.get("sensitivity", "")
         compliance = arguments.get("compliance", "")
         
-        user_content = f"""Perform a security and safety review of the following {language} code:
-
-```{language}
-{code}
-```
-
-Application Context: {context}"""
-
-        if sensitivity:
-            user_content += f"\nData Sensitivity: {sensitivity}"
-        
-        if compliance:
-            user_content += f"\nCompliance Requirements: {compliance}"
-        
-        user_content += """
-
-Provide a comprehensive security analysis including:
+        instructions = """Provide a comprehensive security analysis including:
 1. Vulnerabilities found (with severity: critical, high, medium, low)
 2. Specific security risks and attack vectors
 3. Remediation recommendations with code examples
 4. Best practices to prevent similar issues
 5. Overall security posture assessment"""
         
+        def build_content(code: str) -> str:
+            # Application-level context first, then the per-call parts, so calls on the same project share a prefix
+            user_content = f"Application Context: {context}"
+
+            if sensitivity:
+                user_content += f"\nData Sensitivity: {sensitivity}"
+            
+            if compliance:
+                user_content += f"\nCompliance Requirements: {compliance}"
+            
+            user_content += f"\n\nPerform a security and safety review of the following {language} code:"
+            
+            return user_content + f"\n\n```{language}\n{code}\n```"
+        
+        return build_content, instructions
+    
+    def build_request(self, arguments: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        self._validate_arguments(arguments, ["code", "language"])
+        
+        build_content, instructions = self._content_builder(arguments)
+        if self._structured(arguments):
+            return self._findings_request(get_prompt(self.name), build_content(arguments["code"]))
+        messages = self._build_messages(get_prompt(self.name), build_content(arguments["code"]), instructions)
+        messages = self.client.reasoning_messages(messages, reasoning_depth="high")
+        return messages, {}
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        self._validate_arguments(arguments, ["code", "language"])
+        
+        code = arguments["code"]
+        language = arguments["language"]
+        build_content, instructions = self._content_builder(arguments)
+        
         system_prompt = get_prompt(self.name)
         
+        if self._structured(arguments):
+            # The findings format replaces the free-text reasoning/answer split; depth still guides routing
+            return await self._execute_findings(
+                arguments, system_prompt, code, build_content, depth="high", **self._client_options(arguments)
+            )
+        
+        if self._should_chunk(arguments, code):
+            # Chunks and the merge get the same high-depth directive and routing as a single request
+            report = await self._execute_chunked(
+                system_prompt, code, language, build_content, instructions,
+                reasoning_depth="high", **self._client_options(arguments)
+            )
+            return f"**Findings and Recommendations:**\n{report}"
+        
         # Use high reasoning depth for security analysis
         result = await self.client.complete_with_reasoning(
-            self._build_messages(system_prompt, user_content),
-            reasoning_depth="high"
+            self._build_messages(system_prompt, build_content(code), instructions),
+            reasoning_depth="high",
+            **self._client_options(arguments)
         )
         
         return f"**Security Analysis:**\n{result['reasoning']}\n\n**Findings and Recommendations:**\n{result['answer']}"
\ No newline at end of file
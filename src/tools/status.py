@@ -0,0 +1,117 @@
+"""
+Status tool: metrics and internal state of the running server
+"""
+
+import json
+from typing import Any, Dict
+
+from .base import BaseTool
+from ..jobs import JobManager
+from ..metrics import (
+    CACHE_LOOKUPS, CANCELLATION_SAVED_SECONDS, CASCADE_ESCALATION_SECONDS, CASCADE_OUTCOMES, COMPACTION_TOKENS,
+    HEDGES, HTTP_RESPONSES, NEAR_DUPLICATE_LOOKUPS, REVIEW_REGIONS, ROUTING_DECISIONS, ROUTING_LATENCY_SAVED,
+    STRUCTURED_FINDINGS, TOOL_CALLS, UPSTREAM_CANCELLATIONS, tool_summary
+)
+from ..scheduler import Scheduler
+
+class StatusTool(BaseTool):
+    """Report per-tool latency, token usage and error rates plus cache, retry and queue state"""
+    
+    common_options = False
+    
+    def __init__(self, config, client, scheduler: Scheduler, jobs: JobManager):
+        super().__init__(config, client)
+        self.scheduler = scheduler
+        self.jobs = jobs
+    
+    @property
+    def name(self) -> str:
+        return "o3_status"
+    
+    @property
+    def description(self) -> str:
+        return (
+            "Show server metrics: per-tool calls, error rates, p50/p95/p99 latency, token usage, "
+            "HTTP status codes, retries, cache hits, queue state and spend."
+        )
+    
+    def get_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    
+    async def execute(self, arguments: Dict[str, Any]) -> str:
+        client = self.client
+        status: Dict[str, Any] = {
+            "tools": tool_summary(),
+            "http_responses": {labels["status"]: int(value) for labels, value in HTTP_RESPONSES.items()},
+            "retries": client.retry.stats,
+            "response_cache": {labels["result"]: int(value) for labels, value in CACHE_LOOKUPS.items()},
+            "prompt_cache": client.prompt_cache_stats.summary(),
+            "scheduler": self.scheduler.snapshot(),
+            "background_jobs": sum(1 for job in self.jobs.list() if job.status == "running")
+        }
+        compaction: Dict[str, Dict[str, Any]] = {}
+        for labels, value in COMPACTION_TOKENS.items():
+            compaction.setdefault(labels["tool"], {})[f"tokens_{labels['stage']}"] = int(value)
+        for stats in compaction.values():
+            stats["saved_ratio"] = round(1 - stats["tokens_after"] / max(stats["tokens_before"], 1), 3)
+        if compaction:
+            status["compaction"] = compaction
+        near_duplicates: Dict[str, Dict[str, int]] = {}
+        for labels, value in NEAR_DUPLICATE_LOOKUPS.items():
+            near_duplicates.setdefault(labels["tool"], {})[labels["result"]] = int(value)
+        if near_duplicates:
+            status["near_duplicate_lookups"] = near_duplicates
+        cancellations: Dict[str, Dict[str, Any]] = {}
+        for labels, value in TOOL_CALLS.items():
+            if labels["status"] == "cancelled":
+                cancellations.setdefault(labels["tool"], {})["calls"] = int(value)
+        for labels, value in UPSTREAM_CANCELLATIONS.items():
+            cancellations.setdefault(labels["tool"], {})[f"upstream_{labels['mode']}"] = int(value)
+        for labels, value in CANCELLATION_SAVED_SECONDS.items():
+            cancellations.setdefault(labels["tool"], {})["saved_seconds"] = round(value, 1)
+        if cancellations:
+            status["cancellations"] = cancellations
+        structured_findings: Dict[str, Dict[str, int]] = {}
+        for labels, value in STRUCTURED_FINDINGS.items():
+            structured_findings.setdefault(labels["tool"], {})[labels["result"]] = int(value)
+        if structured_findings:
+            status["structured_findings"] = structured_findings
+        if REVIEW_REGIONS.items():
+            status["incremental_review_regions"] = {
+                labels["outcome"]: int(value) for labels, value in REVIEW_REGIONS.items()
+            }
+        if client.cache is not None:
+            status["response_cache"].update(client.cache.stats)
+        if client.singleflight is not None:
+            status["coalescing"] = client.singleflight.stats
+        if client.router is not None:
+            status["routing"] = {
+                "decisions": [{**labels, "calls": int(value)} for labels, value in ROUTING_DECISIONS.items()],
+                "cascade": [{**labels, "calls": int(value)} for labels, value in CASCADE_OUTCOMES.items()],
+                "latency_saved_seconds": {
+                    labels["tool"]: round(value, 1) for labels, value in ROUTING_LATENCY_SAVED.items()
+                },
+                "escalation_seconds": {
+                    labels["tool"]: round(value, 1) for labels, value in CASCADE_ESCALATION_SECONDS.items()
+                }
+            }
+        if client.hedger is not None:
+            status["hedging"] = {
+                **client.hedger.stats,
+                "outcomes": [{**labels, "calls": int(value)} for labels, value in HEDGES.items()]
+            }
+        if client.cassette is not None:
+            status["cassette"] = {"mode": client.cassette.mode, **client.cassette.stats}
+        if client.rate_limiter is not None:
+            status["rate_limiter"] = client.rate_limiter.stats
+        if client.budget is not None:
+            status["budget"] = {
+                **client.budget.stats,
+                "spent_last_hour_usd": round(client.budget.spent(3600), 4),
+                "spent_last_day_usd": round(client.budget.spent(86400), 4)
+            }
+        return json.dumps(status, indent=2, default=str)
@@ -0,0 +1,58 @@
+"""
+Per-tool accounting of provider-side prompt caching
+"""
+
+import logging
+from typing import Any, Dict
+
+from .tokens import cache_savings
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCacheStats:
+    """Track how much of each tool's input was served from the provider's prompt cache"""
+
+    def __init__(self):
+        self._tools: Dict[str, Dict[str, float]] = {}
+
+    def record(self, tool: str, model: str, usage: Dict[str, int], latency: float):
+        """Account one upstream request; usage is normalized (see tokens.normalize_usage)"""
+        if not usage:
+            return
+        input_tokens = usage.get("input_tokens", 0)
+        cached_tokens = usage.get("cached_tokens", 0)
+        stats = self._tools.setdefault(tool, {
+            "requests": 0, "cache_hit_requests": 0, "input_tokens": 0, "cached_tokens": 0,
+            "hit_latency_seconds": 0.0, "miss_latency_seconds": 0.0, "saved_usd": 0.0
+        })
+        stats["requests"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["cached_tokens"] += cached_tokens
+        if cached_tokens:
+            stats["cache_hit_requests"] += 1
+            stats["hit_latency_seconds"] += latency
+            stats["saved_usd"] += cache_savings(model, cached_tokens)
+            logger.info(
+                f"{tool}: {cached_tokens:,} of {input_tokens:,} input tokens served from the prompt cache "
+                f"({cached_tokens / max(input_tokens, 1):.0%})"
+            )
+        else:
+            stats["miss_latency_seconds"] += latency
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Hit ratio, average latency with and without a cache hit, and savings per tool"""
+        summary = {}
+        for tool, stats in sorted(self._tools.items()):
+            hits = stats["cache_hit_requests"]
+            misses = stats["requests"] - hits
+            summary[tool] = {
+                "requests": stats["requests"],
+                "input_tokens": stats["input_tokens"],
+                "cached_tokens": stats["cached_tokens"],
+                "cached_token_ratio": round(stats["cached_tokens"] / max(stats["input_tokens"], 1), 3),
+                "avg_latency_hit_seconds": round(stats["hit_latency_seconds"] / hits, 2) if hits else None,
+                "avg_latency_miss_seconds": round(stats["miss_latency_seconds"] / misses, 2) if misses else None,
+                "saved_usd": round(stats["saved_usd"], 4)
+            }
+        return summary
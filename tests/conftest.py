@@ -0,0 +1,84 @@
+"""
+Shared fixtures: an isolated environment and a local stand-in for the OpenAI API
+
+Async scenarios run under asyncio.run so the suite needs no pytest plugins.
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.mock_openai import MockOpenAI
+
+# Settings that keep tests off the network, the user's cache and real-time waits
+TEST_ENV = {
+    "OPENAI_API_KEY": "sk-test",
+    "OPENAI_MODEL": "o3-pro",
+    "RESPONSE_CACHE_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    "BUDGET_ENABLED": "false",
+    "RETRY_BASE_DELAY": "0.01",
+    "RETRY_MAX_DELAY": "0.05",
+    "CASSETTE_MODE": "off",
+    "ROUTING_ENABLED": "false",
+    "HEDGE_ENABLED": "false",
+    "NEAR_DUPLICATE_ENABLED": "false",
+}
+
+
+@pytest.fixture
+def env(monkeypatch, tmp_path):
+    """Test settings in the environment; returns monkeypatch for per-test overrides"""
+    for key, value in TEST_ENV.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.setenv("RESPONSE_CACHE_PATH", str(tmp_path / "responses.sqlite3"))
+    monkeypatch.setenv("CASSETTE_PATH", str(tmp_path / "cassette.jsonl"))
+    return monkeypatch
+
+
+@pytest.fixture
+def run_with_api(env):
+    """
+    Run scenario(mock, client) against a fresh MockOpenAI and an OpenAIClient pointed at it
+
+    Settings made with env.setenv before the call apply to the client.
+    """
+    def run(scenario, **mock_options):
+        async def main():
+            from src.config import Config
+            from src.openai_client import OpenAIClient
+
+            mock = await MockOpenAI(**{"latency": 0.0, "payload_size": 64, **mock_options}).start()
+            env.setenv("OPENAI_BASE_URL", mock.base_url)
+            client = OpenAIClient(Config())
+            try:
+                return await scenario(mock, client)
+            finally:
+                await client.close()
+                await mock.stop()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def run_with_server(env):
+    """Like run_with_api, but scenario(mock, server) gets an OpenAIMCPServer whose client uses the mock"""
+    def run(scenario, **mock_options):
+        async def main():
+            from src.server import OpenAIMCPServer
+
+            mock = await MockOpenAI(**{"latency": 0.0, "payload_size": 64, **mock_options}).start()
+            env.setenv("OPENAI_BASE_URL", mock.base_url)
+            server = OpenAIMCPServer()
+            try:
+                return await scenario(mock, server)
+            finally:
+                await server.jobs.shutdown()
+                await server.client.close()
+                await mock.stop()
+
+        return asyncio.run(main())
+
+    return run
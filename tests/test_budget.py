@@ -0,0 +1,69 @@
+"""Spend budgets: reservations, downgrades, rejection and settlement"""
+
+import time
+
+import pytest
+
+from src.budget import HOUR, SpendBudget
+from src.errors import BudgetExceededError
+from src.tokens import estimate_cost
+
+
+def test_unlimited_budget_admits_anything():
+    admission = SpendBudget().admit("o3-pro", 100000, 100000)
+    assert admission.model == "o3-pro" and admission.max_tokens == 100000
+
+
+def test_reservation_counts_against_the_window_until_settled():
+    budget = SpendBudget(per_hour=10)
+    admission = budget.admit("o3-pro", 1000, 1000)
+    assert admission.estimated_cost == pytest.approx(estimate_cost("o3-pro", 1000, 1000))
+    assert budget.spent(HOUR) == pytest.approx(admission.estimated_cost)
+
+    budget.settle(admission.reservation, 0.01)
+    assert budget.spent(HOUR) == pytest.approx(0.01)
+    assert budget.stats["spent_usd"] == pytest.approx(0.01)
+
+
+def test_release_frees_the_reservation_without_spending():
+    budget = SpendBudget(per_day=10)
+    admission = budget.admit("o3-pro", 1000, 1000)
+    budget.release(admission.reservation)
+    assert budget.spent(HOUR) == 0
+    assert budget.stats["spent_usd"] == 0
+
+
+def test_downgrade_cuts_output_tokens_to_fit():
+    budget = SpendBudget(per_call=1.0, min_output_tokens=1000)
+    admission = budget.admit("o3-pro", 10000, 100000)
+    assert admission.model == "o3-pro"
+    assert 1000 <= admission.max_tokens < 100000
+    assert admission.estimated_cost <= 1.0
+    assert budget.stats["downgraded"] == 1
+
+
+def test_downgrade_falls_back_to_a_cheaper_model():
+    budget = SpendBudget(per_call=0.1, min_output_tokens=4000, fallback_model="o4-mini")
+    admission = budget.admit("o3-pro", 10000, 100000)
+    assert admission.model == "o4-mini"
+    assert admission.max_tokens >= 4000 and admission.estimated_cost <= 0.1
+
+
+def test_reject_action_refuses_instead_of_downgrading():
+    budget = SpendBudget(per_call=0.1, action="reject")
+    with pytest.raises(BudgetExceededError, match="exceeds the \\$0.10 available"):
+        budget.admit("o3-pro", 10000, 100000)
+    assert budget.stats["rejected"] == 1
+
+
+def test_hourly_spend_blocks_later_requests():
+    budget = SpendBudget(per_hour=1.0, action="reject")
+    budget.settle(budget.admit("o3-pro", 1000, 1000).reservation, 0.95)
+    with pytest.raises(BudgetExceededError):
+        budget.admit("o3-pro", 1000, 1000)
+
+
+def test_spend_older_than_the_window_does_not_count():
+    budget = SpendBudget(per_hour=1.0)
+    budget._spent.append((time.time() - HOUR - 1, 0.95))
+    assert budget.available() == pytest.approx(1.0)
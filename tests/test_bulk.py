@@ -0,0 +1,121 @@
+"""Bulk mode against the Batch API stand-in in benchmarks/mock_openai.py"""
+
+import json
+
+import pytest
+
+from src.bulk import BulkRunner
+from src.tools.analyze import AnalyzeTool
+
+FILES = [
+    {"path": "a.py", "code": "print('a')"},
+    {"path": "b.py", "code": "print('b')"},
+    {"path": "c.js", "code": "console.log('c')", "language": "javascript"},
+]
+
+
+def test_build_jsonl_one_request_per_file(run_with_api):
+    async def scenario(mock, client):
+        runner = BulkRunner(client)
+        data = runner.build_jsonl(AnalyzeTool(client.config, client), FILES, {"language": "python"})
+        return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+    records = run_with_api(scenario)
+    assert [record["custom_id"] for record in records] == ["a.py", "b.py", "c.js"]
+    assert all(record["method"] == "POST" and record["url"] == "/v1/responses" for record in records)
+    user_messages = [record["body"]["messages"][-1]["content"] for record in records]
+    assert "```python\nprint('a')\n```" in user_messages[0]
+    assert "```javascript\nconsole.log('c')\n```" in user_messages[2]
+
+
+def test_submit_uploads_input_and_creates_batch(run_with_api):
+    async def scenario(mock, client):
+        runner = BulkRunner(client)
+        tool = AnalyzeTool(client.config, client)
+        batch = await runner.submit(tool, FILES, {"language": "python"})
+        return batch, mock.batches[batch["id"]], mock.files[batch["input_file_id"]], runner.build_jsonl(tool, FILES, {"language": "python"})
+
+    batch, stored, uploaded, expected = run_with_api(scenario)
+    assert batch["status"] == "in_progress"
+    assert stored["endpoint"] == "/v1/responses"
+    assert stored["metadata"] == {"tool": "o3_analyze"}
+    assert uploaded == expected
+
+
+def test_submit_rejects_duplicate_paths(run_with_api):
+    async def scenario(mock, client):
+        with pytest.raises(ValueError, match="unique"):
+            await BulkRunner(client).submit(AnalyzeTool(client.config, client), FILES + FILES[:1], {"language": "python"})
+        return mock.files
+
+    assert run_with_api(scenario) == {}
+
+
+def test_status_and_results_map_back_by_custom_id(run_with_api):
+    async def scenario(mock, client):
+        runner = BulkRunner(client)
+        batch = await runner.submit(AnalyzeTool(client.config, client), FILES, {"language": "python"})
+        pending = await runner.status(batch["id"])
+        with pytest.raises(ValueError, match="still in_progress"):
+            await runner.results(batch["id"])
+
+        mock.batch_error_ids.add("b.py")
+        mock.finish_batch(batch["id"])
+        return pending, await runner.status(batch["id"]), await runner.results(batch["id"])
+
+    pending, done, results = run_with_api(scenario)
+    assert pending["tool"] == "o3_analyze"
+    assert pending["status"] == "in_progress"
+    assert done["status"] == "completed"
+    assert done["request_counts"] == {"total": 3, "completed": 2, "failed": 1}
+    assert set(results) == {"a.py", "b.py", "c.js"}
+    assert results["a.py"].ok and results["a.py"].text.startswith("Reasoning.")
+    assert results["c.js"].ok
+    # Requests that failed come back through error_file_id
+    assert not results["b.py"].ok
+    assert "Injected failure for b.py" in results["b.py"].text
+
+
+def test_non_200_output_line_is_a_failure(run_with_api):
+    async def scenario(mock, client):
+        return BulkRunner(client)._parse_record({
+            "custom_id": "a.py",
+            "response": {"status_code": 400, "body": {"error": {"message": "Bad request"}}},
+            "error": None
+        })
+
+    result = run_with_api(scenario)
+    assert not result.ok
+    assert result.text == "Error: 400 - Bad request"
+
+
+def test_cancel(run_with_api):
+    async def scenario(mock, client):
+        runner = BulkRunner(client)
+        batch = await runner.submit(AnalyzeTool(client.config, client), FILES, {"language": "python"})
+        cancelled = await runner.cancel(batch["id"])
+        return cancelled, await runner.results(batch["id"])
+
+    cancelled, results = run_with_api(scenario)
+    assert cancelled["status"] == "cancelled"
+    assert results == {}
+
+
+def test_bulk_targets_declare_support(env):
+    from src.server import OpenAIMCPServer
+    from src.tools.base import BaseTool
+
+    server = OpenAIMCPServer()
+    targets = server.get_tool("o3_bulk_submit").targets
+    assert targets and all(tool.supports_bulk for tool in targets.values())
+    assert all(type(tool).build_request is not BaseTool.build_request for tool in targets.values())
+    assert not server.get_tool("o3_refactor").supports_bulk
+
+
+def test_bulk_submit_rejects_tools_without_bulk_support(env):
+    from src.server import OpenAIMCPServer
+    from src.tools.bulk import BulkSubmitTool
+
+    server = OpenAIMCPServer()
+    with pytest.raises(ValueError, match="without bulk support cannot be bulk targets: o3_refactor"):
+        BulkSubmitTool(server.config, server.client, server.bulk_runner, {"o3_refactor": server.get_tool("o3_refactor")})
@@ -0,0 +1,30 @@
+"""Response cache: repeated requests are served without calling the API"""
+
+MESSAGES = [{"role": "system", "content": "You review code."}, {"role": "user", "content": "def f(): pass"}]
+
+
+def test_identical_requests_are_served_from_the_cache(env, run_with_api):
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+
+    async def scenario(mock, client):
+        first = await client.complete(MESSAGES)
+        second = await client.complete(MESSAGES)
+        uncached = await client.complete(MESSAGES, use_cache=False)
+        return first, second, uncached, mock.requests, client.cache.stats
+
+    first, second, uncached, requests, stats = run_with_api(scenario)
+    assert first == second == uncached
+    assert requests == 2
+    assert stats["memory_hits"] == 1 and stats["writes"] == 1
+
+
+def test_disk_cache_survives_a_new_client(env, run_with_api):
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+
+    async def scenario(mock, client):
+        return await client.complete(MESSAGES), mock.requests
+
+    first, requests = run_with_api(scenario)
+    assert requests == 1
+    second, requests = run_with_api(scenario)
+    assert second == first and requests == 0
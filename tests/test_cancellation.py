@@ -0,0 +1,112 @@
+"""Cancelled calls: the upstream cancel, call outcome and the estimate of upstream time saved"""
+
+import asyncio
+
+import pytest
+
+from src.metrics import CANCELLATION_SAVED_SECONDS, TOOL_CALLS, TOOL_LATENCY, UPSTREAM_CANCELLATIONS
+
+MESSAGES = [{"role": "user", "content": "Explain this function."}]
+
+
+async def wait_for_background_response(mock) -> str:
+    """Id of the first background response the mock receives"""
+    while not mock.responses:
+        await asyncio.sleep(0.01)
+    return next(iter(mock.responses))
+
+
+async def cancelled_upstream(mock, response_id: str) -> bool:
+    """Whether the client cancels a background response; the cancel call may land after the caller is cancelled"""
+    for _ in range(100):
+        if mock.responses[response_id]["status"] == "cancelled":
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+def test_background_response_is_polled_until_it_completes(env, run_with_api):
+    env.setenv("BACKGROUND_POLL_INTERVAL", "0.01")
+
+    async def scenario(mock, client):
+        task = asyncio.ensure_future(client.complete(MESSAGES, background=True))
+        response_id = await wait_for_background_response(mock)
+        mock.finish_response(response_id)
+        return await task, mock.bodies[0]
+
+    content, body = run_with_api(scenario)
+    assert body["background"] is True and body["store"] is True
+    assert content.startswith("Reasoning.")
+
+
+def test_cancelling_a_background_request_cancels_the_response(env, run_with_api):
+    env.setenv("BACKGROUND_POLL_INTERVAL", "0.01")
+
+    async def scenario(mock, client):
+        before = UPSTREAM_CANCELLATIONS.value(tool="other", mode="background")
+        task = asyncio.ensure_future(client.complete(MESSAGES, background=True))
+        response_id = await wait_for_background_response(mock)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        cancelled = await cancelled_upstream(mock, response_id)
+        return cancelled, UPSTREAM_CANCELLATIONS.value(tool="other", mode="background") - before
+
+    cancelled, cancellations = run_with_api(scenario)
+    assert cancelled
+    assert cancellations == 1
+
+
+def test_cancelled_call_is_recorded_with_the_time_it_saved(env, run_with_server):
+    env.setenv("BACKGROUND_POLL_INTERVAL", "0.01")
+    name = "o3_reasoning"
+
+    def snapshot():
+        return {
+            "cancelled": TOOL_CALLS.value(tool=name, status="cancelled"),
+            "finished": TOOL_LATENCY.count(tool=name),
+            "saved": CANCELLATION_SAVED_SECONDS.value(tool=name)
+        }
+
+    async def scenario(mock, server):
+        tool = server.get_tool(name)
+        mock.latency = 0.5
+        # A finished call gives the typical latency the estimate starts from
+        await server._run_tool(tool, {"problem": "Is 91 prime?"})
+        mock.latency = 0.0
+        before = snapshot()
+
+        task = asyncio.ensure_future(server._run_tool(tool, {"problem": "Is 97 prime?", "background": True}))
+        response_id = await wait_for_background_response(mock)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return before, snapshot(), await cancelled_upstream(mock, response_id)
+
+    before, after, cancelled = run_with_server(scenario)
+    assert cancelled
+    assert after["cancelled"] == before["cancelled"] + 1
+    # Cancelled calls do not count towards the latency of finished ones
+    assert after["finished"] == before["finished"] == 1
+    assert after["saved"] > before["saved"]
+
+
+def test_nothing_is_saved_before_a_call_has_finished(env, run_with_server):
+    env.setenv("BACKGROUND_POLL_INTERVAL", "0.01")
+    name = "o3_safety"
+
+    async def scenario(mock, server):
+        before = CANCELLATION_SAVED_SECONDS.value(tool=name)
+        task = asyncio.ensure_future(server._run_tool(
+            server.get_tool(name), {"code": "eval(input())", "language": "python", "background": True}
+        ))
+        response_id = await wait_for_background_response(mock)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await cancelled_upstream(mock, response_id)
+        return TOOL_LATENCY.count(tool=name), CANCELLATION_SAVED_SECONDS.value(tool=name) - before
+
+    finished, saved = run_with_server(scenario)
+    assert finished == 0
+    assert saved == 0
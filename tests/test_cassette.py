@@ -0,0 +1,43 @@
+"""Cassette record/replay against the mock API"""
+
+import pytest
+
+from src.errors import FatalAPIError
+
+MESSAGES = [{"role": "system", "content": "You review code."}, {"role": "user", "content": "def f(): pass"}]
+
+
+def test_cassette_replays_recorded_responses_without_the_network(env, run_with_api):
+    async def scenario(mock, client):
+        return await client.complete(MESSAGES), mock.requests
+
+    env.setenv("CASSETTE_MODE", "record")
+    recorded, requests = run_with_api(scenario)
+    assert requests == 1
+
+    env.setenv("CASSETTE_MODE", "replay")
+    replayed, requests = run_with_api(scenario, payload_size=500)
+    assert replayed == recorded
+    assert requests == 0
+
+
+def test_cassette_replay_fails_on_unrecorded_requests(env, run_with_api):
+    env.setenv("CASSETTE_MODE", "replay")
+
+    async def scenario(mock, client):
+        with pytest.raises(FatalAPIError, match="No recorded response"):
+            await client.complete(MESSAGES)
+        return mock.requests
+
+    assert run_with_api(scenario) == 0
+
+
+def test_cassette_auto_mode_records_misses(env, run_with_api):
+    env.setenv("CASSETTE_MODE", "auto")
+
+    async def scenario(mock, client):
+        first = await client.complete(MESSAGES)
+        return first, await client.complete(MESSAGES), mock.requests
+
+    first, second, requests = run_with_api(scenario)
+    assert first == second and requests == 1
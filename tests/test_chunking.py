@@ -0,0 +1,85 @@
+"""Syntax-aware chunking and per-definition regions"""
+
+from src.chunking import split_code, split_definitions
+from src.tokens import count_tokens
+
+PYTHON = '''import os
+
+
+def first():
+    return 1
+
+
+@decorated
+def second():
+    return 2
+
+
+class Third:
+    value = 3
+'''
+
+
+def test_chunks_cover_every_line_in_order():
+    chunks = split_code(PYTHON, "python", max_tokens=12)
+    assert "".join(chunk.text for chunk in chunks) == PYTHON
+    assert chunks[0].start_line == 1
+    assert all(a.end_line + 1 == b.start_line for a, b in zip(chunks, chunks[1:]))
+    assert chunks[-1].end_line == len(PYTHON.splitlines())
+
+
+def test_chunks_break_between_definitions():
+    chunks = split_code(PYTHON, "python", max_tokens=12)
+    # The decorator starts its definition's chunk
+    assert any(chunk.text.startswith("@decorated") for chunk in chunks)
+    assert not any("def second" in chunk.text and "def first" in chunk.text for chunk in chunks)
+
+
+def test_small_file_is_one_chunk():
+    chunks = split_code(PYTHON, "python", max_tokens=10000)
+    assert len(chunks) == 1 and chunks[0].text == PYTHON
+
+
+def test_oversized_definition_is_split_between_lines():
+    body = "".join(f"    total += {i} * value_{i}\n" for i in range(40))
+    code = f"def big():\n    total = 0\n{body}    return total\n"
+    chunks = split_code(code, "python", max_tokens=60)
+    assert len(chunks) > 1
+    assert "".join(chunk.text for chunk in chunks) == code
+    # Packed line by line, so the budget holds for the sum of the lines' counts
+    assert all(sum(map(count_tokens, chunk.text.splitlines(keepends=True))) <= 60 for chunk in chunks)
+
+
+def test_generic_languages_break_after_closing_braces():
+    code = "function a() {\n  return 1;\n}\nconst x = 1;\nfunction b() {\n  return 2;\n}\n"
+    chunks = split_code(code, "javascript", max_tokens=8)
+    assert [chunk.start_line for chunk in chunks] == [1, 4, 5]
+
+
+def test_invalid_python_falls_back_to_generic_boundaries():
+    code = "def a(:\n    pass\ndef b():\n    pass\n"
+    assert [chunk.start_line for chunk in split_code(code, "python", max_tokens=4)] == [1, 3]
+
+
+def test_definitions_keep_trailing_statements():
+    regions = split_definitions(PYTHON, "python", max_tokens=10000)
+    assert [(region.start_line, region.end_line) for region in regions] == [(1, 3), (4, 7), (8, 12), (13, 14)]
+    assert regions[1].text.startswith("def first") and regions[2].text.startswith("@decorated")
+
+
+def test_editing_one_definition_leaves_the_other_regions_unchanged():
+    edited = PYTHON.replace("return 2", "return 22")
+    before = split_definitions(PYTHON, "python", max_tokens=10000)
+    after = split_definitions(edited, "python", max_tokens=10000)
+    changed = [i for i, (a, b) in enumerate(zip(before, after)) if a.text != b.text]
+    assert changed == [2]
+
+
+def test_oversized_region_keeps_original_line_numbers():
+    body = "".join(f"    total += {i} * value_{i}\n" for i in range(40))
+    code = f"x = 1\n\n\ndef big():\n    total = 0\n{body}    return total\n"
+    regions = split_definitions(code, "python", max_tokens=60)
+    assert regions[0].start_line == 1 and regions[1].start_line == 4
+    lines = code.splitlines(keepends=True)
+    for region in regions:
+        assert region.text == "".join(lines[region.start_line - 1:region.end_line])
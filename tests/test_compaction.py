@@ -0,0 +1,103 @@
+"""Code compaction and mapping model line references back to the original file"""
+
+from src.compaction import compact_code, restore_line_numbers
+
+LICENSE = "# Copyright 2024 Example Corp\n# Licensed under the MIT License\n"
+
+
+def original_line(code: str, compacted, number: int) -> str:
+    return code.splitlines()[compacted.line_map[number - 1] - 1]
+
+
+def test_line_map_points_every_kept_line_at_its_original():
+    code = LICENSE + "import os\n\n\n\n\ndef f():   \n    return os.sep\n"
+    compacted = compact_code(code, "python")
+    lines = compacted.text.splitlines()
+    assert len(lines) == len(compacted.line_map)
+    for number, line in enumerate(lines, 1):
+        if not line.startswith("# ["):
+            assert original_line(code, compacted, number).rstrip() == line
+
+
+def test_license_header_and_blank_runs_are_elided():
+    code = LICENSE + "import os\n\n\n\ndef f():\n    pass\n"
+    compacted = compact_code(code, "python")
+    assert compacted.text.startswith("# [2 lines elided: license header]\nimport os\n\ndef f():")
+    assert compacted.elided == {"license header": 2, "blank": 2}
+    assert compacted.line_map[compacted.text.splitlines().index("def f():")] == 7
+    assert compacted.tokens_after < compacted.tokens_before
+
+
+def test_long_comment_blocks_keep_their_first_lines():
+    comments = "".join(f"// note {i}\n" for i in range(20))
+    code = "int x;\n" + comments + "int y;\n"
+    compacted = compact_code(code, "c", max_comment_lines=5)
+    assert compacted.elided["comment"] == 17
+    lines = compacted.text.splitlines()
+    assert lines[-1] == "int y;" and compacted.line_map[-1] == 22
+
+
+def test_generated_regions_are_elided():
+    code = "a = 1\n# BEGIN GENERATED\nb = 2\nc = 3\n# END GENERATED\nd = 4\n"
+    compacted = compact_code(code, "python")
+    assert compacted.elided == {"generated code": 2}
+    assert compacted.line_map == [1, 2, 3, 5, 6]
+
+
+def test_duplicate_blocks_reference_the_first_copy():
+    block = "".join(f"    value_{i} = compute_something({i})\n" for i in range(6))
+    code = "def a():\n" + block + "def b():\n" + block
+    compacted = compact_code(code, "python", min_duplicate_lines=6)
+    assert compacted.elided == {"duplicate": 6}
+    assert "# [6 lines elided: identical to lines 2-7]" in compacted.text
+    lines = compacted.text.splitlines()
+    assert compacted.line_map[lines.index("def b():")] == 8
+
+
+def test_restore_line_numbers_rewrites_single_lines_and_ranges():
+    line_map = [1, 2, 5, 9, 10, 11]
+    text = "Bug on line 3. See lines 4-6, Lines 2 to 4 and L5."
+    assert restore_line_numbers(text, line_map) == "Bug on line 5. See lines 9-11, Lines 2 to 9 and L10."
+
+
+def test_restore_line_numbers_leaves_out_of_range_references_alone():
+    assert restore_line_numbers("line 0 and line 40", [3, 4]) == "line 0 and line 40"
+
+
+def test_restore_after_compaction_finds_the_original_line():
+    code = LICENSE + "\n\n\nimport os\n\ndef f():\n    return undefined_name\n"
+    compacted = compact_code(code, "python")
+    number = compacted.text.splitlines().index("    return undefined_name") + 1
+    restored = restore_line_numbers(f"NameError at line {number}", compacted.line_map)
+    assert restored == "NameError at line 9"
+
+
+def test_restore_line_numbers_leaves_code_alone():
+    line_map = [1, 2, 5, 9]
+    text = (
+        "The bug is on line 3.\n\n"
+        "```python\nL1 = \"see line 3\"\nvalue = L2\n```\n\n"
+        "Rename `L3` on line 4.\n"
+        "~~~\nline 2\n~~~\n"
+    )
+    assert restore_line_numbers(text, line_map) == text.replace("on line 3", "on line 5").replace("on line 4", "on line 9")
+
+
+def test_unclosed_code_block_runs_to_the_end():
+    assert restore_line_numbers("line 2\n```\nline 2", [1, 7]) == "line 7\n```\nline 2"
+
+
+def test_rewriting_tools_never_compact(env, run_with_server):
+    code = LICENSE + "L1 = 1\n\n\n\nprint(L1)\n"
+
+    async def scenario(mock, server):
+        await server.get_tool("o3_refactor").execute({"code": code, "language": "python", "compact": True})
+        await server.get_tool("o3_debug").execute(
+            {"code": code, "language": "python", "error": "NameError", "expected": "1", "compact": True}
+        )
+        await server.get_tool("o3_analyze").execute({"code": code, "language": "python", "compact": True})
+        return [body["messages"][-1]["content"] for body in mock.bodies]
+
+    refactor, debug, analyze = run_with_server(scenario)
+    assert code.rstrip("\n") in refactor and code.rstrip("\n") in debug
+    assert "Copyright" not in analyze and "license header" in analyze
@@ -0,0 +1,157 @@
+"""Structured findings: parsing, line mapping, merging and the tools' structured mode"""
+
+import json
+
+import pytest
+
+from src import findings as structured
+from src.compaction import compact_code
+from src.findings import Finding, Findings
+from src.tools.analyze import AnalyzeTool
+
+
+def finding(severity="minor", line=1, message="Unused variable.", location="", fix=""):
+    return Finding(severity, line, location, message, fix)
+
+
+def test_parse_findings():
+    result = structured.parse_findings(json.dumps({
+        "summary": " Mostly fine. ",
+        "findings": [
+            {"severity": "HIGH", "line": 3, "location": "f", "message": "SQL injection.", "fix": "Bind parameters."},
+            {"severity": "low", "line": 0, "location": "", "message": "Style.", "fix": ""},
+            {"severity": "low", "line": None, "location": None, "message": "Naming.", "fix": None}
+        ]
+    }))
+    assert result.parsed
+    assert result.summary == "Mostly fine."
+    assert result.findings[0] == Finding("high", 3, "f", "SQL injection.", "Bind parameters.")
+    # Lines that are not positive integers mean "not tied to a line"
+    assert [f.line for f in result.findings] == [3, None, None]
+    assert result.findings[2].location == "" and result.findings[2].fix == ""
+
+
+@pytest.mark.parametrize("text, message", [
+    ("Here is my review in prose.", "not JSON"),
+    ('{"summary": "ok"}', "no findings list"),
+    ('["not", "an", "object"]', "no findings list"),
+    ('{"summary": "", "findings": [{"severity": "low"}]}', "Malformed finding"),
+])
+def test_parse_findings_rejects_other_responses(text, message):
+    with pytest.raises(ValueError, match=message):
+        structured.parse_findings(text)
+
+
+def test_to_json_round_trips():
+    result = Findings("Summary.", [finding(line=None, location="g", fix="Do X.")])
+    assert structured.parse_findings(structured.to_json(result)) == result
+
+
+def test_map_lines_applies_line_map_then_offset():
+    line_map = [1, 2, 10, 11]
+    mapped = structured.map_lines([finding(line=3), finding(line=None), finding(line=9)], line_map, offset=100)
+    # Lines past the end of the map are clamped to its last line
+    assert [f.line for f in mapped] == [110, None, 111]
+
+
+def test_map_lines_after_compaction():
+    header = "".join(f"# Copyright line {i}\n" for i in range(20))
+    code = header + "\n\nimport os\n\n\n\ndef read(path):\n    return open(path).read()\n"
+    compacted = compact_code(code, "python")
+    sent = compacted.text.splitlines()
+    def_line = sent.index("def read(path):") + 1
+    assert def_line < 20
+
+    (mapped,) = structured.map_lines([finding(line=def_line)], compacted.line_map)
+    assert code.splitlines()[mapped.line - 1] == "def read(path):"
+
+
+def test_merge_deduplicates_and_orders():
+    merged = structured.merge([
+        finding("minor", 8, "Unused  variable."),
+        finding("critical", 20, "Injection."),
+        finding("minor", 8, "unused variable."),
+        finding("suggestion", None, "Add docs."),
+        finding("critical", 2, "Injection."),
+        finding("unknown", 1, "Odd severity."),
+    ])
+    assert [(f.severity, f.line) for f in merged] == [
+        ("critical", 2), ("critical", 20), ("minor", 8), ("suggestion", None), ("unknown", 1)
+    ]
+
+
+def test_render():
+    result = Findings("Two issues.", [finding("critical", 4, "Injection.", "q", "Bind it."), finding("minor", None, "Naming.")])
+    text = structured.render(result)
+    assert text.splitlines()[:3] == ["Two issues.", "", "**Findings:** 1 critical, 1 minor"]
+    assert "- **critical** (line 4, `q`): Injection.\n  Fix: Bind it." in text
+    assert "- **minor**: Naming." in text
+    assert structured.render(Findings("", [])) == "No issues found."
+    assert structured.render(Findings("raw text", [], parsed=False)) == "raw text"
+
+
+def test_render_text_passes_other_text_through():
+    assert structured.render_text("Error: 500 - upstream") == "Error: 500 - upstream"
+    rendered = structured.render_text(structured.to_json(Findings("", [finding(line=2), finding(line=2)])))
+    assert rendered.count("Unused variable.") == 1
+
+
+def test_structured_request_falls_back_to_text(run_with_api):
+    async def scenario(mock, client):
+        tool = AnalyzeTool(client.config, client)
+        result = await tool.execute({"code": "x = 1", "language": "python", "structured": True})
+        return result, mock.bodies[0]
+
+    result, body = run_with_api(scenario)
+    # The mock answers in prose, which is returned as it is
+    assert result.startswith("Reasoning.")
+    assert body["text"]["format"]["name"] == "findings"
+    assert body["text"]["format"]["schema"]["properties"]["findings"]["items"]["properties"]["severity"]["enum"] == \
+        list(AnalyzeTool.severities)
+
+
+def test_structured_lines_refer_to_the_original_file(run_with_api):
+    code = "".join(f"# License line {i}\n" for i in range(30)) + "\nimport os\n\nvalue = eval(input())\n"
+
+    async def scenario(mock, client):
+        sent = []
+
+        async def complete(messages, **kwargs):
+            shown = messages[-1]["content"].split("```python\n", 1)[1].split("\n```", 1)[0].splitlines()
+            sent.append(shown)
+            line = shown.index("value = eval(input())") + 1
+            return json.dumps({"summary": "", "findings": [
+                {"severity": "critical", "line": line, "location": "", "message": "eval of input.", "fix": ""}
+            ]})
+
+        client.complete = complete
+        tool = AnalyzeTool(client.config, client)
+        return await tool.execute({"code": code, "language": "python", "structured": True, "compact": True}), sent
+
+    result, sent = run_with_api(scenario)
+    assert len(sent[0]) < len(code.splitlines())
+    expected = code.splitlines().index("value = eval(input())") + 1
+    assert f"(line {expected})" in result
+
+
+def test_complete_with_reasoning_uses_separate_fields(run_with_api):
+    async def scenario(mock, client):
+        replies = iter([
+            json.dumps({"reasoning": "Step one.\n\nStep two.", "answer": "Use a queue.\n\nThen shard it."}),
+            "Plain text.\n\nWith paragraphs."
+        ])
+        formats = []
+
+        async def complete(messages, **kwargs):
+            formats.append(kwargs["text"]["format"]["name"])
+            return next(replies)
+
+        client.complete = complete
+        structured_reply = await client.complete_with_reasoning([{"role": "user", "content": "q"}], "high")
+        prose_reply = await client.complete_with_reasoning([{"role": "user", "content": "q"}], "high")
+        return structured_reply, prose_reply, formats
+
+    structured_reply, prose_reply, formats = run_with_api(scenario)
+    assert structured_reply == {"reasoning": "Step one.\n\nStep two.", "answer": "Use a queue.\n\nThen shard it."}
+    assert prose_reply == {"reasoning": "", "answer": "Plain text.\n\nWith paragraphs."}
+    assert formats == ["reasoned_answer", "reasoned_answer"]
@@ -0,0 +1,95 @@
+"""Hedged requests: racing, error precedence and spend accounting"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.mock_openai import MockOpenAI
+from src.hedging import Hedger
+from src.tokens import estimate_cost, estimate_tokens
+
+
+def hedger_ready(tool: str = "t", latency: float = 0.01) -> Hedger:
+    hedger = Hedger(min_samples=1, window=1, max_ratio=1.0)
+    hedger._observe(tool, latency)
+    return hedger
+
+
+def test_no_hedge_before_enough_samples():
+    hedger = Hedger(min_samples=2)
+    hedger._observe("t", 0.01)
+    assert hedger.delay_for("t") is None
+
+
+def test_slow_primary_loses_to_hedge():
+    async def scenario():
+        async def primary():
+            await asyncio.sleep(1)
+            return "primary"
+
+        async def backup():
+            return "hedge"
+
+        hedger = hedger_ready()
+        return await hedger.run("t", primary, backup), hedger.stats
+
+    result, stats = asyncio.run(scenario())
+    assert result == "hedge"
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_cancelled_task_is_treated_as_failure():
+    async def scenario():
+        async def primary():
+            await asyncio.sleep(0.05)
+            return "primary"
+
+        async def backup():
+            raise asyncio.CancelledError()
+
+        return await hedger_ready().run("t", primary, backup)
+
+    assert asyncio.run(scenario()) == "primary"
+
+
+def test_primary_error_wins_when_both_fail():
+    async def scenario():
+        async def primary():
+            await asyncio.sleep(0.05)
+            raise ValueError("primary failed")
+
+        async def backup():
+            raise RuntimeError("hedge failed")
+
+        await hedger_ready().run("t", primary, backup)
+
+    with pytest.raises(ValueError, match="primary failed"):
+        asyncio.run(scenario())
+
+
+def test_hedge_reserves_budget_and_is_priced_at_its_model(env, run_with_api):
+    env.setenv("BUDGET_ENABLED", "true")
+    env.setenv("HEDGE_ENABLED", "true")
+    env.setenv("HEDGE_MODEL", "o4-mini")
+    env.setenv("HEDGE_MIN_SAMPLES", "1")
+    env.setenv("HEDGE_WINDOW", "1")
+    env.setenv("HEDGE_MAX_RATIO", "1")
+    messages = [{"role": "user", "content": "x" * 4000}]
+
+    async def scenario(mock, client):
+        fast = await MockOpenAI(latency=0.0, payload_size=400).start()
+        try:
+            client.hedger.base_url = fast.base_url
+            client.hedger._observe("t", 0.01)
+            content = await client.complete(messages, tool="t")
+            return content, client.budget.stats["spent_usd"], client.budget._reserved, fast.requests
+        finally:
+            await fast.stop()
+
+    content, spent, reserved, hedge_requests = run_with_api(scenario, latency=1.0)
+    assert hedge_requests == 1
+    assert content.startswith("Reasoning.")
+    hedge_cost = estimate_cost("o4-mini", 1000, 100)
+    primary_input_cost = estimate_cost("o3-pro", estimate_tokens(messages), 0)
+    assert spent == pytest.approx(hedge_cost + primary_input_cost)
+    assert reserved == {}
@@ -0,0 +1,192 @@
+"""Changed-line detection, region cache keys and incremental o3_review"""
+
+import difflib
+import json
+
+import pytest
+
+from src.incremental import (
+    changed_lines_between, changed_lines_from_diff, format_ranges, line_ranges, region_key
+)
+from src.tools.review import ReviewTool
+
+PREVIOUS = '''def first():
+    return 1
+
+
+def second():
+    return 2
+
+
+def third():
+    return 3
+'''
+CURRENT = PREVIOUS.replace("return 2", "return 20")
+# A whole-file review of CURRENT split by region
+BY_REGION = """Overall fine.
+
+### Lines 1-4
+No issues found.
+
+### Lines 5-8
+Line 6: returns the wrong value.
+
+### Lines 9-10
+No issues found.
+"""
+
+
+def test_changed_lines_between():
+    assert changed_lines_between(PREVIOUS, CURRENT) == {6}
+    assert changed_lines_between("a\nb\nc\n", "a\nc\n") == {2}
+    assert changed_lines_between("a\n", "a\nb\nc\n") == {2, 3}
+
+
+def test_changed_lines_from_diff_matches_between():
+    diff = "".join(difflib.unified_diff(PREVIOUS.splitlines(True), CURRENT.splitlines(True), "a/f.py", "b/f.py"))
+    assert changed_lines_from_diff(diff) == changed_lines_between(PREVIOUS, CURRENT)
+
+
+def test_changed_lines_from_diff_requires_hunks():
+    with pytest.raises(ValueError, match="no hunks"):
+        changed_lines_from_diff("--- a/f.py\n+++ b/f.py\n")
+
+
+def test_line_ranges_and_format():
+    ranges = line_ranges({7, 1, 2, 3, 9, 8})
+    assert ranges == [(1, 3), (7, 9)]
+    assert format_ranges(ranges + [(12, 12)]) == "1-3, 7-9, 12"
+
+
+def test_region_key_covers_prompt_and_settings():
+    settings = {"system_prompt": "review", "instructions": "list issues", "model": "o3-pro", "tier": None}
+    key = region_key("code", settings)
+    assert region_key("code", dict(settings)) == key
+    assert region_key("code changed", settings) != key
+    for name, value in (("system_prompt", "other"), ("instructions", "other"), ("model", "o3"), ("tier", "fast")):
+        assert region_key("code", {**settings, name: value}) != key
+
+
+def answer_by_region(mock, text=BY_REGION):
+    """Make the mock answer every request with text"""
+    completion = mock._completion
+
+    def by_region(body, response_id):
+        data = completion(body, response_id)
+        data["output_text"] = text
+        return data
+
+    mock._completion = by_region
+
+
+def test_first_incremental_review_is_one_request_that_seeds_regions(env, run_with_api):
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+    arguments = {"code": CURRENT, "language": "python", "previous_code": PREVIOUS, "pr_description": "Fix second"}
+
+    async def scenario(mock, client):
+        answer_by_region(mock)
+        tool = ReviewTool(client.config, client)
+        first = await tool.execute(arguments)
+        after_first = mock.requests
+        second = await tool.execute(arguments)
+        after_second = mock.requests
+        # pr_description is part of the prompt, so a new one must not reuse findings
+        await tool.execute({**arguments, "pr_description": "Something else"})
+        return first, after_first, second, after_second, mock.requests
+
+    first, after_first, second, after_second, after_third = run_with_api(scenario)
+    assert after_first == 1
+    assert "1 changed region(s) reviewed, 2 unchanged region(s) reviewed" in first
+    assert "### Lines 5-8 (changed, reviewed)\nLine 6: returns the wrong value." in first
+    assert "### Lines 9-10 (unchanged, no cached findings)\nNo issues found." in first
+    # Region findings were cached numbered from the region's first line and come back as file lines
+    assert after_second == 1
+    assert "3 reused from earlier reviews" in second
+    assert "### Lines 5-8 (from an earlier review)\nLine 6: returns the wrong value." in second
+    assert after_third == 2
+
+
+def test_only_uncached_regions_are_sent_once_a_file_was_reviewed(env, run_with_api):
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+    edited = CURRENT.replace("return 3", "return 30")
+
+    async def scenario(mock, client):
+        answer_by_region(mock)
+        tool = ReviewTool(client.config, client)
+        await tool.execute({"code": CURRENT, "language": "python", "previous_code": PREVIOUS})
+        after_first = mock.requests
+        result = await tool.execute({"code": edited, "language": "python", "previous_code": CURRENT})
+        return after_first, result, mock.requests, mock.bodies[-1]
+
+    after_first, result, requests, body = run_with_api(scenario)
+    assert after_first == 1
+    assert requests == 2
+    assert "1 changed region(s) reviewed, 0 unchanged region(s) reviewed because no earlier findings were cached, 2 reused" in result
+    assert "return 30" in str(body) and "return 20" not in str(body)
+
+
+def test_incremental_review_without_cache_is_an_ordinary_review(env, run_with_api):
+    arguments = {"code": CURRENT, "language": "python", "previous_code": PREVIOUS}
+
+    async def scenario(mock, client):
+        tool = ReviewTool(client.config, client)
+        return await tool.execute(arguments), mock.requests
+
+    result, requests = run_with_api(scenario)
+    assert requests == 1
+    assert result.startswith("Reasoning.")
+    assert "Incremental review" not in result
+
+
+def test_incremental_review_with_no_cache_argument_is_an_ordinary_review(env, run_with_api):
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+    arguments = {"code": CURRENT, "language": "python", "previous_code": PREVIOUS, "no_cache": True}
+
+    async def scenario(mock, client):
+        answer_by_region(mock)
+        tool = ReviewTool(client.config, client)
+        await tool.execute(arguments)
+        await tool.execute(arguments)
+        return mock.requests
+
+    assert run_with_api(scenario) == 2
+
+
+def test_review_that_cannot_be_split_is_returned_whole(env, run_with_api):
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+    edited = CURRENT.replace("return 3", "return 30")
+
+    async def scenario(mock, client):
+        tool = ReviewTool(client.config, client)
+        first = await tool.execute({"code": CURRENT, "language": "python", "previous_code": PREVIOUS})
+        await tool.execute({"code": edited, "language": "python", "previous_code": CURRENT})
+        return first, mock.requests
+
+    first, requests = run_with_api(scenario)
+    assert first.startswith("Reasoning.")
+    # Nothing was cached by region, so the next review is one request again rather than one per region
+    assert requests == 2
+
+
+def test_first_structured_incremental_review_splits_findings(env, run_with_api):
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+    arguments = {"code": CURRENT, "language": "python", "previous_code": PREVIOUS, "structured": True}
+    findings = json.dumps({"summary": "Small module.", "findings": [
+        {"severity": "major", "line": 6, "location": "second", "message": "Wrong value.", "fix": ""},
+        {"severity": "minor", "line": 9, "location": "third", "message": "No docstring.", "fix": ""}
+    ]})
+
+    async def scenario(mock, client):
+        answer_by_region(mock, findings)
+        tool = ReviewTool(client.config, client)
+        first = await tool.execute(arguments)
+        second = await tool.execute(arguments)
+        return first, second, mock.requests
+
+    first, second, requests = run_with_api(scenario)
+    assert requests == 1
+    for result in (first, second):
+        assert "Wrong value." in result and "line 6" in result
+        assert "No docstring." in result and "line 9" in result
+    assert "Whole file: Small module." in first
+    assert "3 reused from earlier reviews" in second
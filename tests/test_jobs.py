@@ -0,0 +1,125 @@
+"""Background jobs and the status, result and cancel tools"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.jobs import JobManager
+from src.server import OpenAIMCPServer
+
+
+def job_tools(jobs: JobManager):
+    """The server's status, result and cancel tools, reading jobs"""
+    server = OpenAIMCPServer()
+    server.jobs = jobs
+    return tuple(server.get_tool(name) for name in ("o3_job_status", "o3_job_result", "o3_job_cancel"))
+
+
+def test_submit_status_and_result(env):
+    async def scenario():
+        jobs = JobManager()
+        status, result, _ = job_tools(jobs)
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "review done"
+
+        job = jobs.submit("o3_review", work())
+        running = json.loads(await status.execute({"job_id": job.id}))
+        pending = await result.execute({"job_id": job.id})
+        release.set()
+        finished = await result.execute({"job_id": job.id, "wait": 1})
+        listed = json.loads(await status.execute({}))
+        return job, running, pending, finished, listed
+
+    job, running, pending, finished, listed = asyncio.run(scenario())
+    assert running["status"] == "running" and running["tool"] == "o3_review"
+    assert pending.startswith(f"Job {job.id} is still running")
+    assert finished == "review done"
+    assert [entry["status"] for entry in listed] == ["completed"]
+
+
+def test_failed_job_reports_its_error(env):
+    async def scenario():
+        jobs = JobManager()
+        status, result, _ = job_tools(jobs)
+
+        async def work():
+            raise RuntimeError("upstream exploded")
+
+        job = jobs.submit("o3_review", work())
+        await jobs.wait(job.id, 1)
+        return job, json.loads(await status.execute({"job_id": job.id})), await result.execute({"job_id": job.id})
+
+    job, described, text = asyncio.run(scenario())
+    assert described["status"] == "failed" and described["error"] == "upstream exploded"
+    assert text == f"Job {job.id} failed: upstream exploded"
+
+
+def test_unknown_job_is_an_error(env):
+    async def scenario():
+        _, result, cancel = job_tools(JobManager())
+        for tool in (result, cancel):
+            with pytest.raises(ValueError, match="Unknown job: job_missing"):
+                await tool.execute({"job_id": "job_missing"})
+        with pytest.raises(ValueError, match="job_id"):
+            await result.execute({})
+
+    asyncio.run(scenario())
+
+
+def test_oldest_finished_jobs_expire(env):
+    async def scenario():
+        jobs = JobManager(max_finished=2)
+
+        async def work(index):
+            return f"result {index}"
+
+        finished = [jobs.submit("o3_review", work(i)) for i in range(3)]
+        await asyncio.gather(*(job.task for job in finished))
+        await asyncio.sleep(0)
+        _, result, _ = job_tools(jobs)
+        with pytest.raises(ValueError, match="Unknown job"):
+            await result.execute({"job_id": finished[0].id})
+        return [await result.execute({"job_id": job.id}) for job in finished[1:]]
+
+    assert asyncio.run(scenario()) == ["result 1", "result 2"]
+
+
+def test_cancel_tool_cancels_a_running_job(env):
+    async def scenario():
+        jobs = JobManager()
+        _, result, cancel = job_tools(jobs)
+        job = jobs.submit("o3_review", asyncio.sleep(60, "never"))
+        cancelled = await cancel.execute({"job_id": job.id})
+        await asyncio.sleep(0)
+        return job, cancelled, await cancel.execute({"job_id": job.id}), await result.execute({"job_id": job.id})
+
+    job, cancelled, again, text = asyncio.run(scenario())
+    assert cancelled == f"Job {job.id} cancelled."
+    assert again == f"Job {job.id} already finished (cancelled)."
+    assert text == f"Job {job.id} was cancelled."
+
+
+def test_shutdown_cancels_running_jobs():
+    async def scenario():
+        jobs = JobManager()
+        unwound = []
+
+        async def work():
+            try:
+                await asyncio.sleep(60)
+            finally:
+                unwound.append(True)
+
+        running = [jobs.submit("o3_review", work()) for _ in range(3)]
+        done = jobs.submit("o3_review", asyncio.sleep(0, "done"))
+        await asyncio.sleep(0.01)
+        await jobs.shutdown()
+        return [job.status for job in running], done.status, unwound
+
+    statuses, done, unwound = asyncio.run(scenario())
+    assert statuses == ["cancelled"] * 3 and unwound == [True] * 3
+    assert done == "completed"
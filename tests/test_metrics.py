@@ -0,0 +1,94 @@
+"""Prometheus text exposition and the o3_status tool"""
+
+import json
+
+import pytest
+
+from src.metrics import MetricsRegistry, tool_summary
+
+
+def test_counters_render_with_labels_and_escaping():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls by outcome", ("tool", "status"))
+    retries = registry.counter("retries_total", "Retries")
+    calls.inc(tool="o3_review", status="ok")
+    calls.inc(2, tool='say "hi"\n', status="error")
+
+    assert registry.render() == (
+        "# HELP calls_total Calls by outcome\n"
+        "# TYPE calls_total counter\n"
+        'calls_total{tool="o3_review",status="ok"} 1\n'
+        'calls_total{tool="say \\"hi\\"\\n",status="error"} 2\n'
+        "# HELP retries_total Retries\n"
+        "# TYPE retries_total counter\n"
+        "retries_total 0\n"
+    )
+    assert retries.value() == 0
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("tool",), buckets=(0.1, 1, 10))
+    for value in (0.05, 0.5, 0.7, 20):
+        latency.observe(value, tool="o3_review")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+    assert lines[2:] == [
+        'latency_seconds_bucket{tool="o3_review",le="0.1"} 1',
+        'latency_seconds_bucket{tool="o3_review",le="1"} 3',
+        'latency_seconds_bucket{tool="o3_review",le="10"} 3',
+        'latency_seconds_bucket{tool="o3_review",le="+Inf"} 4',
+        'latency_seconds_sum{tool="o3_review"} 21.25',
+        'latency_seconds_count{tool="o3_review"} 4',
+    ]
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("tool",), buckets=(1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3):
+        latency.observe(value, tool="t")
+    assert latency.quantile(0.5, tool="t") == pytest.approx(1.5)
+    assert latency.quantile(1.0, tool="t") == pytest.approx(4)
+    latency.observe(100, tool="t")
+    # Observations above the last bucket report its bound
+    assert latency.quantile(0.99, tool="t") == 4
+    assert latency.quantile(0.5, tool="other") is None
+
+
+def test_labels_must_match_and_names_are_unique():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ("tool",))
+    with pytest.raises(ValueError, match="expects labels"):
+        calls.inc(status="ok")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.histogram("calls_total", "Again")
+
+
+def test_status_tool_reports_calls_latency_tokens_and_cache(env, run_with_server):
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+    arguments = {"requirements": "Parse an ISO date", "language": "python"}
+
+    async def scenario(mock, server):
+        before = tool_summary().get("o3_code", {"calls": 0, "tokens": {}})
+        tool = server.get_tool("o3_code")
+        first = await server._run_tool(tool, arguments)
+        second = await server._run_tool(tool, arguments)
+        status = json.loads(await server.get_tool("o3_status").execute({}))
+        return before, first == second, status, mock.requests
+
+    before, same, status, requests = run_with_server(scenario)
+    assert same and requests == 1
+
+    code = status["tools"]["o3_code"]
+    assert code["calls"] == before["calls"] + 2
+    assert code["errors"] == 0 and code["error_rate"] == 0.0
+    assert {"p50_seconds", "p95_seconds", "p99_seconds"} <= set(code)
+    assert code["tokens"]["output"] > before["tokens"].get("output", 0)
+    assert status["http_responses"]["200"] >= 1
+    assert status["response_cache"]["memory_hits"] == 1 and status["response_cache"]["writes"] == 1
+    assert status["retries"] == {"retries": 0, "retried_calls": 0, "exhausted": 0}
+    assert status["scheduler"] == {"o3_code": {"running": 0, "queued": 0}}
+    assert status["background_jobs"] == 0
+    assert "budget" not in status and "routing" not in status
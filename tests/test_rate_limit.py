@@ -0,0 +1,80 @@
+"""Token-bucket rate limiting and x-ratelimit-* header handling"""
+
+import asyncio
+
+import pytest
+
+from src.rate_limit import RateLimiter, TokenBucket, parse_reset
+
+
+def test_parse_reset_durations():
+    assert parse_reset("1s") == 1.0
+    assert parse_reset("6m0s") == 360.0
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("1h2m3.5s") == pytest.approx(3723.5)
+    assert parse_reset("") is None and parse_reset("soon") is None
+
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(None)
+    bucket.consume(10 ** 9)
+    assert bucket.wait_time(10 ** 9) == 0.0
+
+
+def test_wait_time_once_empty():
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0.0
+    bucket.consume(60)
+    # 60 per minute refills one token a second
+    assert bucket.wait_time(30) == pytest.approx(30, abs=0.1)
+
+
+def test_oversized_request_waits_for_a_full_bucket_only():
+    bucket = TokenBucket(100)
+    assert bucket.wait_time(1000) == 0.0
+    bucket.consume(1000)
+    assert bucket.tokens == pytest.approx(0, abs=0.1)
+    assert bucket.wait_time(1000) == pytest.approx(60, abs=0.1)
+
+
+def test_headers_set_capacity_and_remaining():
+    limiter = RateLimiter()
+    limiter.update_from_headers({
+        "x-ratelimit-limit-requests": "500",
+        "x-ratelimit-remaining-requests": "499",
+        "x-ratelimit-limit-tokens": "30000",
+        "x-ratelimit-remaining-tokens": "1000",
+        "x-ratelimit-reset-tokens": "58s",
+    })
+    assert limiter.requests.capacity == 500 and limiter.requests.tokens == pytest.approx(499, abs=0.1)
+    assert limiter.tokens.capacity == 30000 and limiter.tokens.tokens == pytest.approx(1000, abs=1)
+
+
+def test_exhausted_quota_stays_empty_until_reset():
+    limiter = RateLimiter(rpm=60)
+    limiter.update_from_headers({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s"})
+    assert limiter.requests.wait_time(1) == pytest.approx(3, abs=0.1)
+
+
+def test_malformed_headers_are_ignored():
+    limiter = RateLimiter(rpm=60, tpm=1000)
+    limiter.update_from_headers({"x-ratelimit-limit-requests": "lots", "x-ratelimit-remaining-tokens": ""})
+    assert limiter.requests.capacity == 60 and limiter.tokens.capacity == 1000
+
+
+def test_acquire_spends_from_both_buckets():
+    limiter = RateLimiter(rpm=60, tpm=10000)
+    asyncio.run(limiter.acquire(2500))
+    assert limiter.requests.tokens == pytest.approx(59, abs=0.1)
+    assert limiter.tokens.tokens == pytest.approx(7500, abs=1)
+    assert limiter.stats["acquired"] == 1 and limiter.stats["waited"] == 0
+
+
+def test_acquire_queues_until_tokens_refill():
+    # 6000 tokens per minute refill 100 a second, so 5 missing tokens take about 50 ms
+    limiter = RateLimiter(tpm=6000)
+    limiter.tokens.tokens = -5
+
+    asyncio.run(limiter.acquire(0))
+    assert limiter.stats["waited"] == 1
+    assert 0.03 <= limiter.stats["wait_seconds"] <= 0.2
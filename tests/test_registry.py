@@ -0,0 +1,26 @@
+"""The static tool manifest and input validation"""
+
+from src.server import OpenAIMCPServer
+from src.tools.registry import TOOL_SPECS, load_manifest, tool_metadata
+
+
+def test_manifest_matches_the_tools(env):
+    server = OpenAIMCPServer()
+    live = [tool_metadata(server.get_tool(spec.name)) for spec in TOOL_SPECS]
+    # Regenerate with: python -m src.tools.registry
+    assert load_manifest() == live
+
+
+def test_tools_are_created_on_first_use(env):
+    server = OpenAIMCPServer()
+    assert server.tools == {}
+    assert len(server._tool_list) == len(TOOL_SPECS)
+    server.get_tool("o3_review_batch")
+    assert set(server.tools) == {"o3_review", "o3_review_batch"}
+
+
+def test_validation_errors(env):
+    server = OpenAIMCPServer()
+    assert server._validation_error("o3_analyze", {"code": "x", "language": "python"}) is None
+    assert "'language' is a required property" in server._validation_error("o3_analyze", {"code": "x"})
+    assert server._validation_error("o3_analyze", {"code": "x", "language": "python", "structured": "yes"}) is not None
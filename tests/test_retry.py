@@ -0,0 +1,89 @@
+"""Retry policy: full-jitter backoff, Retry-After handling and which failures are retried"""
+
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+import pytest
+
+from src.errors import FatalAPIError, RetryableAPIError, parse_retry_after
+from src.retry import RetryPolicy
+
+
+def test_retry_after_ms_takes_precedence():
+    assert parse_retry_after({"retry-after-ms": "250", "Retry-After": "5"}) == 0.25
+
+
+def test_retry_after_seconds_and_http_date():
+    assert parse_retry_after({"Retry-After": "3"}) == 3.0
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after({"Retry-After": later}) <= 30
+
+
+def test_unparseable_or_missing_retry_after_is_ignored():
+    assert parse_retry_after({}) is None
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after({"retry-after-ms": "x", "Retry-After": "2"}) == 2.0
+
+
+def test_backoff_is_full_jitter_capped_at_max_delay():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    for attempt in range(6):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= min(5.0, 2 ** attempt) for delay in delays)
+    # Jitter spreads retries out rather than sending them in lockstep
+    assert len({round(policy.backoff(3), 6) for _ in range(20)}) > 1
+
+
+def test_backoff_never_sooner_than_retry_after():
+    policy = RetryPolicy(base_delay=0.01, max_delay=0.02)
+    assert all(policy.backoff(0, retry_after=1.5) == 1.5 for _ in range(50))
+
+
+def test_error_for_status_types():
+    policy = RetryPolicy()
+    error = policy.error_for_status(429, "slow down", {"retry-after-ms": "100"})
+    assert isinstance(error, RetryableAPIError) and error.retry_after == 0.1
+    assert isinstance(policy.error_for_status(400, "bad", {}), FatalAPIError)
+
+
+def run_policy(policy, failures):
+    """Run policy against a call that raises each of failures in turn, then succeeds"""
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return "ok"
+
+    return asyncio.run(policy.run(fn)), len(calls)
+
+
+def test_transient_failures_are_retried():
+    policy = RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=0.001)
+    failures = [RetryableAPIError("busy", 503), aiohttp.ClientConnectionError("reset")]
+    assert run_policy(policy, failures) == ("ok", 3)
+    assert policy.stats == {"retries": 2, "retried_calls": 1, "exhausted": 0}
+
+
+def test_fatal_errors_are_not_retried():
+    policy = RetryPolicy(base_delay=0.001)
+    with pytest.raises(FatalAPIError):
+        run_policy(policy, [FatalAPIError("bad request", 400)])
+    assert policy.stats["retries"] == 0
+
+
+def test_gives_up_after_max_attempts():
+    policy = RetryPolicy(max_attempts=2, base_delay=0.001, max_delay=0.001)
+    with pytest.raises(RetryableAPIError, match="Connection error after 2 attempts"):
+        run_policy(policy, [aiohttp.ClientConnectionError("reset")] * 3)
+    assert policy.stats["exhausted"] == 1
+
+
+def test_gives_up_when_retry_after_passes_the_deadline():
+    policy = RetryPolicy(max_attempts=5, deadline=1.0)
+    with pytest.raises(RetryableAPIError, match="busy"):
+        run_policy(policy, [RetryableAPIError("busy", 429, retry_after=30)])
+    assert policy.stats["retries"] == 0
@@ -0,0 +1,135 @@
+"""Tier routing and the self-check escalation cascade"""
+
+import json
+
+import pytest
+
+from src.routing import SELF_CHECK_INSTRUCTION, Router
+from src.tools.review import ReviewTool
+
+MESSAGES = [{"role": "system", "content": "You review code."}, {"role": "user", "content": "def f(): pass"}]
+
+
+def make_router(**options) -> Router:
+    return Router({"fast": "o4-mini", "standard": "o3", "deep": "o3-pro"}, **options)
+
+
+def test_route_precedence():
+    router = make_router(tool_tiers={"o3_safety": "deep"})
+    assert router.route("o3_safety", 10, depth="low", tier="fast")[:3] == ("fast", "o4-mini", "explicit")
+    assert router.route("o3_safety", 10, depth="low")[:3] == ("deep", "o3-pro", "tool")
+    assert router.route("o3_review", 10, depth="high")[:3] == ("deep", "o3-pro", "depth")
+    assert router.route("o3_review", 10, depth="low")[:3] == ("fast", "o4-mini", "depth")
+
+
+def test_route_by_size():
+    router = make_router(fast_max_tokens=100, standard_max_tokens=1000, cascade=True)
+    assert router.route(None, 100) == ("fast", "o4-mini", "size", True)
+    assert router.route(None, 1000) == ("standard", "o3", "size", True)
+    # Nothing to escalate to from the deep tier
+    assert router.route(None, 1001) == ("deep", "o3-pro", "size", False)
+
+
+def test_unknown_tier_is_rejected():
+    with pytest.raises(ValueError, match="Unknown tier"):
+        make_router().route(None, 10, tier="huge")
+
+
+def test_check_reads_and_strips_the_confidence_line():
+    router = make_router(min_confidence=7)
+    assert router.check("Looks fine.\n\n**Confidence: 8/10**") == (True, "Looks fine.")
+    assert router.check("Unsure.\nconfidence: 6.5 / 10") == (False, "Unsure.")
+    assert router.check("No self-check here.") == (False, "No self-check here.")
+
+
+def cascade_env(env):
+    env.setenv("ROUTING_ENABLED", "true")
+    env.setenv("CASCADE_ENABLED", "true")
+    env.setenv("CASCADE_MIN_CONFIDENCE", "7")
+
+
+def answer_with_confidence(mock, score):
+    """Make the mock end every answer with a self-reported confidence line"""
+    completion = mock._completion
+
+    def with_confidence(body, response_id):
+        data = completion(body, response_id)
+        data["output_text"] += f"\nConfidence: {score}/10"
+        return data
+
+    mock._completion = with_confidence
+
+
+def test_confident_cascade_answer_is_accepted(env, run_with_api):
+    cascade_env(env)
+
+    async def scenario(mock, client):
+        answer_with_confidence(mock, 9)
+        return await client.complete(MESSAGES, tool="o3_code_review"), mock.bodies
+
+    content, bodies = run_with_api(scenario)
+    assert [body["model"] for body in bodies] == ["o4-mini"]
+    assert SELF_CHECK_INSTRUCTION in bodies[0]["messages"][0]["content"]
+    assert content.startswith("Reasoning.") and "Confidence" not in content
+
+
+def test_unconfident_cascade_answer_escalates_to_the_deep_model(env, run_with_api):
+    cascade_env(env)
+
+    async def scenario(mock, client):
+        answer_with_confidence(mock, 4)
+        return await client.complete(MESSAGES, tool="o3_code_review"), mock.bodies
+
+    content, bodies = run_with_api(scenario)
+    assert [body["model"] for body in bodies] == ["o4-mini", "o3-pro"]
+    # The escalated request is the original one, without the self-check
+    assert bodies[1]["messages"] == MESSAGES
+    assert content.endswith("Confidence: 4/10")
+
+
+def test_answer_without_a_confidence_line_escalates(env, run_with_api):
+    cascade_env(env)
+
+    async def scenario(mock, client):
+        await client.complete(MESSAGES, tool="o3_code_review")
+        return [body["model"] for body in mock.bodies]
+
+    assert run_with_api(scenario) == ["o4-mini", "o3-pro"]
+
+
+def test_high_depth_skips_the_cascade(env, run_with_api):
+    cascade_env(env)
+
+    async def scenario(mock, client):
+        await client.complete(MESSAGES, tool="o3_code_review", depth="high")
+        return [body["model"] for body in mock.bodies]
+
+    assert run_with_api(scenario) == ["o3-pro"]
+
+
+def test_structured_output_skips_the_cascade(env, run_with_api):
+    cascade_env(env)
+    findings = json.dumps({"summary": "One issue.", "findings": [
+        {"severity": "minor", "line": 1, "location": "f", "message": "Empty function.", "fix": ""}
+    ]})
+
+    async def scenario(mock, client):
+        completion = mock._completion
+
+        def answer(body, response_id):
+            data = completion(body, response_id)
+            data["output_text"] = findings
+            return data
+
+        mock._completion = answer
+        tool = ReviewTool(client.config, client)
+        review = await tool.execute({"code": "def f(): pass", "language": "python", "structured": True})
+        reasoned = await client.complete_with_reasoning(MESSAGES, "low", tool="o3_reasoning")
+        return review, reasoned, mock.bodies
+
+    review, reasoned, bodies = run_with_api(scenario)
+    # A json_schema answer cannot end with a confidence line, so one request each, without the self-check
+    assert [body["model"] for body in bodies] == ["o4-mini", "o4-mini"]
+    assert all(SELF_CHECK_INSTRUCTION not in body["messages"][0]["content"] for body in bodies)
+    assert "Empty function." in review
+    assert reasoned["answer"] == findings
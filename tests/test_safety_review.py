@@ -0,0 +1,34 @@
+"""o3_safety keeps its high reasoning depth for large, chunked inputs"""
+
+from src.tools.safety_review import SafetyReviewTool
+
+HIGH_DEPTH = "Provide detailed reasoning, exploring multiple approaches and trade-offs"
+
+CODE = "\n\n".join(
+    f"def handler_{i}(request):\n    query = 'SELECT * FROM t WHERE id = ' + request.args['id']\n    return db.execute(query)\n"
+    for i in range(40)
+)
+
+
+def test_chunked_review_uses_high_depth_for_every_request(env, run_with_api):
+    env.setenv("CHUNK_MAX_TOKENS", "200")
+
+    async def scenario(mock, client):
+        tool = SafetyReviewTool(client.config, client)
+        await tool.execute({"code": CODE, "language": "python", "chunked": True})
+        return mock.bodies
+
+    bodies = run_with_api(scenario)
+    # Several chunks plus the merge request
+    assert len(bodies) > 2
+    for body in bodies:
+        assert body["messages"][0]["content"].endswith(HIGH_DEPTH + " before arriving at your answer.")
+
+
+def test_single_request_uses_high_depth(env, run_with_api):
+    async def scenario(mock, client):
+        await SafetyReviewTool(client.config, client).execute({"code": "x = 1", "language": "python"})
+        return mock.bodies
+
+    (body,) = run_with_api(scenario)
+    assert HIGH_DEPTH in body["messages"][0]["content"]
@@ -0,0 +1,182 @@
+"""Priority scheduling, global and per-tool caps, and slots freed by cancellation"""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from src.scheduler import Scheduler
+from src.server import OpenAIMCPServer
+
+
+async def hold(scheduler: Scheduler, tool: str, release: asyncio.Event, log: List[str], priority=None):
+    """Take a slot for tool, note the admission in log and keep the slot until release is set"""
+    async with scheduler.slot(tool, priority):
+        log.append(tool if priority is None else f"{tool}:{priority}")
+        await release.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_higher_priority_is_admitted_first_fifo_within_priority():
+    async def scenario():
+        scheduler = Scheduler(max_concurrent=1)
+        log: List[str] = []
+        blocker = asyncio.Event()
+        first = asyncio.ensure_future(hold(scheduler, "blocker", blocker, log))
+        await settle()
+
+        go = asyncio.Event()
+        go.set()
+        queued = [
+            asyncio.ensure_future(hold(scheduler, name, go, log, priority))
+            for name, priority in (("a", "low"), ("b", "normal"), ("c", "high"), ("d", "normal"))
+        ]
+        await settle()
+        blocker.set()
+        await asyncio.gather(first, *queued)
+        return log
+
+    assert asyncio.run(scenario()) == ["blocker", "c:high", "b:normal", "d:normal", "a:low"]
+
+
+def test_tool_priorities_apply_unless_the_call_overrides():
+    scheduler = Scheduler(tool_priorities={"o3_reasoning": "low"})
+    assert scheduler.priority_for("o3_reasoning") == 2
+    assert scheduler.priority_for("o3_reasoning", "high") == 0
+    assert scheduler.priority_for("o3_review") == 1
+    with pytest.raises(ValueError, match="Unknown priority"):
+        scheduler.priority_for("o3_review", "urgent")
+
+
+def run_calls(scheduler: Scheduler, tools: List[str]):
+    """Run one short call per entry in tools; returns the peak running count overall and per tool"""
+    peaks = {"total": 0}
+
+    async def call(tool):
+        async with scheduler.slot(tool):
+            running = scheduler.snapshot()
+            peaks["total"] = max(peaks["total"], sum(entry["running"] for entry in running.values()))
+            peaks[tool] = max(peaks.get(tool, 0), running[tool]["running"])
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*(call(tool) for tool in tools))
+
+    asyncio.run(scenario())
+    return peaks
+
+
+def test_global_cap():
+    peaks = run_calls(Scheduler(max_concurrent=2), ["o3_review"] * 3 + ["o3_code"] * 3)
+    assert peaks["total"] == 2
+
+
+def test_per_tool_cap():
+    peaks = run_calls(Scheduler(max_concurrent=4, tool_limits={"o3_review": 1}), ["o3_review"] * 4 + ["o3_code"] * 4)
+    assert peaks["o3_review"] == 1
+    assert peaks["total"] == 4
+
+
+def test_capped_tool_does_not_block_other_tools():
+    async def scenario():
+        scheduler = Scheduler(max_concurrent=4, tool_limits={"o3_review": 1})
+        log: List[str] = []
+        release = asyncio.Event()
+        heavy = [asyncio.ensure_future(hold(scheduler, "o3_review", release, log, "high")) for _ in range(3)]
+        await settle()
+        quick = asyncio.ensure_future(hold(scheduler, "o3_code", release, log, "low"))
+        await settle()
+        admitted = list(log)
+        release.set()
+        await asyncio.gather(*heavy, quick)
+        return admitted
+
+    assert asyncio.run(scenario()) == ["o3_review:high", "o3_code:low"]
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        scheduler = Scheduler(max_concurrent=1)
+        log: List[str] = []
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(scheduler, "holder", release, log))
+        await settle()
+        cancelled = asyncio.ensure_future(hold(scheduler, "cancelled", release, log, "high"))
+        waiting = asyncio.ensure_future(hold(scheduler, "waiting", release, log))
+        await settle()
+        cancelled.cancel()
+        await settle()
+        queued = scheduler.snapshot()
+        release.set()
+        await asyncio.gather(holder, waiting)
+        return log, queued, scheduler
+
+    log, queued, scheduler = asyncio.run(scenario())
+    assert log == ["holder", "waiting"]
+    assert "cancelled" not in queued
+    assert scheduler._total_running == 0
+    assert all(entry == {"running": 0, "queued": 0} for entry in scheduler.snapshot().values())
+
+
+def test_cancellation_right_after_admission_returns_the_slot():
+    async def scenario():
+        scheduler = Scheduler(max_concurrent=1)
+        log: List[str] = []
+        release = asyncio.Event()
+        release.set()
+        holder = scheduler.slot("holder")
+        await holder.__aenter__()
+        admitted = asyncio.ensure_future(hold(scheduler, "admitted", release, log))
+        await settle()
+        # Leaving the holder's block admits the waiter; cancel it before it gets to run
+        await holder.__aexit__(None, None, None)
+        admitted.cancel()
+        await settle()
+        await asyncio.wait_for(hold(scheduler, "after", release, log), 1)
+        return log, admitted.cancelled(), scheduler._total_running
+
+    log, cancelled, running = asyncio.run(scenario())
+    assert cancelled and log == ["after"]
+    assert running == 0
+
+
+class BlockingTool:
+    """A stand-in tool whose calls run until cancelled"""
+
+    name = "o3_review"
+    common_options = True
+    scheduled = True
+
+    def __init__(self):
+        self.started = 0
+
+    async def execute(self, arguments):
+        self.started += 1
+        await asyncio.sleep(60)
+        return "never"
+
+
+def test_cancelling_a_background_job_frees_its_slot(env):
+    env.setenv("MAX_CONCURRENT_REQUESTS", "1")
+
+    async def scenario():
+        server = OpenAIMCPServer()
+        tool = BlockingTool()
+        first = server.jobs.submit(tool.name, server._run_tool(tool, {}))
+        second = server.jobs.submit(tool.name, server._run_tool(tool, {}))
+        await settle()
+        before = (tool.started, server.scheduler.snapshot()[tool.name])
+        server.jobs.cancel(first.id)
+        await settle()
+        after = (tool.started, server.scheduler.snapshot()[tool.name])
+        await server.jobs.shutdown()
+        return before, after, server.scheduler._total_running
+
+    before, after, running = asyncio.run(scenario())
+    assert before == (1, {"running": 1, "queued": 1})
+    assert after == (2, {"running": 1, "queued": 0})
+    assert running == 0
@@ -0,0 +1,41 @@
+"""JSON backends: canonical output and cache keys must not depend on JSON_BACKEND"""
+
+import pytest
+
+import src.cache
+from src.cache import make_cache_key
+from src.serialization import ORJSON, STDLIB, get_serializer
+
+requires_orjson = pytest.mark.skipif(ORJSON is None, reason="orjson is not installed")
+
+PAYLOADS = [
+    {"model": "o3-pro", "messages": [{"role": "user", "content": "réglage \u2028 \n"}], "temperature": 0.1},
+    {"model": "o3-pro", "temperature": 1e-05, "top_p": 1e20},
+    {"model": "o3-pro", "metadata": {"scores": [1.5e-07, 2.0, 1e16]}, "max_tokens": 100000},
+    {"model": "o3-pro", "temperature": float("nan"), "top_p": float("inf")},
+]
+
+
+@requires_orjson
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_canonical_bytes_match_across_backends(payload):
+    assert ORJSON.canonical(payload) == STDLIB.canonical(payload)
+
+
+@requires_orjson
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_cache_keys_do_not_depend_on_the_backend(monkeypatch, payload):
+    keys = set()
+    for serializer in (STDLIB, ORJSON):
+        monkeypatch.setattr(src.cache, "DEFAULT", serializer)
+        keys.add(make_cache_key(payload))
+    assert len(keys) == 1
+
+
+def test_canonical_form_ignores_key_order():
+    assert STDLIB.canonical({"b": 1, "a": [0.5]}) == STDLIB.canonical({"a": [0.5], "b": 1}) == b'{"a":[0.5],"b":1}'
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        get_serializer("simdjson")
@@ -0,0 +1,114 @@
+"""MinHash fingerprints and the near-duplicate LSH index"""
+
+import time
+
+import pytest
+
+from src.similarity import NearDuplicateIndex, features, signature, similarity
+from tests.test_streaming import shorten_request_timeout
+
+CODE = "\n".join(f"def handler_{i}(request):\n    return respond(request, status={200 + i})" for i in range(30))
+
+
+def test_identical_text_has_similarity_one():
+    sig = signature(features(CODE), 128)
+    assert similarity(sig, sig) == 1.0
+
+
+def test_similarity_tracks_jaccard_overlap():
+    a = signature(features(CODE), 128)
+    small_edit = signature(features(CODE.replace("status=205", "status=999")), 128)
+    unrelated = signature(features("SELECT name FROM users WHERE id = 1 ORDER BY created_at DESC " * 3), 128)
+    assert similarity(a, small_edit) > 0.9
+    assert similarity(a, unrelated) < 0.2
+
+
+def test_short_fields_compare_words_ignoring_case_and_whitespace():
+    assert features("Check  SQL injection") == features("check sql\ninjection")
+    assert features("check sql injection") != features("check xss")
+
+
+def test_signature_of_a_union_is_the_elementwise_minimum():
+    a, b = features("alpha beta gamma"), features("delta epsilon")
+    union = signature(a | b, 64)
+    assert union == tuple(map(min, signature(a, 64), signature(b, 64)))
+
+
+def test_near_duplicate_request_finds_the_earlier_result():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("o3_code_review", {"code": CODE, "language": "python", "focus": "errors"}, "review")
+    match = index.lookup(
+        "o3_code_review",
+        {"code": CODE.replace("status=205", "status=999"), "language": "python", "focus": "errors", "no_cache": False}
+    )
+    assert match is not None and match.result == "review" and match.similarity >= 0.8
+    assert index.stats["hits"] == 1
+
+
+def test_exact_arguments_and_tool_must_match():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("o3_code_review", {"code": CODE, "language": "python"}, "review")
+    assert index.lookup("o3_code_review", {"code": CODE, "language": "javascript"}) is None
+    assert index.lookup("o3_optimize", {"code": CODE, "language": "python"}) is None
+    assert index.lookup("o3_code_review", {"code": CODE, "language": "python", "focus": "security"}) is None
+
+
+def test_every_free_text_field_must_clear_the_threshold():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("o3_code_review", {"code": CODE, "focus": "look for race conditions"}, "review")
+    assert index.lookup("o3_code_review", {"code": CODE, "focus": "check the public API naming"}) is None
+
+
+def test_per_tool_thresholds():
+    edited = CODE.replace("status=2", "status=3")
+    index = NearDuplicateIndex(threshold=0.99, tool_thresholds={"o3_optimize": 0.3})
+    index.add("o3_code_review", {"code": CODE}, "review")
+    index.add("o3_optimize", {"code": CODE}, "optimized")
+    assert index.lookup("o3_code_review", {"code": edited}) is None
+    assert index.lookup("o3_optimize", {"code": edited}).result == "optimized"
+
+
+def test_oldest_entries_are_evicted():
+    index = NearDuplicateIndex(max_entries=2)
+    for i in range(3):
+        index.add("t", {"code": f"{CODE}\n# revision {i}", "language": str(i)}, f"result {i}")
+    assert index.stats["entries"] == 2
+    assert index.lookup("t", {"code": f"{CODE}\n# revision 0", "language": "0"}) is None
+    assert index.lookup("t", {"code": f"{CODE}\n# revision 2", "language": "2"}).result == "result 2"
+    assert all(entry_id in index._entries for bucket in index._buckets.values() for entry_id in bucket)
+
+
+def test_expired_entries_do_not_match(monkeypatch):
+    index = NearDuplicateIndex(ttl=60)
+    index.add("t", {"code": CODE}, "old")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert index.lookup("t", {"code": CODE}) is None
+
+
+def test_bins_must_divide_into_bands():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_bins=100, bands=32)
+
+
+@pytest.mark.parametrize("stream_interval, reused", [(0.0, True), (0.2, False)])
+def test_only_results_the_cache_would_keep_are_reused(env, run_with_server, stream_interval, reused):
+    env.setenv("NEAR_DUPLICATE_ENABLED", "true")
+    env.setenv("STREAMING_ENABLED", "true")
+    env.setenv("NON_STREAMING_MODELS", "")
+    shorten_request_timeout(env, 0.3)
+    arguments = {"code": CODE, "language": "python"}
+
+    async def scenario(mock, server):
+        tool = server.get_tool("o3_review")
+        first = await server._run_tool(tool, arguments)
+        second = await server._run_tool(tool, arguments)
+        return first, second, mock.requests
+
+    first, second, requests = run_with_server(
+        scenario, payload_size=200, stream_chunks=4, stream_interval=stream_interval
+    )
+    # A stream cut off by the timeout ends with a marker and must not be offered to later calls
+    assert first.endswith("[Response incomplete: the request timed out before the model finished]") != reused
+    assert second.startswith("_Reused the result") == reused
+    assert requests == (1 if reused else 2)
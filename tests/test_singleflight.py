@@ -0,0 +1,27 @@
+"""Single-flight: concurrent identical requests share one upstream call"""
+
+import asyncio
+
+MESSAGES = [{"role": "system", "content": "You review code."}, {"role": "user", "content": "def f(): pass"}]
+
+
+def test_concurrent_identical_requests_share_one_call(run_with_api):
+    async def scenario(mock, client):
+        results = await asyncio.gather(*(client.complete(MESSAGES) for _ in range(5)))
+        other = await client.complete(MESSAGES + [{"role": "user", "content": "and g"}])
+        return results, other, mock.requests, client.singleflight.stats
+
+    results, other, requests, stats = run_with_api(scenario, latency=0.05)
+    assert len(set(results)) == 1 and other
+    assert requests == 2
+    assert stats["leaders"] == 2 and stats["coalesced"] == 4
+
+
+def test_single_flight_can_be_disabled(env, run_with_api):
+    env.setenv("SINGLE_FLIGHT_ENABLED", "false")
+
+    async def scenario(mock, client):
+        await asyncio.gather(*(client.complete(MESSAGES) for _ in range(3)))
+        return mock.requests
+
+    assert run_with_api(scenario, latency=0.02) == 3
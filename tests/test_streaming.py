@@ -0,0 +1,99 @@
+"""Streaming responses: SSE assembly, progress reporting, partial output and error events"""
+
+import aiohttp
+import pytest
+
+from src.errors import FatalAPIError
+from src.openai_client import progress_reporter
+
+MESSAGES = [{"role": "user", "content": "Explain this function."}]
+
+
+@pytest.fixture
+def streaming(env):
+    env.setenv("STREAMING_ENABLED", "true")
+    env.setenv("NON_STREAMING_MODELS", "")
+    env.setenv("STREAM_PROGRESS_INTERVAL", "0")
+    env.setenv("RESPONSE_CACHE_ENABLED", "true")
+    return env
+
+
+def shorten_request_timeout(env, seconds: float):
+    """Give streamed requests a total timeout of seconds instead of ten minutes"""
+    client_timeout = aiohttp.ClientTimeout
+    env.setattr(aiohttp, "ClientTimeout", lambda total=None, **options: client_timeout(total=seconds))
+
+
+async def complete_with_progress(client):
+    events = []
+
+    async def report(received, message):
+        events.append((received, message))
+
+    token = progress_reporter.set(report)
+    try:
+        return await client.complete(MESSAGES), events
+    finally:
+        progress_reporter.reset(token)
+
+
+def test_complete_stream_is_assembled_and_cached(streaming, run_with_api):
+    async def scenario(mock, client):
+        content, events = await complete_with_progress(client)
+        return content, events, mock.bodies, client.cache.stats
+
+    content, events, bodies, cache_stats = run_with_api(scenario, payload_size=200, stream_chunks=4)
+    assert bodies[0]["stream"] is True
+    assert content == "Reasoning.\n\n" + "x" * 188
+    assert [received for received, _ in events] == [50, 100, 150, 200, 200]
+    assert events[-1] == (200, "Response complete")
+    assert cache_stats["writes"] == 1
+
+
+def test_timeout_mid_stream_returns_partial_output_uncached(streaming, run_with_api):
+    shorten_request_timeout(streaming, 0.3)
+
+    async def scenario(mock, client):
+        content, events = await complete_with_progress(client)
+        return content, events, mock.requests, client.cache.stats
+
+    content, events, requests, cache_stats = run_with_api(
+        scenario, payload_size=200, stream_chunks=4, stream_interval=0.2
+    )
+    assert content.startswith("Reasoning.\n\n")
+    assert content.endswith("[Response incomplete: the request timed out before the model finished]")
+    assert len(content) < 200 + 80
+    assert requests == 1
+    assert events and events[-1][1] != "Response complete"
+    assert cache_stats["writes"] == 0
+
+
+def test_timeout_before_any_output_is_an_error(streaming, run_with_api):
+    shorten_request_timeout(streaming, 0.1)
+
+    async def scenario(mock, client):
+        with pytest.raises(FatalAPIError, match="timed out"):
+            await client.complete(MESSAGES)
+
+    run_with_api(scenario, latency=0.3)
+
+
+def test_error_event_fails_the_request_without_retrying(streaming, run_with_api):
+    async def scenario(mock, client):
+        with pytest.raises(FatalAPIError, match="Streaming error: model overloaded"):
+            await client.complete(MESSAGES)
+        return mock.requests, client.cache.stats
+
+    requests, cache_stats = run_with_api(scenario, stream_error="model overloaded")
+    assert requests == 1
+    assert cache_stats["writes"] == 0
+
+
+def test_non_streaming_models_ignore_the_stream_setting(streaming, run_with_api):
+    streaming.setenv("NON_STREAMING_MODELS", "o3-pro")
+
+    async def scenario(mock, client):
+        await client.complete(MESSAGES)
+        return mock.bodies[0]
+
+    assert "stream" not in run_with_api(scenario)
@@ -0,0 +1,49 @@
+"""Token counting and cost estimates"""
+
+from src import tokens
+
+
+class FakeEncoding:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, disallowed_special=()):
+        self.calls += 1
+        return text.split()
+
+
+def test_character_estimate_without_tokenizer(monkeypatch):
+    monkeypatch.setattr(tokens, "_get_encoding", lambda: None)
+    assert tokens.count_tokens("x" * 400) == 100
+
+
+def test_counts_are_cached_by_digest_and_bounded(monkeypatch):
+    encoding = FakeEncoding()
+    monkeypatch.setattr(tokens, "_get_encoding", lambda: encoding)
+    monkeypatch.setattr(tokens, "_token_counts", tokens.OrderedDict())
+    monkeypatch.setattr(tokens, "TOKEN_COUNT_CACHE_SIZE", 2)
+
+    text = "one two three " * 1000
+    assert tokens.count_tokens(text) == 3000
+    assert tokens.count_tokens(text) == 3000
+    assert encoding.calls == 1
+    # Keys are 16-byte digests, never the text itself
+    assert all(len(key) == 16 for key in tokens._token_counts)
+
+    tokens.count_tokens("a")
+    tokens.count_tokens("b")
+    assert len(tokens._token_counts) == 2
+    tokens.count_tokens(text)
+    assert encoding.calls == 4
+
+
+def test_unknown_models_are_priced_like_o3_pro():
+    assert tokens.price_for("o3-pro-2025-06-10") == tokens.PRICES["o3-pro"]
+    assert tokens.price_for("o4-mini-high") == tokens.PRICES["o4-mini"]
+    assert tokens.price_for("some-new-model") == tokens.PRICES["o3-pro"]
+
+
+def test_cached_input_is_discounted():
+    full = tokens.estimate_cost("o3", 1_000_000, 0)
+    cached = tokens.estimate_cost("o3", 1_000_000, 0, cached_tokens=1_000_000)
+    assert cached == full * tokens.CACHED_INPUT_PRICE_RATIO